@@ -15,11 +15,21 @@ Configuration:
 - No local .env file needed - uses parent directory configuration
 """
 
+import argparse
+import asyncio
 import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import autogen
-from config import Config
+from config import AgentConfig, Config, WorkflowConfig
+from phase_scheduler import current_phase
+from pipeline import PhaseSpec, PipelineWorkflow
+from llm_cache import get_response_cache
+from model_router import tier_model
+from rate_limiter import RateLimiter, estimate_request_tokens, estimate_text_tokens, get_rate_limiter
+from retry_policy import RetryPolicy, call_with_retries_sync
+from run_store import get_run_store, make_record, render_report
+from tracing import CACHE_HIT, MODEL, RETRIES, llm_attributes, trace_span
 
 
 # ============================================================================
@@ -29,11 +39,21 @@ from config import Config
 class InterviewPlatformAgents:
     """Manages all agents for the interview platform product planning workflow"""
 
-    def __init__(self, config_list: List[Dict[str, Any]]):
+    def __init__(self, config_list: List[Dict[str, Any]], stream: bool = False):
         self.config_list = config_list
+        self.stream = stream  # AutoGen prints streamed tokens to the console itself
+        self.cache = get_response_cache()  # shared on-disk cache, None when disabled
         self.agents = {}
         self.conversation_history = []
 
+    def llm_config(self, agent_type: str) -> Dict[str, Any]:
+        """llm_config for an agent, on the model of its tier in AgentConfig"""
+        model = tier_model(AgentConfig.get_agent_config(agent_type).get("tier"))
+        # cache_seed=None: the shared ResponseCache (or nothing, when it is disabled)
+        # replaces AutoGen's own per-seed disk cache
+        return {"config_list": [{**entry, "model": model} for entry in self.config_list],
+                "temperature": 0.7, "stream": self.stream, "cache_seed": None}
+
     def create_research_agent(self) -> autogen.ConversableAgent:
         """
         ResearchAgent: Market Researcher
@@ -56,10 +76,11 @@ class InterviewPlatformAgents:
         agent = autogen.ConversableAgent(
             name="ResearchAgent",
             system_message=system_message,
-            llm_config={"config_list": self.config_list, "temperature": 0.7},
+            llm_config=self.llm_config("research"),
             human_input_mode="NEVER",
         )
 
+        agent.client_cache = self.cache
         self.agents["research"] = agent
         return agent
 
@@ -89,10 +110,11 @@ class InterviewPlatformAgents:
         agent = autogen.ConversableAgent(
             name="AnalysisAgent",
             system_message=system_message,
-            llm_config={"config_list": self.config_list, "temperature": 0.7},
+            llm_config=self.llm_config("analysis"),
             human_input_mode="NEVER",
         )
 
+        agent.client_cache = self.cache
         self.agents["analysis"] = agent
         return agent
 
@@ -128,10 +150,11 @@ class InterviewPlatformAgents:
         agent = autogen.ConversableAgent(
             name="BlueprintAgent",
             system_message=system_message,
-            llm_config={"config_list": self.config_list, "temperature": 0.7},
+            llm_config=self.llm_config("blueprint"),
             human_input_mode="NEVER",
         )
 
+        agent.client_cache = self.cache
         self.agents["blueprint"] = agent
         return agent
 
@@ -168,10 +191,11 @@ class InterviewPlatformAgents:
         agent = autogen.ConversableAgent(
             name="ReviewerAgent",
             system_message=system_message,
-            llm_config={"config_list": self.config_list, "temperature": 0.7},
+            llm_config=self.llm_config("reviewer"),
             human_input_mode="NEVER",
         )
 
+        agent.client_cache = self.cache
         self.agents["reviewer"] = agent
         return agent
 
@@ -180,121 +204,142 @@ class InterviewPlatformAgents:
 # WORKFLOW EXECUTION
 # ============================================================================
 
-class InterviewPlatformWorkflow:
-    """Orchestrates the multi-agent conversation workflow"""
-
-    def __init__(self, agents_manager: InterviewPlatformAgents):
-        self.agents_manager = agents_manager
-        self.outputs = {}
-
-    def initiate_research_phase(self) -> str:
-        """Start the workflow with market research"""
-        print("\n" + "="*80)
-        print("PHASE 1: MARKET RESEARCH")
-        print("="*80)
-
-        research_agent = self.agents_manager.agents["research"]
-
-        initial_message = """Please conduct a comprehensive market analysis for AI-powered
-        interview platforms. Focus on:
-
-        1. Current market leaders and their key features
-        2. Market trends and innovations
-        3. Unmet needs and gaps
-
-        Provide your analysis in a structured format."""
-
-        # Get research output
-        research_output = research_agent.generate_reply(
-            messages=[{"content": initial_message, "role": "user"}]
-        )
-
-        print("\nResearch Agent Output:")
-        print(research_output)
-        self.outputs["research"] = research_output
-
-        return research_output
-
-    def conduct_analysis_phase(self, research_output: str) -> str:
-        """Analyze research findings for opportunities"""
-        print("\n" + "="*80)
-        print("PHASE 2: MARKET GAP ANALYSIS")
-        print("="*80)
-
-        analysis_agent = self.agents_manager.agents["analysis"]
-
-        analysis_message = f"""Based on the following market research, identify 3 key
-        opportunities for an AI-powered interview platform:
-
-        RESEARCH FINDINGS:
-        {research_output}
-
-        Please provide detailed analysis of market gaps and opportunities."""
-
-        analysis_output = analysis_agent.generate_reply(
-            messages=[{"content": analysis_message, "role": "user"}]
-        )
-
-        print("\nAnalysis Agent Output:")
-        print(analysis_output)
-        self.outputs["analysis"] = analysis_output
-
-        return analysis_output
-
-    def create_blueprint_phase(self, research_output: str, analysis_output: str) -> str:
-        """Create product blueprint based on analysis"""
-        print("\n" + "="*80)
-        print("PHASE 3: PRODUCT BLUEPRINT")
-        print("="*80)
-
-        blueprint_agent = self.agents_manager.agents["blueprint"]
-
-        blueprint_message = f"""Based on the market research and opportunity analysis below,
-        create a comprehensive product blueprint for an AI-powered interview platform:
-
-        MARKET RESEARCH:
-        {research_output}
+class InterviewPlatformWorkflow(PipelineWorkflow):
+    """
+    Orchestrates the multi-agent conversation workflow
 
-        OPPORTUNITY ANALYSIS:
-        {analysis_output}
+    The phases are declared in WorkflowConfig.PHASES and run by the pipeline
+    engine; each phase is answered by its AutoGen agent instead of a direct
+    API call. Agents carry their own llm_config (on their tier's model), so the
+    per-phase model and temperature settings do not apply here; an output that
+    fails the router's check is retried with a direct API call on the larger
+    tier.
+    """
 
-        Please create a detailed product blueprint with features, user journey, and differentiation."""
+    PHASES = [PhaseSpec.from_config(entry) for entry in WorkflowConfig.PHASES]
+    REPORT_TITLE = "AI-POWERED INTERVIEW PLATFORM - PRODUCT PLAN"
 
-        blueprint_output = blueprint_agent.generate_reply(
-            messages=[{"content": blueprint_message, "role": "user"}]
-        )
-
-        print("\nBlueprint Agent Output:")
-        print(blueprint_output)
-        self.outputs["blueprint"] = blueprint_output
-
-        return blueprint_output
-
-    def conduct_review_phase(self, blueprint_output: str) -> str:
-        """Review blueprint and provide recommendations"""
-        print("\n" + "="*80)
-        print("PHASE 4: PRODUCT REVIEW & RECOMMENDATIONS")
-        print("="*80)
-
-        reviewer_agent = self.agents_manager.agents["reviewer"]
-
-        review_message = f"""Please review the following product blueprint and provide
-        strategic recommendations, feasibility assessment, and next steps:
-
-        PRODUCT BLUEPRINT:
-        {blueprint_output}
-
-        Provide comprehensive review with actionable recommendations."""
-
-        review_output = reviewer_agent.generate_reply(
-            messages=[{"content": review_message, "role": "user"}]
-        )
+    def __init__(self, agents_manager: InterviewPlatformAgents, resume: str = None, fresh: bool = False):
+        super().__init__(stream=agents_manager.stream, resume=resume, fresh=fresh)
+        self.agents_manager = agents_manager
+        for key in ("hedges", "hedge_wins"):
+            del self.metadata[key]  # agent calls are threaded, so no hedging here
+        self.retry_policy = RetryPolicy.from_config()
+
+    def agent(self, spec: PhaseSpec) -> autogen.ConversableAgent:
+        """The agent answering a phase"""
+        for agent in self.agents_manager.agents.values():
+            if agent.name == spec.agent:
+                return agent
+        raise KeyError(f"Phase '{spec.name}' needs {spec.agent}, which has not been created")
+
+    def system_prompt(self, spec: PhaseSpec) -> str:
+        return self.agent(spec).system_message
+
+    def settings(self, spec: PhaseSpec) -> Tuple[str, float, int]:
+        """Model settings come from the agent's llm_config"""
+        llm_config = self.agent(spec).llm_config or {}
+        model = (llm_config.get("config_list") or [{}])[0].get("model", self.model)
+        return model, llm_config.get("temperature"), Config.AGENT_MAX_TOKENS
+
+    async def execute(self, spec: PhaseSpec, messages: List[Dict[str, Any]],
+                      model: str = None) -> str:
+        """Agent-backed executor: the blocking AutoGen call runs in a worker thread"""
+        if model is not None or self.feeds_speculation(spec):
+            # Escalation: the agent is bound to its tier's model, so call the larger one directly.
+            # Agent replies do not stream either, so phases that feed speculation are called
+            # directly with the agent's model and system message.
+            return await super().execute(spec, messages, model=model)
+        reply = await asyncio.to_thread(self._reply, self.agent(spec), messages)
+        if not self.stream:
+            print(reply)
+        return reply
+
+    def _throttle(self, messages: List[Dict[str, Any]], model: str) -> Tuple[Optional[RateLimiter], int]:
+        """Wait for rate-limit budget before an agent calls the provider; returns what to settle"""
+        limiter = get_rate_limiter(Config.API_BASE, model)
+        estimate = estimate_request_tokens(messages, Config.AGENT_MAX_TOKENS, model)
+        if limiter is not None:
+            limiter.acquire(estimate)
+        return limiter, estimate
+
+    @staticmethod
+    def _usage_totals(summary: Dict[str, Any]) -> Dict[str, int]:
+        """Sum prompt/completion tokens over the models in an AutoGen usage summary"""
+        totals = {"prompt_tokens": 0, "completion_tokens": 0}
+        for usage in (summary or {}).values():
+            if isinstance(usage, dict):
+                for key in totals:
+                    totals[key] += usage.get(key, 0)
+        return totals
+
+    def _token_counts(self, agent: autogen.ConversableAgent) -> Tuple[int, int]:
+        """(billed, total) tokens in an agent's usage summaries so far"""
+        return (sum(self._usage_totals(agent.client.actual_usage_summary).values()),
+                sum(self._usage_totals(agent.client.total_usage_summary).values()))
+
+    def _reply(self, agent: autogen.ConversableAgent, messages: List[Dict[str, Any]]) -> str:
+        """
+        Get one agent reply within the token budget, retrying transient provider errors.
 
-        print("\nReviewer Agent Output:")
-        print(review_output)
-        self.outputs["review"] = review_output
+        Args:
+            agent: Agent to ask
+            messages: Messages from build_messages; the first is the agent's system message
 
-        return review_output
+        Returns:
+            str: The agent's reply
+        """
+        phase = current_phase.get()
+        # Agents keep their own max_tokens, so only the prompt can be shrunk here
+        messages, _, reserved = self.budget.prepare(phase, messages, Config.AGENT_MAX_TOKENS)
+        model = agent.llm_config["config_list"][0]["model"]
+
+        def attempt():
+            limiter, estimate = self._throttle(messages, model)
+            if limiter is None:
+                # The agent prepends its own system message
+                return agent.generate_reply(messages=messages[1:])
+            before = self._token_counts(agent)
+            # As in llm_client: a failed attempt is charged its prompt, otherwise the tokens actually used
+            billed = estimate_request_tokens(messages, 0, model)
+            try:
+                reply = agent.generate_reply(messages=messages[1:])
+                billed_now, total = (after - start for after, start in zip(self._token_counts(agent), before))
+                if total:  # a response-cache hit is total-only and costs nothing
+                    billed = billed_now
+                else:  # no usage reported, so estimate it
+                    billed += estimate_text_tokens(str(reply or ""), model)
+                return reply
+            finally:
+                limiter.settle(estimate, billed)
+
+        counts = {}
+        with trace_span(f"chat {model}", {MODEL: model, "gen_ai.operation.name": "chat", "phase.name": phase,
+                                          "agent.name": agent.name}, kind="client") as span:
+            billed_before = self._usage_totals(agent.client.actual_usage_summary)
+            total_before = self._usage_totals(agent.client.total_usage_summary)
+            try:
+                reply = call_with_retries_sync(attempt, self.retry_policy, metadata=counts)
+            except BaseException:
+                self.budget.release(reserved)
+                raise
+            finally:
+                span.set({RETRIES: counts.get("retries", 0)})
+                self.metadata["retries"] += counts.get("retries", 0)
+
+            billed_after = self._usage_totals(agent.client.actual_usage_summary)
+            total_after = self._usage_totals(agent.client.total_usage_summary)
+            billed = {key: billed_after[key] - billed_before[key] for key in billed_after}
+            total = {key: total_after[key] - total_before[key] for key in total_after}
+            span.set({CACHE_HIT: not any(billed.values()) and any(total.values()),
+                      **llm_attributes(model, billed)})
+            if any(billed.values()):
+                self.budget.record(phase, reserved, messages, usage=billed)
+            elif any(total.values()):
+                self.budget.release(reserved)  # served from the response cache
+            else:
+                self.budget.record(phase, reserved, messages, content=str(reply or ""))
+        return reply
 
     def execute_workflow(self) -> Dict[str, str]:
         """Execute the complete four-phase workflow"""
@@ -302,18 +347,12 @@ class InterviewPlatformWorkflow:
         print("AI-POWERED INTERVIEW PLATFORM - PRODUCT PLANNING WORKFLOW")
         print("="*80)
         print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Run ID: {self.run_id}")
 
-        # Phase 1: Research
-        research_output = self.initiate_research_phase()
-
-        # Phase 2: Analysis
-        analysis_output = self.conduct_analysis_phase(research_output)
-
-        # Phase 3: Blueprint
-        blueprint_output = self.create_blueprint_phase(research_output, analysis_output)
-
-        # Phase 4: Review
-        review_output = self.conduct_review_phase(blueprint_output)
+        # Each phase starts as soon as the outputs it reads have been written
+        scheduler = asyncio.run(self.generate())
+        self.print_reports(scheduler)
+        print(f"Retries: {self.metadata['retries']}")
 
         return self.outputs
 
@@ -325,41 +364,53 @@ class InterviewPlatformWorkflow:
 class OutputManager:
     """Manages and saves workflow outputs"""
 
+    # Report sections for outputs saved without run store records
+    SECTIONS = [
+        ("research", "PHASE 1: MARKET RESEARCH & COMPETITIVE ANALYSIS"),
+        ("analysis", "PHASE 2: MARKET GAP ANALYSIS & OPPORTUNITIES"),
+        ("blueprint", "PHASE 3: PRODUCT BLUEPRINT"),
+        ("review", "PHASE 4: PRODUCT REVIEW & RECOMMENDATIONS"),
+    ]
+
     def __init__(self, output_dir: str = None):
         # Use Config.OUTPUT_DIR if not provided
         self.output_dir = output_dir or Config.OUTPUT_DIR
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.report_file = None
 
-    def save_outputs(self, outputs: Dict[str, str]) -> str:
-        """Save all outputs to files"""
-        output_file = os.path.join(self.output_dir, f"workflow_outputs_{self.timestamp}.txt")
-
-        with open(output_file, "w") as f:
-            f.write("="*80 + "\n")
-            f.write("AI-POWERED INTERVIEW PLATFORM - PRODUCT PLAN\n")
-            f.write("="*80 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-            # Research Phase
-            f.write("PHASE 1: MARKET RESEARCH & COMPETITIVE ANALYSIS\n")
-            f.write("-"*80 + "\n")
-            f.write(outputs.get("research", "No research output") + "\n\n")
-
-            # Analysis Phase
-            f.write("PHASE 2: MARKET GAP ANALYSIS & OPPORTUNITIES\n")
-            f.write("-"*80 + "\n")
-            f.write(outputs.get("analysis", "No analysis output") + "\n\n")
-
-            # Blueprint Phase
-            f.write("PHASE 3: PRODUCT BLUEPRINT\n")
-            f.write("-"*80 + "\n")
-            f.write(outputs.get("blueprint", "No blueprint output") + "\n\n")
+    def save_outputs(self, outputs: Dict[str, str], metadata: Dict[str, Any] = None,
+                     run_id: str = None) -> str:
+        """
+        Save the report, rendered from the run store records of a run.
 
-            # Review Phase
-            f.write("PHASE 4: PRODUCT REVIEW & RECOMMENDATIONS\n")
-            f.write("-"*80 + "\n")
-            f.write(outputs.get("review", "No review output") + "\n\n")
+        Args:
+            outputs: Phase outputs, used when the run store has no records for the run
+            metadata: Run metadata (retry counts, ...) for the report header
+            run_id: Run whose records to render
 
+        Returns:
+            str: Path of the saved report
+        """
+        store = get_run_store()
+        run, phases = store.run(run_id) if store is not None and run_id else (None, [])
+        if not phases:
+            # Not recorded: store the outputs as records of an ad-hoc run, so they
+            # can be queried like any other run
+            run_id = run_id or self.timestamp
+            run = make_record("run", run_id, "InterviewPlatformWorkflow",
+                              title=InterviewPlatformWorkflow.REPORT_TITLE, metadata=metadata or {})
+            phases = [make_record("phase", run_id, "InterviewPlatformWorkflow", phase=key, title=title,
+                                  output=outputs.get(key, f"No {key} output"))
+                      for key, title in self.SECTIONS]
+            if store is not None:
+                store.append([*phases, run])
+        elif metadata is not None:
+            run = {**(run or {}), "metadata": metadata}
+
+        output_file = os.path.join(self.output_dir, f"workflow_outputs_{run_id}.txt")
+        with open(output_file, "w") as f:
+            f.write(render_report(run, phases))
+        self.report_file = output_file
         return output_file
 
     def create_summary(self, outputs: Dict[str, str]) -> str:
@@ -384,7 +435,8 @@ class OutputManager:
             f.write("3. Product features and user journey\n")
             f.write("4. Strategic recommendations and next steps\n\n")
 
-            f.write("All outputs saved in workflow_outputs_{}.txt\n".format(self.timestamp))
+            f.write("All outputs saved in {}\n".format(
+                os.path.basename(self.report_file or f"workflow_outputs_{self.timestamp}.txt")))
 
         return summary_file
 
@@ -393,8 +445,15 @@ class OutputManager:
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
-    """Main execution function"""
+def main(stream: bool = False, resume: str = None, fresh: bool = False):
+    """
+    Main execution function
+
+    Args:
+        stream: Stream agent tokens to the console as they arrive
+        resume: Run ID of a failed run whose completed phases should be skipped
+        fresh: Run every phase instead of reusing unchanged stored results
+    """
 
     try:
         # Validate configuration
@@ -411,7 +470,7 @@ def main():
 
         # Create agents
         print("Initializing agents...")
-        agents_manager = InterviewPlatformAgents(config_list)
+        agents_manager = InterviewPlatformAgents(config_list, stream=stream)
 
         agents_manager.create_research_agent()
         print("✓ ResearchAgent created")
@@ -427,13 +486,13 @@ def main():
 
         # Execute workflow
         print("\nInitiating workflow...")
-        workflow = InterviewPlatformWorkflow(agents_manager)
+        workflow = InterviewPlatformWorkflow(agents_manager, resume=resume, fresh=fresh)
         outputs = workflow.execute_workflow()
 
         # Save outputs
         print("\nSaving outputs...")
         output_manager = OutputManager()
-        output_file = output_manager.save_outputs(outputs)
+        output_file = output_manager.save_outputs(outputs, workflow.metadata, run_id=workflow.run_id)
         summary_file = output_manager.create_summary(outputs)
 
         print("\n" + "="*80)
@@ -454,4 +513,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="AI-powered interview platform product planning workflow")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream agent tokens to the console as they arrive")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run, skipping the phases it already completed")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Run every phase instead of reusing unchanged stored results")
+    args = parser.parse_args()
+
+    main(stream=args.stream, resume=args.resume, fresh=args.fresh)
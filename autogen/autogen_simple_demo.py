@@ -5,181 +5,79 @@ This is a lightweight version for quick testing and understanding the workflow.
 It demonstrates multi-agent collaboration by having each agent generate responses.
 """
 
-from datetime import datetime
-from config import Config, WorkflowConfig
-import json
+import argparse
+from config import WorkflowConfig
+from pipeline import PhaseSpec, PipelineWorkflow
 
-# Try to import OpenAI client
-try:
-    from openai import OpenAI
-except ImportError:
-    print("ERROR: OpenAI client is not installed!")
-    print("Please run: pip install -r ../requirements.txt")
-    exit(1)
 
-
-class SimpleInterviewPlatformWorkflow:
+class SimpleInterviewPlatformWorkflow(PipelineWorkflow):
     """Simplified workflow for interview platform planning"""
 
-    def __init__(self):
-        """Initialize the workflow"""
-        if not Config.validate_setup():
-            print("ERROR: Configuration validation failed!")
-            exit(1)
-
-        self.client = OpenAI(api_key=Config.API_KEY, base_url=Config.API_BASE)
-        self.outputs = {}
-        self.model = Config.OPENAI_MODEL
-
-    def run(self):
-        """Execute the complete workflow"""
-        print("\n" + "="*80)
-        print("AUTOGEN INTERVIEW PLATFORM WORKFLOW - SIMPLIFIED DEMO")
-        print("="*80)
-        print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Model: {self.model}\n")
-
-        # Phase 1: Research
-        self.phase_research()
-
-        # Phase 2: Analysis
-        self.phase_analysis()
-
-        # Phase 3: Blueprint
-        self.phase_blueprint()
-
-        # Phase 4: Review
-        self.phase_review()
-
-        # Summary
-        self.print_summary()
-
-    def phase_research(self):
-        """Phase 1: Market Research"""
-        print("\n" + "="*80)
-        print("PHASE 1: MARKET RESEARCH")
-        print("="*80)
-        print("[ResearchAgent is analyzing the market...]")
-
-        system_prompt = """You are a market research analyst. Provide a brief analysis of
-3 competitors in AI interview platforms (HireVue, Pymetrics, Codility).
-List their key features and identify market gaps in 150 words."""
-
-        user_message = "Analyze the current market for AI-powered interview platforms."
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=Config.AGENT_TEMPERATURE,
-            max_tokens=Config.AGENT_MAX_TOKENS,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-        )
-
-        self.outputs["research"] = response.choices[0].message.content
-        print("\n[ResearchAgent Output]")
-        print(self.outputs["research"])
-
-    def phase_analysis(self):
-        """Phase 2: Opportunity Analysis"""
-        print("\n" + "="*80)
-        print("PHASE 2: OPPORTUNITY ANALYSIS")
-        print("="*80)
-        print("[AnalysisAgent is identifying opportunities...]")
-
-        system_prompt = """You are a product analyst. Based on the market research provided,
-identify 3 key market opportunities or gaps for a new AI interview platform.
-Be concise in 150 words."""
-
-        user_message = f"""Market research findings:
-{self.outputs['research']}
-
-Now identify market opportunities and gaps."""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=Config.AGENT_TEMPERATURE,
-            max_tokens=Config.AGENT_MAX_TOKENS,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-        )
-
-        self.outputs["analysis"] = response.choices[0].message.content
-        print("\n[AnalysisAgent Output]")
-        print(self.outputs["analysis"])
-
-    def phase_blueprint(self):
-        """Phase 3: Product Blueprint"""
-        print("\n" + "="*80)
-        print("PHASE 3: PRODUCT BLUEPRINT")
-        print("="*80)
-        print("[BlueprintAgent is designing the product...]")
-
-        system_prompt = """You are a product designer. Based on the market analysis and opportunities,
+    TITLE = "AUTOGEN INTERVIEW PLATFORM WORKFLOW - SIMPLIFIED DEMO"
+
+    # Brief fields (topic, product, competitors, word_limit, word_limits) can
+    # be overridden per run; batch_runner passes one brief per JSONL line
+    DEFAULT_BRIEF = WorkflowConfig.DEFAULT_BRIEF
+
+    # Brief values go in the task so each system prompt is a stable, cacheable prefix
+    PHASES = [
+        PhaseSpec(
+            "research", "PHASE 1: MARKET RESEARCH", "ResearchAgent",
+            tier="fast",
+            status="[ResearchAgent is analyzing the market...]",
+            system_prompt="""You are a market research analyst. Provide a brief analysis of
+the competitors named in the request. List their key features and identify market gaps
+within the word limit given.""",
+            task="""Competitors: {competitors}
+Word limit: {word_limit}
+
+Analyze the current market for {topic}.""",
+        ),
+        PhaseSpec(
+            "analysis", "PHASE 2: OPPORTUNITY ANALYSIS", "AnalysisAgent",
+            tier="fast",
+            status="[AnalysisAgent is identifying opportunities...]",
+            system_prompt="""You are a product analyst. Based on the market research provided,
+identify 3 key market opportunities or gaps for the product named in the request.
+Be concise and stay within the word limit given.""",
+            inputs=(("research", "Market research findings"),),
+            stop=("\n4.",),  # three items asked for
+            task="""Product: {product}
+Word limit: {word_limit}
+
+Now identify market opportunities and gaps.""",
+        ),
+        PhaseSpec(
+            "blueprint", "PHASE 3: PRODUCT BLUEPRINT", "BlueprintAgent",
+            tier="fast",
+            multi_sample=True,  # --candidates N: N alternatives from one request, the best is kept
+            status="[BlueprintAgent is designing the product...]",
+            system_prompt="""You are a product designer. Based on the market analysis and opportunities,
 create a brief product blueprint including:
 - Key features (3-5)
 - User journey (2-3 steps)
-Keep it concise - 150 words."""
-
-        user_message = f"""Market Analysis:
-{self.outputs['analysis']}
-
-Create a product blueprint for our platform."""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=Config.AGENT_TEMPERATURE,
-            max_tokens=Config.AGENT_MAX_TOKENS,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-        )
-
-        self.outputs["blueprint"] = response.choices[0].message.content
-        print("\n[BlueprintAgent Output]")
-        print(self.outputs["blueprint"])
-
-    def phase_review(self):
-        """Phase 4: Strategic Review"""
-        print("\n" + "="*80)
-        print("PHASE 4: STRATEGIC REVIEW")
-        print("="*80)
-        print("[ReviewerAgent is providing recommendations...]")
-
-        system_prompt = """You are a product reviewer and strategist. Review the product blueprint
+Keep it concise and within the word limit given.""",
+            inputs=(("analysis", "Market Analysis"),),
+            task="""Word limit: {word_limit}
+
+Create a product blueprint for our platform.""",
+        ),
+        PhaseSpec(
+            "review", "PHASE 4: STRATEGIC REVIEW", "ReviewerAgent",
+            tier="large",
+            status="[ReviewerAgent is providing recommendations...]",
+            system_prompt="""You are a product reviewer and strategist. Review the product blueprint
 and provide 3 strategic recommendations for success.
-Be concise - 150 words."""
+Be concise and stay within the word limit given.""",
+            inputs=(("blueprint", "Product Blueprint"),),
+            stop=("\n4.",),  # three items asked for
+            task="""Word limit: {word_limit}
 
-        user_message = f"""Product Blueprint:
-{self.outputs['blueprint']}
+Provide strategic review and recommendations.""",
+        ),
+    ]
 
-Provide strategic review and recommendations."""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            temperature=Config.AGENT_TEMPERATURE,
-            max_tokens=Config.AGENT_MAX_TOKENS,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-        )
-
-        self.outputs["review"] = response.choices[0].message.content
-        print("\n[ReviewerAgent Output]")
-        print(self.outputs["review"])
-
-    def print_summary(self):
-        """Print final summary"""
-        print("\n" + "="*80)
-        print("FINAL SUMMARY")
-        print("="*80)
-
-        print("""
+    SUMMARY = """
 This workflow demonstrated a 4-agent collaboration:
 1. ResearchAgent - Analyzed the market
 2. AnalysisAgent - Identified opportunities
@@ -188,72 +86,29 @@ This workflow demonstrated a 4-agent collaboration:
 
 Each agent received context from the previous agent's output,
 demonstrating the sequential workflow pattern of AutoGen.
-""")
-
-        # Print full results
-        print("\n" + "="*80)
-        print("FULL RESULTS - ALL PHASES")
-        print("="*80)
-        
-        print("\n" + "-"*80)
-        print("PHASE 1: MARKET RESEARCH (Full Output)")
-        print("-"*80)
-        print(self.outputs["research"])
-        
-        print("\n" + "-"*80)
-        print("PHASE 2: OPPORTUNITY ANALYSIS (Full Output)")
-        print("-"*80)
-        print(self.outputs["analysis"])
-        
-        print("\n" + "-"*80)
-        print("PHASE 3: PRODUCT BLUEPRINT (Full Output)")
-        print("-"*80)
-        print(self.outputs["blueprint"])
-        
-        print("\n" + "-"*80)
-        print("PHASE 4: STRATEGIC REVIEW (Full Output)")
-        print("-"*80)
-        print(self.outputs["review"])
-
-        # Save to file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f"workflow_outputs_{timestamp}.txt"
-        with open(output_file, 'w') as f:
-            f.write("="*80 + "\n")
-            f.write("AUTOGEN INTERVIEW PLATFORM WORKFLOW - FULL RESULTS\n")
-            f.write("="*80 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Model: {self.model}\n\n")
-            
-            f.write("\n" + "-"*80 + "\n")
-            f.write("PHASE 1: MARKET RESEARCH\n")
-            f.write("-"*80 + "\n")
-            f.write(self.outputs["research"] + "\n")
-            
-            f.write("\n" + "-"*80 + "\n")
-            f.write("PHASE 2: OPPORTUNITY ANALYSIS\n")
-            f.write("-"*80 + "\n")
-            f.write(self.outputs["analysis"] + "\n")
-            
-            f.write("\n" + "-"*80 + "\n")
-            f.write("PHASE 3: PRODUCT BLUEPRINT\n")
-            f.write("-"*80 + "\n")
-            f.write(self.outputs["blueprint"] + "\n")
-            
-            f.write("\n" + "-"*80 + "\n")
-            f.write("PHASE 4: STRATEGIC REVIEW\n")
-            f.write("-"*80 + "\n")
-            f.write(self.outputs["review"] + "\n")
-        
-        print(f"\n💾 Full results saved to: {output_file}")
-
-        print(f"\nEnd Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*80)
+"""
+    REPORT_TITLE = "AUTOGEN INTERVIEW PLATFORM WORKFLOW - FULL RESULTS"
+    OUTPUT_PREFIX = "workflow_outputs"
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simplified interview platform planning workflow")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream tokens to the console as they arrive")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run, skipping the phases it already completed")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Run every phase instead of reusing unchanged stored results")
+    parser.add_argument("--speculate", action="store_true",
+                        help="Start downstream phases on partial upstream output")
+    parser.add_argument("--candidates", type=int, metavar="N",
+                        help="Candidates for the multi-sample phases (default Config.MULTI_SAMPLE_CANDIDATES = 1, off)")
+    args = parser.parse_args()
+
     try:
-        workflow = SimpleInterviewPlatformWorkflow()
+        workflow = SimpleInterviewPlatformWorkflow(stream=args.stream, resume=args.resume,
+                                                   speculate=args.speculate or None, fresh=args.fresh,
+                                                   candidates=args.candidates)
         workflow.run()
         print("\n✅ Workflow completed successfully!")
     except Exception as e:
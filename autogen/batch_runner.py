@@ -0,0 +1,152 @@
+"""
+Batch Runner - Four-Phase Product Planning over a File of Briefs
+
+Runs the SimpleInterviewPlatformWorkflow (research → analysis → blueprint →
+review) once per brief in a JSONL file, with a bounded number of workflows in
+flight on a single event loop. Each result is appended to the output JSONL as
+soon as its workflow finishes, so a long overnight run can be tailed and a
+crash loses at most the in-flight briefs. ``--resume results.jsonl`` appends
+to an earlier results file and skips every brief it already holds as "ok".
+The results file is the batch's checkpoint, so individual workflows do not
+write run directories.
+
+Brief format (one JSON object per line, every field optional):
+    {"id": "acme-hiring", "topic": "AI-powered interview platforms",
+     "product": "AI interview platform",
+     "competitors": ["HireVue", "Pymetrics", "Codility"],
+     "word_limit": 150, "word_limits": {"review": 100}}
+
+Usage:
+    python batch_runner.py briefs.jsonl --concurrency 16 --output results.jsonl
+    python batch_runner.py briefs.jsonl --resume results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Set, Tuple
+
+from config import Config
+from autogen_simple_demo import SimpleInterviewPlatformWorkflow
+
+
+def read_briefs(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (brief_id, brief) pairs lazily so huge files are never fully loaded"""
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            brief = json.loads(line)
+            yield str(brief.pop("id", line_number)), brief
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """IDs of the briefs a previous run of this results file finished successfully"""
+    done = set()
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by the crash being resumed from
+                if record.get("status") == "ok":
+                    done.add(record["id"])
+    return done
+
+
+async def run_brief(brief_id: str, brief: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one workflow quietly and package its outcome as a result record"""
+    started = time.perf_counter()
+    workflow = SimpleInterviewPlatformWorkflow(brief=brief, verbose=False, checkpoint=False)
+    record = {"id": brief_id, "run_id": workflow.run_id, "brief": workflow.brief, "model": workflow.model}
+    try:
+        scheduler = await workflow.generate()
+        record.update(status="ok", outputs=workflow.outputs,
+                      critical_path_seconds=round(scheduler.critical_path()[1], 3))
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}",
+                      outputs=workflow.outputs)
+    record["metadata"] = workflow.metadata
+    record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    record["completed_at"] = datetime.now().isoformat(timespec="seconds")
+    return record
+
+
+async def run_batch(briefs_path: Path, output_path: Path, concurrency: int,
+                    skip: Set[str] = frozenset()) -> Dict[str, int]:
+    """
+    Run every brief with at most ``concurrency`` workflows in flight.
+
+    Args:
+        briefs_path: JSONL file of briefs
+        output_path: Results JSONL, appended to
+        concurrency: Maximum number of workflows in flight
+        skip: Brief IDs that already have a successful result
+
+    Returns:
+        Dict[str, int]: Counts of completed, succeeded and failed briefs
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"completed": 0, "ok": 0, "error": 0}
+    started = time.perf_counter()
+
+    async def produce():
+        for item in read_briefs(briefs_path):
+            if item[0] not in skip:
+                await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    with open(output_path, "a") as out:
+        async def work():
+            while (item := await queue.get()) is not None:
+                record = await run_brief(*item)
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                counts["completed"] += 1
+                counts[record["status"]] += 1
+                print(f"[{counts['completed']}] {record['id']}: {record['status']} "
+                      f"({record['elapsed_seconds']:.1f}s, "
+                      f"{time.perf_counter() - started:.0f}s elapsed)")
+
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the four-phase workflow over a JSONL file of briefs")
+    parser.add_argument("briefs", type=Path, help="JSONL file with one brief per line")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum number of workflows in flight (default: 8)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results JSONL, appended to (default: batch_results_<timestamp>.jsonl)")
+    parser.add_argument("--resume", type=Path, default=None, metavar="RESULTS",
+                        help="Append to an earlier results JSONL, skipping briefs it has as ok")
+    args = parser.parse_args()
+
+    if not Config.validate_setup():
+        print("ERROR: Configuration validation failed!")
+        exit(1)
+
+    output_path = args.resume or args.output or Path(
+        Config.OUTPUT_DIR, f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    print(f"Running briefs from {args.briefs} with concurrency {args.concurrency}")
+    skip = completed_ids(output_path) if args.resume else set()
+    if skip:
+        print(f"Resuming: skipping {len(skip)} brief(s) already completed")
+    print(f"Writing results to {output_path}\n")
+
+    counts = asyncio.run(run_batch(args.briefs, output_path, max(1, args.concurrency), skip))
+
+    print(f"\n✅ Batch finished: {counts['ok']} succeeded, {counts['error']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Local best-of selection for multi-sample phases
+
+Getting alternatives (competing blueprints, several pricing options) used to
+mean rerunning the whole workflow. A phase that declares ``candidates=N``
+now gets N samples from one request (see llm_client.chat_candidates), and
+``CandidateSelector`` keeps the best one by a local score, with no extra
+model call:
+
+- coverage: share of the required sections (the "- Key features" bullets of
+  the system prompt, or ``PhaseSpec.sections``) the candidate mentions
+- length: fit to the phase's word budget; short answers and overshoots lose
+
+Candidates at least Config.CANDIDATE_DUPLICATE_SIMILARITY alike to a
+better-ranked one are dropped as duplicates; the distinct runners-up are
+kept as alternatives for the report.
+
+Usage:
+    from candidates import CandidateSelector, required_sections
+
+    selector = CandidateSelector(metadata=self.metadata)
+    texts = await chat_candidates(client, n=3, ...)
+    best, alternatives = selector.select("blueprint", texts, words=150,
+                                         sections=required_sections(system_prompt))
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from shared_config import Config
+from speculation import similarity
+
+_BULLET = re.compile(r"^\s*[-*•]\s+([^(:\n]+)", re.MULTILINE)
+_WORD = re.compile(r"[a-z]{4,}")
+
+# Weight of section coverage vs length fit in the score
+COVERAGE_WEIGHT = 0.6
+
+
+def required_sections(prompt: str) -> Tuple[str, ...]:
+    """Sections a prompt asks for as bullets ("- Key features (3-5)" → "Key features")"""
+    return tuple(match.strip() for match in _BULLET.findall(prompt or "") if match.strip())
+
+
+def coverage(text: str, sections: Sequence[str]) -> float:
+    """Share of sections whose significant words all appear in text (1.0 when none are required)"""
+    if not sections:
+        return 1.0
+    words = set(_WORD.findall(text.lower()))
+    covered = sum(all(word in words for word in _WORD.findall(section.lower()))
+                  for section in sections)
+    return covered / len(sections)
+
+
+def length_fit(text: str, words: Optional[int]) -> float:
+    """1.0 at the word budget, falling off linearly for shorter or longer answers"""
+    if not words:
+        return 1.0
+    count = len(text.split())
+    if count <= words:
+        return count / words
+    return max(0.0, 1.0 - (count - words) / words)
+
+
+def score_candidate(text: str, words: Optional[int] = None, sections: Sequence[str] = ()) -> float:
+    """Local quality score of a candidate, from 0.0 to 1.0"""
+    if not (text or "").strip():
+        return 0.0
+    return COVERAGE_WEIGHT * coverage(text, sections) + (1 - COVERAGE_WEIGHT) * length_fit(text, words)
+
+
+def rank_candidates(texts: Sequence[str], words: Optional[int] = None, sections: Sequence[str] = (),
+                    duplicate_similarity: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Score and rank candidates, marking near-duplicates of better ones.
+
+    Args:
+        texts: Candidate texts
+        words: Declared word budget of the phase
+        sections: Required section names
+        duplicate_similarity: Similarity at which a candidate counts as a
+                              duplicate (default Config.CANDIDATE_DUPLICATE_SIMILARITY)
+
+    Returns:
+        List of {"index", "score", "duplicate_of"} dicts, best first
+    """
+    threshold = (Config.CANDIDATE_DUPLICATE_SIMILARITY if duplicate_similarity is None
+                 else duplicate_similarity)
+    ranked = sorted(({"index": i, "score": score_candidate(text, words, sections), "duplicate_of": None}
+                     for i, text in enumerate(texts)), key=lambda entry: -entry["score"])
+    kept: List[int] = []
+    for entry in ranked:
+        for index in kept:
+            if similarity(texts[entry["index"]], texts[index]) >= threshold:
+                entry["duplicate_of"] = index
+                break
+        else:
+            kept.append(entry["index"])
+    return ranked
+
+
+class CandidateSelector:
+    """Picks the best candidate per phase and records the scores for the report"""
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            metadata: Run metadata dict that receives "candidates" and "candidate_duplicates"
+        """
+        self.metadata = metadata
+        self.selections: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def select(self, phase: str, texts: Sequence[str], words: Optional[int] = None,
+               sections: Sequence[str] = ()) -> Tuple[str, List[str]]:
+        """
+        Keep the best candidate of a phase.
+
+        Returns:
+            Tuple of (best text, distinct runners-up, best first)
+        """
+        ranked = rank_candidates(texts, words, sections)
+        with self._lock:
+            self.selections[phase] = ranked
+            if self.metadata is not None:
+                self.metadata["candidates"] = sum(len(r) for r in self.selections.values())
+                self.metadata["candidate_duplicates"] = sum(
+                    entry["duplicate_of"] is not None for r in self.selections.values() for entry in r)
+        alternatives = [texts[entry["index"]] for entry in ranked[1:] if entry["duplicate_of"] is None]
+        return texts[ranked[0]["index"]], alternatives
+
+    def print_report(self) -> None:
+        """Print each multi-sample phase's candidate scores and which one was kept"""
+        if not self.selections:
+            return
+        print("\n" + "="*80)
+        print("CANDIDATE SELECTION")
+        print("="*80)
+        for phase, ranked in self.selections.items():
+            scores = "  ".join(
+                f"#{entry['index'] + 1} {entry['score']:.2f}"
+                + (f" (dup of #{entry['duplicate_of'] + 1})" if entry["duplicate_of"] is not None else "")
+                for entry in ranked)
+            print(f"  {phase:<12} kept #{ranked[0]['index'] + 1} of {len(ranked)}  |  {scores}")
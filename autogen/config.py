@@ -25,7 +25,7 @@ from typing import List, Dict, Any
 # Add parent directory to path to import shared_config
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from shared_config import Config as SharedConfig
+from shared_config import Config as SharedConfig, get_http_client
 
 
 class Config(SharedConfig):
@@ -38,7 +38,6 @@ class Config(SharedConfig):
 
     # AutoGen-specific settings
     HUMAN_INPUT_MODE = "NEVER"  # Agents operate autonomously
-    MAX_RETRIES = 2  # Retry failed API calls
 
     # Output Settings
     OUTPUT_DIR = str(Path(__file__).parent)
@@ -59,8 +58,14 @@ class Config(SharedConfig):
             "api_type": "openai",  # Works for both OpenAI and Groq
         }
 
-        # Always include api_base (needed for Groq)
-        config["api_base"] = cls.API_BASE
+        # Always include the base URL (needed for Groq); openai>=1 calls it base_url
+        config["base_url"] = cls.API_BASE
+
+        # Reuse the process-wide keep-alive pool instead of one client per agent
+        config["http_client"] = get_http_client()
+
+        # Workflows retry through retry_policy (Config.MAX_RETRIES); keep the SDK from retrying too
+        config["max_retries"] = 0
 
         return [config]
 
@@ -97,30 +102,40 @@ Configuration Summary:
 
 
 class AgentConfig:
-    """Configuration for individual agents"""
+    """
+    Configuration for individual agents
+
+    "tier" picks the model through model_router: "fast" (small, cheap) or
+    "large"; fast-tier output that fails the router's check is retried on
+    the large tier.
+    """
 
     RESEARCH_AGENT = {
         "name": "ResearchAgent",
         "role": "Market Researcher",
         "temperature": 0.7,
+        "tier": "fast",
     }
 
     ANALYSIS_AGENT = {
         "name": "AnalysisAgent",
         "role": "Product Analyst",
         "temperature": 0.7,
+        "tier": "fast",
     }
 
     BLUEPRINT_AGENT = {
         "name": "BlueprintAgent",
         "role": "Product Designer",
         "temperature": 0.7,
+        "tier": "fast",
     }
 
     REVIEWER_AGENT = {
         "name": "ReviewerAgent",
         "role": "Product Reviewer",
         "temperature": 0.7,
+        "tier": "large",
     }
 
     @classmethod
@@ -138,12 +153,28 @@ class AgentConfig:
 class WorkflowConfig:
     """Configuration for workflow parameters"""
 
-    # Workflow phases
+    # Phases of the full AutoGen workflow (autogen_interview_platform.py), in
+    # order. Each entry becomes a pipeline.PhaseSpec: "agent" names the AutoGen
+    # agent whose system message opens the prompt, "inputs" lists the upstream
+    # outputs it reads as (output key, context title), "tier" is the agent's model
+    # tier, and model / temperature / max_tokens override the defaults for that
+    # phase (None = Config default).
     PHASES = [
-        "research",
-        "analysis",
-        "blueprint",
-        "review",
+        {"name": "research", "title": "PHASE 1: MARKET RESEARCH", "agent": "ResearchAgent",
+         "inputs": (), "tier": AgentConfig.RESEARCH_AGENT["tier"],
+         "model": None, "temperature": None, "max_tokens": None},
+        {"name": "analysis", "title": "PHASE 2: MARKET GAP ANALYSIS", "agent": "AnalysisAgent",
+         "inputs": (("research", "MARKET RESEARCH"),),
+         "tier": AgentConfig.ANALYSIS_AGENT["tier"],
+         "model": None, "temperature": None, "max_tokens": None},
+        {"name": "blueprint", "title": "PHASE 3: PRODUCT BLUEPRINT", "agent": "BlueprintAgent",
+         "inputs": (("research", "MARKET RESEARCH"), ("analysis", "OPPORTUNITY ANALYSIS")),
+         "tier": AgentConfig.BLUEPRINT_AGENT["tier"],
+         "model": None, "temperature": None, "max_tokens": None},
+        {"name": "review", "title": "PHASE 4: PRODUCT REVIEW & RECOMMENDATIONS", "agent": "ReviewerAgent",
+         "inputs": (("blueprint", "PRODUCT BLUEPRINT"),),
+         "tier": AgentConfig.REVIEWER_AGENT["tier"],
+         "model": None, "temperature": None, "max_tokens": None},
     ]
 
     # Phase descriptions
@@ -154,12 +185,59 @@ class WorkflowConfig:
         "review": "Strategic Review & Recommendations",
     }
 
-    # Task descriptions
+    # Task of each phase: the variable tail sent after the agent's system
+    # message and the phase inputs
     TASK_DESCRIPTIONS = {
-        "research": "Conduct market analysis for AI-powered interview platforms",
-        "analysis": "Identify 3 key market opportunities and gaps",
-        "blueprint": "Create product blueprint with features and user flows",
-        "review": "Review blueprint and provide strategic recommendations",
+        "research": """Please conduct a comprehensive market analysis for AI-powered
+interview platforms. Focus on:
+
+1. Current market leaders and their key features
+2. Market trends and innovations
+3. Unmet needs and gaps
+
+Provide your analysis in a structured format.""",
+        "analysis": """Based on the market research above, identify 3 key
+opportunities for an AI-powered interview platform.
+
+Please provide detailed analysis of market gaps and opportunities.""",
+        "blueprint": """Based on the market research and opportunity analysis above,
+create a comprehensive product blueprint for an AI-powered interview platform.
+
+Please create a detailed product blueprint with features, user journey, and differentiation.""",
+        "review": """Please review the product blueprint above and provide
+strategic recommendations, feasibility assessment, and next steps.
+
+Provide comprehensive review with actionable recommendations.""",
+    }
+
+    # Default brief for the simplified four-phase workflow. Batch runs override
+    # these per line of a briefs JSONL file.
+    DEFAULT_BRIEF = {
+        "topic": "AI-powered interview platforms",
+        "product": "AI interview platform",
+        "competitors": ["HireVue", "Pymetrics", "Codility"],
+        "word_limit": 150,
+    }
+
+    # Prompt + completion token budget per phase (see TOKEN_BUDGET_POLICY);
+    # phases not listed use PHASE_TOKEN_BUDGET
+    PHASE_TOKEN_BUDGETS = {
+        "research": 4000,
+        "analysis": 6000,
+        "blueprint": 8000,
+        "pricing": 6000,
+        "review": 8000,
+    }
+
+    # Token ceiling for the handoff brief of each upstream output when
+    # COMPACTION_ENABLED is set (outputs not listed use COMPACTION_MAX_TOKENS)
+    HANDOFF_TOKEN_CEILINGS = {
+        "research": 400,
+        "analysis": 350,
+        "blueprint": 500,
+        "pricing": 250,
+        "theme": 250,
+        "agenda": 450,
     }
 
     @classmethod
@@ -0,0 +1,11 @@
+"""
+pytest setup for the AutoGen tests
+
+The shared modules (shared_config, rate_limiter, llm_cache, ...) live in the
+repository root, which config.py normally puts on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
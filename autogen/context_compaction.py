@@ -0,0 +1,228 @@
+"""
+Inter-phase context compaction for the AutoGen demo workflows
+
+Downstream phases used to receive every upstream output verbatim, so prompt
+size (and latency and cost) grew with each phase. ``HandoffCompactor`` turns
+an upstream output into a bounded "handoff brief" before it is interpolated
+into the next prompt:
+
+- ``extractive`` (default): a local sentence scorer keeps the highest-value
+  sentences (frequent content words, numbers, named entities, headings) in
+  their original order until the token ceiling is reached. No API call.
+- ``model``: a cheap model (Config.COMPACTION_MODEL) writes the brief, and
+  the extractive scorer is the fallback when that call fails or overshoots.
+
+Each upstream output is compacted once and reused by every consumer. The
+compactor records original vs brief tokens so a run can report what it saved.
+
+Usage:
+    from context_compaction import HandoffCompactor
+
+    compactor = HandoffCompactor(WorkflowConfig.HANDOFF_TOKEN_CEILINGS, metadata=self.metadata)
+    research = await compactor.brief("research", self.outputs["research"], client=self.client)
+"""
+
+import asyncio
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from token_counter import count_tokens
+from shared_config import Config
+
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just more most my no
+nor not now of off on once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours
+""".split())
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9*-])")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    return (stripped.startswith("#")
+            or (stripped.startswith("**") and stripped.endswith("**"))
+            or (stripped.endswith(":") and len(stripped) <= 60))
+
+
+def extractive_brief(text: str, max_tokens: int) -> str:
+    """
+    Keep the highest-scoring sentences of text, in order, within max_tokens.
+
+    Args:
+        text: Upstream phase output
+        max_tokens: Token ceiling for the brief
+
+    Returns:
+        str: text unchanged if it already fits, otherwise the extractive brief
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # Units are (line index, sentence) pairs so line structure survives reassembly
+    units: List[Tuple[int, str]] = []
+    for line_index, line in enumerate(text.splitlines()):
+        if not line.strip():
+            continue
+        if _is_heading(line):
+            units.append((line_index, line.strip()))
+        else:
+            units.extend((line_index, s) for s in _SENTENCE_SPLIT.split(line.strip()) if s)
+
+    frequencies = Counter(
+        word.lower() for _, unit in units for word in _WORD.findall(unit)
+        if word.lower() not in STOPWORDS
+    )
+
+    scores = []
+    for position, (line_index, unit) in enumerate(units):
+        words = [w.lower() for w in _WORD.findall(unit)]
+        content = [w for w in words if w not in STOPWORDS]
+        score = sum(frequencies[w] for w in content) / math.sqrt(len(words) + 1)
+        score += 1.5 * len(re.findall(r"\d+(?:[.,]\d+)?%?", unit))         # figures, prices
+        score += 0.5 * len(re.findall(r"\b[A-Z][a-z]+\b", unit)[1:])       # names, not sentence starts
+        if _is_heading(unit):
+            score *= 1.5
+        if position == 0:
+            score *= 1.25
+        scores.append(score)
+
+    chosen = set()
+    used = 0
+    for index in sorted(range(len(units)), key=lambda i: scores[i], reverse=True):
+        cost = count_tokens(units[index][1]) + 1
+        if used + cost <= max_tokens:
+            chosen.add(index)
+            used += cost
+
+    lines: Dict[int, List[str]] = {}
+    for index in sorted(chosen):
+        line_index, unit = units[index]
+        lines.setdefault(line_index, []).append(unit)
+    return "\n".join(" ".join(parts) for _, parts in sorted(lines.items()))
+
+
+class HandoffCompactor:
+    """Compacts upstream phase outputs into bounded handoff briefs"""
+
+    def __init__(self, ceilings: Optional[Dict[str, int]] = None, method: Optional[str] = None,
+                 model: Optional[str] = None, enabled: Optional[bool] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            ceilings: Token ceiling per upstream phase (Config.COMPACTION_MAX_TOKENS otherwise)
+            method: "extractive" or "model" (default Config.COMPACTION_METHOD)
+            model: Cheap model used by the "model" method
+            enabled: Compact at all (default Config.COMPACTION_ENABLED)
+            metadata: Run metadata dict that receives "handoff_tokens_saved"
+        """
+        self.ceilings = ceilings or {}
+        self.method = method or Config.COMPACTION_METHOD
+        self.model = model or Config.COMPACTION_MODEL
+        self.enabled = Config.COMPACTION_ENABLED if enabled is None else enabled
+        self.metadata = metadata
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._briefs: Dict[Tuple[str, int], Any] = {}
+        self._lock = threading.Lock()
+
+    def ceiling(self, key: str) -> int:
+        return self.ceilings.get(key, Config.COMPACTION_MAX_TOKENS)
+
+    def _record(self, key: str, text: str, brief: str) -> None:
+        with self._lock:
+            entry = self.stats.setdefault(key, {"original": count_tokens(text),
+                                                "brief": count_tokens(brief), "uses": 0})
+            entry["uses"] += 1
+            if self.metadata is not None:
+                self.metadata["handoff_tokens_saved"] = self.tokens_saved()
+
+    def compact(self, key: str, text: str) -> str:
+        """Blocking, extractive-only brief for thread-based workflows"""
+        if not self.enabled:
+            return text
+        with self._lock:
+            brief = self._briefs.get((key, hash(text)))
+        if brief is None:
+            brief = extractive_brief(text, self.ceiling(key))
+            with self._lock:
+                self._briefs[(key, hash(text))] = brief
+        self._record(key, text, brief)
+        return brief
+
+    async def brief(self, key: str, text: str, client=None) -> str:
+        """
+        Get the handoff brief for an upstream output (compacted once, then reused).
+
+        Args:
+            key: Upstream phase / output name, used to pick the ceiling
+            text: Upstream output
+            client: AsyncOpenAI-compatible client, needed by the "model" method
+
+        Returns:
+            str: The brief, or text unchanged when compaction is disabled
+        """
+        if not self.enabled:
+            return text
+        cache_key = (key, hash(text))
+        task = self._briefs.get(cache_key)
+        if task is None:
+            if self.method == "model" and client is not None:
+                task = asyncio.ensure_future(self._model_brief(key, text, client))
+            else:
+                task = asyncio.get_running_loop().create_future()
+                task.set_result(extractive_brief(text, self.ceiling(key)))
+            self._briefs[cache_key] = task
+        brief = await task
+        self._record(key, text, brief)
+        return brief
+
+    async def _model_brief(self, key: str, text: str, client) -> str:
+        from llm_client import chat_completion
+
+        ceiling = self.ceiling(key)
+        if count_tokens(text) <= ceiling:
+            return text
+        try:
+            brief = await chat_completion(
+                client,
+                model=self.model,
+                temperature=0.0,
+                max_tokens=ceiling,
+                messages=[
+                    {"role": "system", "content": (
+                        "Condense the following document into a handoff brief for the next "
+                        f"specialist. Stay under {int(ceiling * 0.75)} words. Keep every name, "
+                        "number, decision and recommendation; drop repetition and filler.")},
+                    {"role": "user", "content": text},
+                ],
+                metadata=self.metadata,
+            )
+        except Exception as e:
+            if Config.VERBOSE:
+                print(f"⚠️  Handoff compaction for '{key}' fell back to extractive: {e}")
+            return extractive_brief(text, ceiling)
+        return extractive_brief(brief, ceiling)
+
+    def tokens_saved(self) -> int:
+        """Prompt tokens avoided so far: (original - brief) for every use of a brief"""
+        return sum((s["original"] - s["brief"]) * s["uses"] for s in self.stats.values())
+
+    def print_report(self) -> None:
+        """Print original vs brief size per upstream output and the total saved"""
+        if not self.enabled or not self.stats:
+            return
+        print("\n" + "="*80)
+        print(f"HANDOFF COMPACTION ({self.method})")
+        print("="*80)
+        for key, s in self.stats.items():
+            print(f"  {key:<12} {s['original']:>6} → {s['brief']:>5} tokens "
+                  f"(ceiling {self.ceiling(key)}, used {s['uses']}x)")
+        print(f"  Prompt tokens saved this run: {self.tokens_saved()}")
@@ -0,0 +1,187 @@
+"""
+Adaptive completion limits for the AutoGen demo workflows
+
+Every phase prompt asks for a bounded answer ("Be concise - 150 words"), yet
+each request used to reserve Config.AGENT_MAX_TOKENS (2000) completion
+tokens. That inflates the TPM reservation under rate limits and lets a
+runaway generation run for 2000 tokens.
+
+``LengthBudget.limit`` derives ``max_tokens`` from the phase's declared word
+budget (``PhaseSpec.words``, or the "N words" / "Word limit: N" found in its
+prompts):
+
+    words × tokens-per-word × Config.LENGTH_HEADROOM × boost
+
+Tokens per word starts at Config.TOKENS_PER_WORD and, once a phase has
+Config.LENGTH_MIN_SAMPLES observed completions, becomes the 95th percentile
+of what that phase actually produced. Every truncated completion
+(``finish_reason == "length"``) raises the phase's boost, and completions
+that fit let it decay back towards 1. Observations are kept per workflow,
+phase and model in a small SQLite store (Config.LENGTH_STATS_PATH), so the
+limits tune themselves across runs. Limits are rounded up to a multiple of
+64 tokens so that small shifts keep request (and response cache) keys stable.
+
+Phases without a declared word budget keep the configured ceiling.
+
+Usage:
+    from length_budget import LengthBudget, declared_words
+
+    lengths = LengthBudget("FiveAgentWorkflow", model=model, metadata=self.metadata)
+    words = declared_words(system_prompt + task)
+    max_tokens = lengths.limit("review", words, ceiling=Config.AGENT_MAX_TOKENS)
+    ...
+    lengths.record("review", words, max_tokens, content, finish_reason, usage)
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from llm_cache import ResponseCache
+from shared_config import Config
+from token_counter import count_tokens
+
+_WORD_BUDGET = re.compile(r"(\d+)\s+words\b|word limit:\s*(\d+)", re.IGNORECASE)
+
+# Observed tokens-per-word ratios kept per phase; older ones age out
+MAX_SAMPLES = 50
+MAX_BOOST = 4.0
+
+_stats_store: Optional[ResponseCache] = None
+_stats_lock = threading.Lock()
+
+
+def get_length_store() -> Optional[ResponseCache]:
+    """Get the process-wide length statistics store, or None when adaptive limits are off"""
+    global _stats_store
+    if not Config.ADAPTIVE_MAX_TOKENS:
+        return None
+    with _stats_lock:
+        if _stats_store is None:
+            _stats_store = ResponseCache(Config.LENGTH_STATS_PATH, max_entries=1000)
+    return _stats_store
+
+
+def declared_words(text: str) -> Optional[int]:
+    """Tightest word budget stated in a prompt ("in 150 words", "Word limit: 150"), if any"""
+    budgets = [int(a or b) for a, b in _WORD_BUDGET.findall(text or "")]
+    return min(budgets) if budgets else None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class LengthBudget:
+    """Derives per-phase max_tokens from word budgets and tunes it from observed lengths"""
+
+    def __init__(self, workflow: str, model: Optional[str] = None, enabled: Optional[bool] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            workflow: Workflow name; statistics are kept per workflow, phase and model
+            model: Default model for token counting
+            enabled: Derive limits at all (default Config.ADAPTIVE_MAX_TOKENS)
+            metadata: Run metadata dict that receives "truncations"
+        """
+        self.workflow = workflow
+        self.model = model
+        self.enabled = Config.ADAPTIVE_MAX_TOKENS if enabled is None else enabled
+        self.metadata = metadata
+        self.store = get_length_store() if self.enabled else None
+        self.calls: List[Dict[str, Any]] = []
+        self.truncated = set()
+        self._lock = threading.Lock()
+
+    def _key(self, phase: str, model: Optional[str]) -> str:
+        return f"{self.workflow}|{phase}|{model or self.model}"
+
+    def _stats(self, phase: str, model: Optional[str]) -> Dict[str, Any]:
+        stats = self.store.get(self._key(phase, model)) if self.store is not None else None
+        return stats or {"ratios": [], "calls": 0, "truncations": 0, "boost": 1.0}
+
+    def limit(self, phase: str, words: Optional[int], ceiling: int, model: Optional[str] = None) -> int:
+        """
+        Completion limit for a phase.
+
+        Args:
+            phase: Phase name
+            words: Declared word budget (None keeps the ceiling)
+            ceiling: Configured max_tokens, never exceeded
+            model: Model the request goes to
+
+        Returns:
+            int: max_tokens for the request
+        """
+        if not self.enabled or not words:
+            return ceiling
+        stats = self._stats(phase, model)
+        ratio = Config.TOKENS_PER_WORD
+        if len(stats["ratios"]) >= Config.LENGTH_MIN_SAMPLES:
+            ratio = percentile(stats["ratios"], 0.95)
+        tokens = words * ratio * Config.LENGTH_HEADROOM * stats["boost"]
+        tokens = 64 * math.ceil(tokens / 64)
+        return max(min(tokens, ceiling), min(Config.LENGTH_MIN_TOKENS, ceiling))
+
+    def record(self, phase: str, words: Optional[int], max_tokens: int, content: str,
+               finish_reason: Optional[str] = None, usage: Any = None,
+               model: Optional[str] = None) -> None:
+        """
+        Book an observed completion.
+
+        Args:
+            phase: Phase name
+            words: Declared word budget the limit was derived from
+            max_tokens: Limit the request was sent with
+            content: Completion text
+            finish_reason: Provider finish reason; "length" means truncated
+            usage: ``response.usage`` (object or dict); counted locally when missing
+            model: Model the request went to
+        """
+        if usage is not None:
+            get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+            completion = get("completion_tokens") or count_tokens(content, model or self.model)
+        else:
+            completion = count_tokens(content, model or self.model)
+        truncated = finish_reason == "length"
+
+        with self._lock:
+            self.calls.append({"phase": phase, "words": words, "max_tokens": max_tokens,
+                               "completion": completion, "truncated": truncated})
+            if truncated:
+                self.truncated.add(phase)
+            else:
+                self.truncated.discard(phase)
+            if self.metadata is not None:
+                self.metadata["truncations"] = sum(c["truncated"] for c in self.calls)
+
+            if self.store is None or not words:
+                return
+            stats = self._stats(phase, model)
+            stats["calls"] += 1
+            if truncated:
+                # A truncated length is only a lower bound, so it widens the limit instead
+                stats["truncations"] += 1
+                stats["boost"] = min(MAX_BOOST, stats["boost"] * 1.25)
+            else:
+                stats["ratios"] = (stats["ratios"] + [completion / words])[-MAX_SAMPLES:]
+                stats["boost"] = max(1.0, stats["boost"] * 0.95)
+            self.store.set(self._key(phase, model), stats)
+
+    def print_report(self) -> None:
+        """Print declared budget, limit and actual length per call, plus truncations"""
+        if not self.enabled or not self.calls:
+            return
+        print("\n" + "="*80)
+        print("COMPLETION LENGTHS")
+        print("="*80)
+        for call in self.calls:
+            words = call["words"] or "-"
+            print(f"  {call['phase']:<12} budget {words:>5} words  max_tokens {call['max_tokens']:>5}  "
+                  f"used {call['completion']:>5}" + ("  TRUNCATED" if call["truncated"] else ""))
+        truncated = sum(c["truncated"] for c in self.calls)
+        reserved = sum(c["max_tokens"] for c in self.calls)
+        print(f"  Truncated: {truncated}/{len(self.calls)} | completion tokens reserved: {reserved}")
@@ -0,0 +1,370 @@
+"""
+Chat completion helper shared by the AutoGen demo workflows
+
+Every phase goes through ``chat_completion`` so that behavior such as
+streaming, response caching, rate limiting, retries, token budgets and
+tracing is implemented once instead of in each ``phase_*`` method. Each call
+is one "chat <model>" span (see tracing.py) carrying its tokens, cost,
+retries and whether the response cache answered it.
+
+Usage:
+    from llm_client import chat_completion
+
+    text = await chat_completion(
+        client,
+        model=Config.OPENAI_MODEL,
+        temperature=Config.AGENT_TEMPERATURE,
+        max_tokens=Config.AGENT_MAX_TOKENS,
+        messages=messages,
+        stream=True,
+        echo=[sys.stdout],
+        metadata=self.metadata,   # receives retry / hedge counts
+        budget=self.budget,       # optional TokenBudget for the run
+    )
+
+    # Several alternatives from one round-trip (parallel requests on Groq)
+    texts = await chat_candidates(client, n=3, model=..., messages=messages, ...)
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO
+
+from llm_cache import ResponseCache, get_response_cache
+from phase_scheduler import current_phase
+from rate_limiter import estimate_request_tokens, estimate_text_tokens, get_rate_limiter
+from retry_policy import RetryPolicy, call_with_retries, is_retryable
+from shared_config import Config
+from token_budget import TokenBudget
+from tracing import CACHE_HIT, MODEL, RETRIES, AnySpan, llm_attributes, trace_span
+
+
+def _emit(echo: Sequence[TextIO], text: str) -> None:
+    """Write text to every sink and flush so it shows up immediately"""
+    for sink in echo:
+        sink.write(text)
+        sink.flush()
+
+
+async def chat_completion(
+    client,
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    stream: bool = False,
+    echo: Sequence[TextIO] = (),
+    metadata: Optional[Dict[str, Any]] = None,
+    budget: Optional[TokenBudget] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+    stop: Sequence[str] = (),
+    on_finish: Optional[Callable[[str, Optional[str], Any], None]] = None,
+) -> str:
+    """
+    Run one chat completion and return the assistant text.
+
+    Args:
+        client: AsyncOpenAI-compatible client
+        model: Model name
+        messages: Chat messages
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+        stream: Request a token stream and echo tokens as they arrive
+        echo: File-like sinks (console, output file, ...) that receive the text.
+              Streaming writes each delta; buffered mode and cache hits write
+              the full text once.
+        metadata: Run metadata dict that receives "retries", "hedges" and
+                  "hedge_wins" counts
+        budget: Token budget checked before sending (may shrink messages or
+                max_tokens, or raise TokenBudgetExceeded) and charged with
+                ``response.usage`` afterwards
+        on_delta: Called with every streamed delta, e.g. to act on partial
+                  output before the completion finishes (streaming only)
+        stop: Stop sequences (at most 4 for OpenAI-compatible APIs)
+        on_finish: Called with (text, finish_reason, usage) after a fresh
+                   completion, e.g. to track truncations; not called on cache hits
+
+    Returns:
+        str: The assembled completion text
+    """
+    phase = current_phase.get()
+    if budget is not None:
+        messages, max_tokens, reserved = budget.prepare(phase, messages, max_tokens)
+
+    with trace_span(f"chat {model}", {MODEL: model, "gen_ai.operation.name": "chat", "phase.name": phase,
+                                      "gen_ai.request.max_tokens": max_tokens, "llm.stream": stream},
+                    kind="client") as span:
+        cache = get_response_cache()
+        if cache is not None:
+            key = ResponseCache.make_key(model, client.base_url, temperature, max_tokens, messages,
+                                         **({"stop": list(stop)} if stop else {}))
+            cached = await cache.get_async(key)
+            if cached is not None:
+                if budget is not None:
+                    budget.release(reserved)
+                span.set({CACHE_HIT: True})
+                _emit(echo, cached["content"] + "\n")
+                return cached["content"]
+
+        limiter = get_rate_limiter(client.base_url, model)
+        prompt_estimate = estimate_request_tokens(messages, 0, model)
+        estimate = prompt_estimate + max_tokens
+        emitted = []
+
+        async def attempt():
+            # Every attempt (retry or hedge) is paced under the provider's RPM/TPM quota
+            if limiter is not None:
+                await limiter.acquire_async(estimate)
+            # A failed or cancelled attempt is charged its prompt, so retries don't stack reservations
+            actual = prompt_estimate
+            try:
+                content, usage, finish_reason = await _create(
+                    client, model=model, messages=messages, temperature=temperature, max_tokens=max_tokens,
+                    stream=stream, echo=echo, emitted=emitted, on_delta=on_delta, stop=stop)
+                if usage is not None:
+                    actual = usage.total_tokens
+                else:
+                    actual += estimate_text_tokens(content, model)
+                return content, usage, finish_reason
+            finally:
+                if limiter is not None:
+                    await limiter.settle_async(estimate, actual)
+
+        # A stream that already echoed tokens cannot be retried without duplicating
+        # output, and hedging a stream would interleave two token streams.
+        counts = {}
+        try:
+            content, usage, finish_reason = await call_with_retries(
+                attempt,
+                RetryPolicy.from_config(),
+                metadata=counts,
+                latency_key=model,
+                hedge=Config.HEDGE_ENABLED and not stream,
+                can_retry=lambda error: not emitted and is_retryable(error),
+            )
+        except BaseException:
+            if budget is not None:
+                budget.release(reserved)
+            raise
+        finally:
+            _count_attempts(span, counts, metadata)
+        span.set({CACHE_HIT: False, "gen_ai.response.finish_reasons": [finish_reason or "unknown"],
+                  **llm_attributes(model, usage)})
+        if budget is not None:
+            budget.record(phase, reserved, messages, usage=usage, content=content)
+        if on_finish is not None:
+            on_finish(content, finish_reason, usage)
+        if not stream:
+            _emit(echo, content + "\n")
+
+        if cache is not None:
+            await cache.set_async(key, {"content": content})
+        return content
+
+
+async def chat_candidates(
+    client,
+    *,
+    n: int,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    metadata: Optional[Dict[str, Any]] = None,
+    budget: Optional[TokenBudget] = None,
+    stop: Sequence[str] = (),
+    on_finish: Optional[Callable[[str, Optional[str], Any], None]] = None,
+) -> List[str]:
+    """
+    Sample ``n`` completions for the same messages.
+
+    Providers that accept the ``n`` parameter (Config.MULTI_SAMPLE_NATIVE_N)
+    return all samples from one request, billing the prompt once. Otherwise
+    (Groq) the samples are sent as ``n`` concurrent requests. Either way the
+    candidates are cached, budgeted and retried as one unit; nothing is
+    echoed, the caller picks and prints a candidate. Arguments not listed
+    here are as in chat_completion.
+
+    Args:
+        n: Number of candidates
+        max_tokens: Completion token limit per candidate
+        on_finish: Called with (text, finish_reason, None) for every fresh candidate
+
+    Returns:
+        List[str]: The candidate texts, in the order the provider returned them
+    """
+    phase = current_phase.get()
+    if budget is not None:
+        # Every candidate can use max_tokens, so the reservation covers all of them
+        messages, total, reserved = budget.prepare(phase, messages, max_tokens * n)
+        max_tokens = max(1, total // n)
+
+    native = Config.MULTI_SAMPLE_NATIVE_N
+    with trace_span(f"chat {model}", {MODEL: model, "gen_ai.operation.name": "chat", "phase.name": phase,
+                                      "gen_ai.request.max_tokens": max_tokens, "llm.candidates": n},
+                    kind="client") as span:
+        cache = get_response_cache()
+        if cache is not None:
+            key = ResponseCache.make_key(model, client.base_url, temperature, max_tokens, messages, n=n,
+                                         **({"stop": list(stop)} if stop else {}))
+            cached = await cache.get_async(key)
+            if cached is not None:
+                if budget is not None:
+                    budget.release(reserved)
+                span.set({CACHE_HIT: True})
+                return cached["contents"]
+
+        limiter = get_rate_limiter(client.base_url, model)
+        prompt_estimate = estimate_request_tokens(messages, 0, model)
+
+        async def attempt():
+            requests = 1 if native else n
+            estimate = prompt_estimate * requests + max_tokens * n
+            if limiter is not None:
+                for _ in range(requests):
+                    await limiter.acquire_async(estimate // requests)
+            # A failed or cancelled attempt is charged its prompts, so retries don't stack reservations
+            actual = prompt_estimate * requests
+            try:
+                if native:
+                    results = await _create_samples(client, model=model, messages=messages, temperature=temperature,
+                                                    max_tokens=max_tokens, n=n, stop=stop)
+                    usage = results[0][1]
+                else:
+                    results = await asyncio.gather(*[
+                        _create(client, model=model, messages=messages, temperature=temperature,
+                                max_tokens=max_tokens, stream=False, echo=(), emitted=[], stop=stop)
+                        for _ in range(n)])
+                    usage = _sum_usage([u for _, u, _ in results])
+                if usage is not None:
+                    actual = _get(usage, "total_tokens")
+                else:
+                    actual += sum(estimate_text_tokens(c, model) for c, _, _ in results)
+                return [(content, finish_reason) for content, _, finish_reason in results], usage
+            finally:
+                if limiter is not None:
+                    await limiter.settle_async(estimate, actual)
+
+        counts = {}
+        try:
+            samples, usage = await call_with_retries(
+                attempt,
+                RetryPolicy.from_config(),
+                metadata=counts,
+                latency_key=model,
+                hedge=Config.HEDGE_ENABLED and native,
+            )
+        except BaseException:
+            if budget is not None:
+                budget.release(reserved)
+            raise
+        finally:
+            _count_attempts(span, counts, metadata)
+        span.set({CACHE_HIT: False, "gen_ai.response.finish_reasons": [reason or "unknown" for _, reason in samples],
+                  **llm_attributes(model, usage)})
+        contents = [content for content, _ in samples]
+        if budget is not None:
+            budget.record(phase, reserved, messages, usage=usage, content="".join(contents))
+        if on_finish is not None:
+            for content, finish_reason in samples:
+                on_finish(content, finish_reason, None)
+
+        if cache is not None:
+            await cache.set_async(key, {"contents": contents})
+        return contents
+
+
+def _count_attempts(span: AnySpan, counts: Dict[str, int], metadata: Optional[Dict[str, Any]]) -> None:
+    """Put one call's retry and hedge counts on its span and add them to the run metadata"""
+    span.set({RETRIES: counts.get("retries", 0), "llm.hedges": counts.get("hedges", 0)})
+    if metadata is not None:
+        for name, count in counts.items():
+            metadata[name] = metadata.get(name, 0) + count
+
+
+def _get(usage: Any, field: str) -> int:
+    return (usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)) or 0
+
+
+def _sum_usage(usages: List[Any]) -> Optional[Dict[str, int]]:
+    """Add up the usage of parallel requests, or None if any of them lacks it"""
+    if not usages or any(usage is None for usage in usages):
+        return None
+    return {field: sum(_get(usage, field) for usage in usages)
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+async def _create_samples(client, *, model, messages, temperature, max_tokens, n, stop=()):
+    """
+    One buffered request for ``n`` choices.
+
+    Returns:
+        List of (completion text, usage, finish reason) per choice; every entry
+        carries the usage of the whole request
+    """
+    extra = {"stop": list(stop)} if stop else {}
+    response = await client.chat.completions.create(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        messages=messages,
+        n=n,
+        **extra,
+    )
+    return [(choice.message.content or "", response.usage, choice.finish_reason)
+            for choice in response.choices]
+
+
+async def _create(client, *, model, messages, temperature, max_tokens, stream, echo, emitted,
+                  on_delta=None, stop=()):
+    """
+    Call the provider, streaming deltas to echo when requested.
+
+    Buffered responses are returned without echoing (the caller echoes the
+    winning attempt once). ``emitted`` gets an entry once a delta is echoed.
+
+    Returns:
+        Tuple of (completion text, usage object or None when the provider omits
+        it, finish reason or None)
+    """
+    extra = {"stop": list(stop)} if stop else {}
+    if not stream:
+        response = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            messages=messages,
+            **extra,
+        )
+        choice = response.choices[0]
+        return choice.message.content or "", response.usage, choice.finish_reason
+
+    parts = []
+    usage = None
+    finish_reason = None
+    response = await client.chat.completions.create(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        messages=messages,
+        stream=True,
+        # Streams carry no usage unless asked; it arrives in a final chunk without choices
+        stream_options={"include_usage": True},
+        **extra,
+    )
+    async for chunk in response:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if not parts:
+                emitted.append(True)
+            parts.append(delta)
+            _emit(echo, delta)
+            if on_delta is not None:
+                on_delta(delta)
+    _emit(echo, "\n")
+    return "".join(parts), usage, finish_reason
@@ -0,0 +1,184 @@
+"""
+Dependency-aware phase scheduler for the AutoGen workflows
+
+Each workflow phase declares which ``outputs`` keys it reads and which it
+writes. The scheduler builds a small DAG from those declarations, starts every
+phase whose inputs are available at the same time, and reports the critical
+path once the run is over. ``PipelineWorkflow.scheduler`` (pipeline.py) builds
+one ``Phase`` per ``PhaseSpec``, writing the output named after the spec.
+
+Usage:
+    from phase_scheduler import Phase, PhaseScheduler
+
+    phases = [Phase(spec.name, functools.partial(workflow.run_phase, spec),
+                    reads=spec.reads, writes=(spec.name,))
+              for spec in workflow.PHASES]
+    scheduler = PhaseScheduler(phases, outputs=workflow.outputs)
+    await scheduler.run_async()         # or scheduler.run() without an event loop
+    scheduler.print_report()
+"""
+
+import asyncio
+import inspect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Name of the phase being executed, visible to everything the phase calls
+# (LLM helpers, token budgets), including code running in worker threads
+current_phase: ContextVar[Optional[str]] = ContextVar("current_phase", default=None)
+
+
+@dataclass
+class Phase:
+    """A single unit of work in a workflow DAG"""
+
+    name: str
+    func: Callable[[], Any]
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+
+
+@dataclass
+class PhaseTiming:
+    """Wall-clock timing recorded for a completed phase"""
+
+    name: str
+    start: float
+    end: float
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class PhaseScheduler:
+    """Runs phases as soon as every key they read has been written"""
+
+    def __init__(self, phases: List[Phase], outputs: Optional[Dict[str, Any]] = None):
+        self.phases = {p.name: p for p in phases}
+        self.outputs = outputs if outputs is not None else {}
+        self.timings: Dict[str, PhaseTiming] = {}
+        self.wall_time = 0.0
+        self.dependencies = self._resolve_dependencies(phases)
+
+    def _resolve_dependencies(self, phases: List[Phase]) -> Dict[str, Tuple[str, ...]]:
+        """Map each phase to the phases producing the keys it reads"""
+        producers = {}
+        for p in phases:
+            for key in p.writes:
+                if key in producers:
+                    raise ValueError(
+                        f"Output '{key}' is written by both '{producers[key]}' and '{p.name}'"
+                    )
+                producers[key] = p.name
+
+        dependencies = {}
+        for p in phases:
+            deps = []
+            for key in p.reads:
+                if key in producers:
+                    deps.append(producers[key])
+                elif key not in self.outputs:
+                    raise ValueError(f"Phase '{p.name}' reads '{key}' but no phase writes it")
+            dependencies[p.name] = tuple(dict.fromkeys(deps))
+
+        # Detect cycles up front so a bad declaration fails fast instead of hanging
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Phase dependency cycle detected at '{name}'")
+            visiting.add(name)
+            for dep in dependencies[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in dependencies:
+            visit(name)
+
+        return dependencies
+
+    async def _execute(self, p: Phase, origin: float) -> None:
+        start = time.perf_counter() - origin
+        current_phase.set(p.name)  # each phase runs in its own task, so this stays local
+        if inspect.iscoroutinefunction(p.func):
+            await p.func()
+        else:
+            await asyncio.to_thread(p.func)
+        end = time.perf_counter() - origin
+        self.timings[p.name] = PhaseTiming(p.name, start, end, self.dependencies[p.name])
+
+    async def run_async(self) -> Dict[str, Any]:
+        """Execute all phases, running every ready phase concurrently"""
+        origin = time.perf_counter()
+        pending = dict(self.phases)
+        running = {}
+        completed = set()
+
+        while pending or running:
+            for name in list(pending):
+                if all(dep in completed for dep in self.dependencies[name]):
+                    task = asyncio.ensure_future(self._execute(pending.pop(name), origin))
+                    running[task] = name
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                if task.exception() is not None:
+                    for other in running:
+                        other.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
+                    raise task.exception()
+                completed.add(name)
+
+        self.wall_time = time.perf_counter() - origin
+        return self.outputs
+
+    def run(self) -> Dict[str, Any]:
+        """Synchronous entry point for callers without an event loop"""
+        return asyncio.run(self.run_async())
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Longest dependency chain by measured phase duration.
+
+        Returns:
+            Tuple of (phase names along the path, summed duration in seconds)
+        """
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name):
+            if name not in best:
+                timing = self.timings[name]
+                chains = [longest(dep) for dep in timing.depends_on]
+                prefix = max(chains, key=lambda c: c[0], default=(0.0, []))
+                best[name] = (prefix[0] + timing.duration, prefix[1] + [name])
+            return best[name]
+
+        if not self.timings:
+            return [], 0.0
+        length, path = max((longest(name) for name in self.timings), key=lambda c: c[0])
+        return path, length
+
+    def print_report(self) -> None:
+        """Print per-phase timings alongside the critical path"""
+        path, length = self.critical_path()
+        sequential = sum(t.duration for t in self.timings.values())
+
+        print("\n" + "-"*80)
+        print("PHASE SCHEDULE")
+        print("-"*80)
+        for timing in sorted(self.timings.values(), key=lambda t: t.start):
+            deps = ", ".join(timing.depends_on) or "-"
+            print(f"  {timing.name:<28} {timing.start:7.2f}s → {timing.end:7.2f}s "
+                  f"({timing.duration:6.2f}s)  after: {deps}")
+        print(f"\n  Critical path:    {' → '.join(path)} ({length:.2f}s)")
+        print(f"  Sequential total: {sequential:.2f}s")
+        print(f"  Wall time:        {self.wall_time:.2f}s")
@@ -0,0 +1,725 @@
+"""
+Declarative pipeline engine for the AutoGen demo workflows
+
+Every demo used to repeat the same ~25-line ``phase_*`` method per phase:
+print a banner, compact the upstream outputs, build the messages, call the
+model, store the result. A workflow is now a list of ``PhaseSpec`` entries
+and ``PipelineWorkflow`` runs them through one code path, so streaming,
+caching, retries, budgets and prompt layout are tuned in one place.
+
+A spec names the output it produces (``name``), the upstream outputs it
+reads (``inputs``), its prompts and, optionally, its model tier, its own
+model, temperature and max_tokens. When the workflow has a brief, ``system_prompt`` and ``task``
+are ``str.format`` templates filled from it (list values are joined with
+", " and ``{word_limit}`` resolves per phase; write literal braces as
+``{{ }}``).
+
+``max_tokens`` is derived per request from the phase's word budget
+(``words``, or the "N words" stated in its prompts) and tuned from observed
+lengths and truncations (see length_budget.py); ``max_tokens`` on the spec
+or Config.AGENT_MAX_TOKENS is only the ceiling. Phases whose format has a
+natural end can declare ``stop`` sequences, e.g. ``("\\n4.",)`` after
+"give 3 recommendations".
+
+Like a build system, every phase result is stored under a fingerprint of
+its rendered prompts, model settings and the fingerprints of its inputs
+(Config.PHASE_STORE_ENABLED). A rerun only executes phases whose fingerprint
+changed, so editing the reviewer prompt costs one call, not the whole run.
+
+Each completed phase is also checkpointed to its run directory as soon as it
+finishes (Config.CHECKPOINT_ENABLED, see checkpoints.py). If a later phase
+fails, ``--resume <run_id>`` reloads the brief and the completed outputs and
+only runs what is left.
+
+Phases name a model ``tier`` ("fast" or "large", see model_router.py)
+instead of a model. A phase whose output fails the router's local check
+(empty, a refusal, truncated, far below its word budget) is retried once per
+larger tier; a spec with an explicit ``model`` is pinned and never escalates.
+
+A phase with ``candidates=N`` gets N samples from one request and keeps the
+best by a local score (section coverage, word-budget fit, near-duplicates
+dropped; see candidates.py). Phases marked ``multi_sample`` take N from
+``--candidates`` or Config.MULTI_SAMPLE_CANDIDATES, which defaults to 1 (off).
+The distinct runners-up are printed and saved as alternatives.
+
+Every finished phase is appended to the run store (Config.RUN_STORE_ENABLED,
+see run_store.py) with its model, latency, token usage and output, followed
+by one summary record per run; the saved txt report is rendered from those
+records. With Config.RUN_STORE_BACKEND=sqlite the records go to an indexed
+database that ``run_store.py query`` searches in milliseconds.
+
+Each run is also one trace (Config.TRACING_ENABLED, see tracing.py): a
+workflow span, a span per phase with its model, tokens and cost, and a span
+per LLM call with retries and cache hits, appended to Config.TRACE_PATH as
+OTLP/JSON. The reports end with the trace's latency and cost breakdown.
+
+With speculation enabled (Config.SPECULATION_ENABLED, see speculation.py),
+upstream phases stream internally and downstream phases start on their
+partial output; a speculative result is kept only if that partial output is
+(nearly) the same as the start of the final upstream output.
+
+Subclasses only declare their specs and report text. Workflows that do not
+call the API directly (the AutoGen agent workflow) override ``execute``.
+
+Usage:
+    from pipeline import PhaseSpec, PipelineWorkflow
+
+    class MyWorkflow(PipelineWorkflow):
+        TITLE = "MY WORKFLOW"
+        PHASES = [
+            PhaseSpec("research", "PHASE 1: MARKET RESEARCH", "ResearchAgent",
+                      system_prompt="You are a market research analyst...",
+                      task="Analyze the current market for {topic}."),
+            PhaseSpec("analysis", "PHASE 2: OPPORTUNITY ANALYSIS", "AnalysisAgent",
+                      system_prompt="You are a product analyst...",
+                      task="Now identify market opportunities and gaps.",
+                      inputs=(("research", "Market research findings"),),
+                      temperature=0.3),
+        ]
+
+    MyWorkflow().run()
+    MyWorkflow(resume="20251114-143929-a1b2c3").run()    # after a failure
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, ClassVar, Dict, List, Optional, TextIO, Tuple
+
+# config puts the repo root on sys.path, so it must precede the root-level modules
+from config import Config, WorkflowConfig
+from candidates import CandidateSelector, required_sections
+from checkpoints import RunCheckpoint, new_run_id
+from context_compaction import HandoffCompactor, extractive_brief
+from length_budget import LengthBudget, declared_words
+from llm_cache import ResponseCache
+from llm_client import chat_candidates, chat_completion
+from model_router import ModelRouter, check_output, fallback_models, tier_model
+from phase_scheduler import Phase, PhaseScheduler, current_phase
+from prompt_layout import build_messages
+from run_store import get_run_store, make_record, render_report
+from shared_config import get_async_openai_client
+from speculation import Speculation, Speculator
+from token_budget import TokenBudget
+from token_counter import count_message_tokens
+from tracing import MODEL, NULL_SPAN, AnySpan, current_span, llm_attributes, print_trace_summary, trace_span
+
+
+@dataclass
+class PhaseSpec:
+    """Declarative description of one workflow phase"""
+
+    name: str                                   # output key the phase writes
+    title: str                                  # banner, e.g. "PHASE 2: OPPORTUNITY ANALYSIS"
+    agent: str                                  # agent name shown in the output
+    system_prompt: str = ""
+    task: str = ""                              # variable tail of the request
+    inputs: Tuple[Tuple[str, str], ...] = ()    # (output key, context title) pairs
+    status: str = ""                            # progress line printed before the call
+    tier: Optional[str] = None                  # model tier; None = Config.OPENAI_MODEL
+    model: Optional[str] = None                 # pins a model (overrides tier, no escalation)
+    temperature: Optional[float] = None         # None = Config.AGENT_TEMPERATURE
+    max_tokens: Optional[int] = None            # ceiling; None = Config.AGENT_MAX_TOKENS
+    words: Optional[int] = None                 # word budget; None = stated in the prompts
+    stop: Tuple[str, ...] = ()                  # stop sequences where the format allows
+    candidates: int = 1                         # samples per request; the best one is kept
+    multi_sample: bool = False                  # candidates from --candidates / Config.MULTI_SAMPLE_CANDIDATES
+    sections: Tuple[str, ...] = ()              # required sections when scoring; () = prompt bullets
+
+    @property
+    def reads(self) -> Tuple[str, ...]:
+        return tuple(key for key, _ in self.inputs)
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any]) -> "PhaseSpec":
+        """Build a spec from a WorkflowConfig.PHASES entry, with its task from TASK_DESCRIPTIONS"""
+        return cls(task=WorkflowConfig.get_task_description(entry["name"]), **entry)
+
+
+_phase_store: Optional[ResponseCache] = None
+_phase_store_lock = threading.Lock()
+
+
+def get_phase_store() -> Optional[ResponseCache]:
+    """
+    Get the process-wide phase result store, or None when disabled in Config.
+
+    Stored phases are cached completions, so the store follows the response
+    cache settings: it is off with LLM_CACHE_ENABLED=False, its entries expire
+    after LLM_CACHE_TTL, and LLM_CACHE_BYPASS skips lookups.
+    """
+    global _phase_store
+    if not (Config.PHASE_STORE_ENABLED and Config.LLM_CACHE_ENABLED):
+        return None
+    with _phase_store_lock:
+        if _phase_store is None:
+            _phase_store = ResponseCache(
+                Config.PHASE_STORE_PATH,
+                max_entries=Config.PHASE_STORE_MAX_ENTRIES,
+                ttl=Config.LLM_CACHE_TTL,
+                bypass=Config.LLM_CACHE_BYPASS,
+            )
+    return _phase_store
+
+
+def content_hash(payload: Any) -> str:
+    """SHA-256 of the canonical JSON form of payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PipelineWorkflow:
+    """Runs a declarative list of phases through the shared LLM hot path"""
+
+    # Subclasses describe the workflow; the engine does the rest
+    TITLE: ClassVar[str] = "AUTOGEN WORKFLOW"
+    HEADER_NOTES: ClassVar[List[str]] = []       # extra lines under the start banner
+    PHASES: ClassVar[List[PhaseSpec]] = []
+    DEFAULT_BRIEF: ClassVar[Dict[str, Any]] = {}
+    SUMMARY_TITLE: ClassVar[str] = "FINAL SUMMARY"
+    SUMMARY: ClassVar[str] = ""
+    RESULTS_TITLE: ClassVar[str] = "FULL RESULTS - ALL PHASES"
+    REPORT_TITLE: ClassVar[str] = "AUTOGEN WORKFLOW - FULL RESULTS"
+    REPORT_NOTES: ClassVar[List[str]] = []       # extra lines in the saved report header
+    OUTPUT_PREFIX: ClassVar[str] = "workflow_outputs"
+
+    def __init__(self, brief: Dict[str, Any] = None, verbose: bool = True,
+                 stream: bool = False, sink: TextIO = None, resume: Optional[str] = None,
+                 checkpoint: Optional[bool] = None, speculate: Optional[bool] = None,
+                 candidates: Optional[int] = None, fresh: bool = False):
+        """
+        Initialize the workflow
+
+        Args:
+            brief: Overrides for DEFAULT_BRIEF, used to fill prompt templates
+            verbose: Print banners and phase outputs. Batch callers pass False
+                     and validate the configuration once themselves.
+            stream: Stream tokens to the console and sink as they arrive
+            sink: Optional file-like object that also receives phase output
+            resume: Run ID of a failed run; its brief and completed phases are
+                    loaded and only the remaining phases execute
+            checkpoint: Checkpoint completed phases to a run directory
+                        (default Config.CHECKPOINT_ENABLED)
+            speculate: Start downstream phases on partial upstream output
+                       (default Config.SPECULATION_ENABLED)
+            candidates: Samples for multi-sample phases and phases declaring more than one
+                        candidate (1 turns multi-sampling off; default
+                        Config.MULTI_SAMPLE_CANDIDATES, or PhaseSpec.candidates)
+            fresh: Run every phase instead of reusing stored results; the
+                   store still receives the new outputs
+        """
+        if verbose and not Config.validate_setup():
+            print("ERROR: Configuration validation failed!")
+            exit(1)
+
+        self.brief = {**self.DEFAULT_BRIEF, **(brief or {})}
+        self.verbose = verbose
+        self.stream = stream
+        self.sink = sink
+        self.outputs = {}
+        self.metadata = {"retries": 0, "hedges": 0, "hedge_wins": 0}
+        self.compactor = HandoffCompactor(WorkflowConfig.HANDOFF_TOKEN_CEILINGS, metadata=self.metadata)
+        self.model = Config.OPENAI_MODEL
+        self.budget = TokenBudget(WorkflowConfig.PHASE_TOKEN_BUDGETS, model=self.model, metadata=self.metadata)
+        self.speculator = Speculator(model=self.model, enabled=speculate, metadata=self.metadata)
+        self.lengths = LengthBudget(type(self).__name__, model=self.model, metadata=self.metadata)
+        self.router = ModelRouter(metadata=self.metadata)
+        self.candidates = candidates
+        self.selector = CandidateSelector(metadata=self.metadata)
+        self.alternatives: Dict[str, List[str]] = {}
+        self.store = get_phase_store()
+        self.fresh = fresh
+        self.fingerprints: Dict[str, str] = {}
+        self.reused: List[str] = []
+
+        self.checkpoint: Optional[RunCheckpoint] = None
+        self.resumed: List[str] = []
+        self.run_store = get_run_store()
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.run_record: Optional[Dict[str, Any]] = None
+        self.trace: AnySpan = NULL_SPAN
+        if resume:
+            self.checkpoint = RunCheckpoint.load(resume, type(self).__name__)
+            self.brief = {**self.DEFAULT_BRIEF, **self.checkpoint.inputs}
+            for spec in self.PHASES:
+                entry = self.checkpoint.completed.get(spec.name)
+                if entry is not None:
+                    self.outputs[spec.name] = entry["output"]
+                    if entry.get("alternatives"):
+                        self.alternatives[spec.name] = entry["alternatives"]
+                    if entry.get("fingerprint"):
+                        self.fingerprints[spec.name] = entry["fingerprint"]
+                    self.resumed.append(spec.name)
+            self.metadata["phases_resumed"] = len(self.resumed)
+            if self.run_store is not None:
+                _, records = self.run_store.run(resume)
+                self.records = {r["phase"]: r for r in records if r["phase"] in self.resumed}
+        elif Config.CHECKPOINT_ENABLED if checkpoint is None else checkpoint:
+            self.checkpoint = RunCheckpoint.create(type(self).__name__, inputs=self.brief)
+        self.run_id = self.checkpoint.run_id if self.checkpoint is not None else new_run_id()
+
+    def log(self, *args, **kwargs):
+        """Print only when the workflow runs in verbose mode"""
+        if self.verbose:
+            print(*args, **kwargs)
+
+    def word_limit(self, phase_name: str) -> int:
+        """Word budget for a phase, honoring per-phase overrides in the brief"""
+        return self.brief.get("word_limits", {}).get(phase_name, self.brief.get("word_limit"))
+
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client for the running event loop"""
+        return get_async_openai_client()
+
+    @property
+    def echo(self) -> List[TextIO]:
+        """Sinks that receive phase output: the console plus the optional output sink"""
+        sinks = [sys.stdout] if self.verbose else []
+        if self.sink is not None:
+            sinks.append(self.sink)
+        return sinks
+
+    # --------------------------------------------------------------------
+    # Running
+    # --------------------------------------------------------------------
+
+    def run(self):
+        """Execute the complete workflow (synchronous wrapper around run_async)"""
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        """Execute the complete workflow on the running event loop"""
+        self.log("\n" + "="*80)
+        self.log(self.TITLE)
+        self.log("="*80)
+        self.log(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.log(f"Model: {self.model}")
+        self.log(f"Run ID: {self.run_id}")
+        for note in self.HEADER_NOTES:
+            self.log(note)
+        self.log()
+
+        scheduler = await self.generate()
+        self.print_reports(scheduler)
+        self.print_summary()
+
+    def scheduler(self) -> PhaseScheduler:
+        """Scheduler running each spec as soon as the outputs it reads exist"""
+        phases = [Phase(spec.name, functools.partial(self.run_phase, spec),
+                        reads=spec.reads, writes=(spec.name,))
+                  for spec in self.PHASES if spec.name not in self.resumed]
+        return PhaseScheduler(phases, outputs=self.outputs)
+
+    async def generate(self) -> PhaseScheduler:
+        """Run every phase as soon as the outputs it reads are available, in one trace"""
+        scheduler = self.scheduler()
+        with trace_span(f"workflow {type(self).__name__}",
+                        {"workflow.name": type(self).__name__, "run.id": self.run_id}) as self.trace:
+            try:
+                await scheduler.run_async()
+            except BaseException:
+                self.record_run("failed")
+                if self.checkpoint is not None:
+                    self.checkpoint.update(status="failed")
+                    print(f"\n{self.checkpoint.resume_hint()}")
+                raise
+            finally:
+                self.speculator.cancel_all()
+                self.trace.set({key: value for key, value in self.metadata.items()
+                                if isinstance(value, (int, float))})
+            self.record_run("completed")
+            if self.checkpoint is not None:
+                self.checkpoint.update(status="completed")
+        return scheduler
+
+    async def run_phase(self, spec: PhaseSpec) -> None:
+        """Run one phase in its own trace span"""
+        with trace_span(f"phase {spec.name}", {"phase.name": spec.name, "agent.name": spec.agent}):
+            await self._run_phase(spec)
+
+    async def _run_phase(self, spec: PhaseSpec) -> None:
+        """Run one phase: banner, context, messages, model call, store"""
+        self.log("\n" + "="*80)
+        self.log(spec.title)
+        self.log("="*80)
+        if spec.status:
+            self.log(spec.status)
+
+        started = time.perf_counter()
+        system_prompt = self.render(self.system_prompt(spec), spec)
+        task = self.render(spec.task, spec)
+        fingerprint = self.fingerprint(spec, system_prompt, task)
+        self.fingerprints[spec.name] = fingerprint
+
+        stored = None
+        if self.store is not None and not self.fresh:
+            stored = await self.store.get_async(fingerprint)
+        if stored is not None:
+            self.log(f"\n[{spec.agent} Output - unchanged, reused {fingerprint[:12]}]")
+            self.log(stored["output"])
+            self.outputs[spec.name] = stored["output"]
+            if stored.get("alternatives"):
+                self.alternatives[spec.name] = stored["alternatives"]
+            self.reused.append(spec.name)
+            self.metadata["phases_reused"] = len(self.reused)
+            await self.save_checkpoint(spec)
+            self.record_phase(spec, "reused", started)
+            return
+
+        context = [(title, await self.compactor.brief(key, self.outputs[key], client=self.client))
+                   for key, title in spec.inputs]
+        messages = build_messages(system_prompt, context=context, task=task)
+
+        speculative = await self.speculator.resolve(spec.name, self.outputs)
+        if speculative is not None:
+            self.log(f"\n[{spec.agent} Output - started speculatively, kept]")
+            for sink in self.echo:
+                sink.write(speculative + "\n")
+                sink.flush()
+            self.outputs[spec.name] = speculative
+            status = "speculative"
+        else:
+            self.log(f"\n[{spec.agent} Output]")
+            self.outputs[spec.name] = await self.complete(spec, messages)
+            status = "executed"
+        # A truncated output is not worth reusing; the next run retries with a wider limit
+        if self.store is not None and spec.name not in self.lengths.truncated:
+            entry = {"phase": spec.name, "output": self.outputs[spec.name]}
+            if self.alternatives.get(spec.name):
+                entry["alternatives"] = self.alternatives[spec.name]
+            await self.store.set_async(fingerprint, entry)
+        await self.save_checkpoint(spec)
+        self.record_phase(spec, status, started, prompt_hash=content_hash(messages))
+
+    async def save_checkpoint(self, spec: PhaseSpec) -> None:
+        """Persist a finished phase to the run directory (off the event loop: it fsyncs)"""
+        if self.checkpoint is not None:
+            extra = {"alternatives": self.alternatives[spec.name]} if self.alternatives.get(spec.name) else {}
+            await asyncio.to_thread(self.checkpoint.save, spec.name, self.outputs[spec.name],
+                                    fingerprint=self.fingerprints.get(spec.name), **extra)
+
+    def record_phase(self, spec: PhaseSpec, status: str, started: float,
+                     prompt_hash: Optional[str] = None) -> None:
+        """Append a finished phase to the run store (and keep it for the report)"""
+        route = self.router.routes.get(spec.name)
+        usage = self.budget.phases.get(spec.name, {})
+        record = make_record(
+            "phase", self.run_id, type(self).__name__,
+            phase=spec.name, title=spec.title, agent=spec.agent,
+            model=route["model"] if route else self.settings(spec)[0],
+            fingerprint=self.fingerprints.get(spec.name), prompt_hash=prompt_hash,
+            latency_s=round(time.perf_counter() - started, 3), status=status,
+            usage={"prompt_tokens": usage.get("prompt", 0), "completion_tokens": usage.get("completion", 0)},
+            output=self.outputs[spec.name],
+            **({"alternatives": self.alternatives[spec.name]} if self.alternatives.get(spec.name) else {}),
+        )
+        self.records[spec.name] = record
+        current_span().set({"phase.status": status, MODEL: record["model"],
+                            **llm_attributes(record["model"], record["usage"])})
+        if self.run_store is not None:
+            self.run_store.append(record)
+
+    def record_run(self, status: str) -> None:
+        """Append the run summary (status, metadata, brief) to the run store"""
+        self.run_record = make_record(
+            "run", self.run_id, type(self).__name__,
+            title=self.REPORT_TITLE, model=self.model, status=status, brief=self.brief,
+            phases=[spec.name for spec in self.PHASES if spec.name in self.outputs],
+            metadata=dict(self.metadata), notes=self.REPORT_NOTES,
+        )
+        if self.run_store is not None:
+            self.run_store.append(self.run_record)
+
+    def report(self) -> str:
+        """The run's txt report, rendered from its run store records"""
+        return render_report(self.run_record, [self.records[spec.name] for spec in self.PHASES
+                                               if spec.name in self.records])
+
+    def fingerprint(self, spec: PhaseSpec, system_prompt: str, task: str) -> str:
+        """
+        Content address of a phase result.
+
+        Covers everything that shapes the request: rendered prompts, model
+        settings, provider, handoff compaction and, instead of the upstream
+        text itself, the fingerprints of the inputs.
+        """
+        model, temperature, max_tokens = self.settings(spec)
+        extra = {"words": spec.words} if spec.words else {}
+        if spec.stop:
+            extra["stop"] = list(spec.stop)
+        if self.samples(spec) > 1:
+            extra["candidates"] = self.samples(spec)
+        inputs = [[key, title, self.fingerprints.get(key) or content_hash(self.outputs[key]),
+                   [self.compactor.method, self.compactor.ceiling(key)] if self.compactor.enabled else None]
+                  for key, title in spec.inputs]
+        return content_hash({
+            "phase": spec.name,
+            "system_prompt": system_prompt,
+            "task": task,
+            "inputs": inputs,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "api_base": str(Config.API_BASE).rstrip("/"),
+            **extra,
+        })
+
+    def system_prompt(self, spec: PhaseSpec) -> str:
+        """System prompt template for a phase"""
+        return spec.system_prompt
+
+    def render(self, template: str, spec: PhaseSpec) -> str:
+        """Fill a prompt template from the brief"""
+        if not template or not self.brief:
+            return template
+        values = {key: ", ".join(map(str, value)) if isinstance(value, (list, tuple)) else value
+                  for key, value in self.brief.items()}
+        values["word_limit"] = self.word_limit(spec.name)
+        return template.format_map(values)
+
+    def settings(self, spec: PhaseSpec) -> Tuple[str, float, int]:
+        """(model, temperature, max_tokens ceiling) for a phase, falling back to Config"""
+        return (spec.model or (tier_model(spec.tier) if spec.tier else self.model),
+                Config.AGENT_TEMPERATURE if spec.temperature is None else spec.temperature,
+                spec.max_tokens or Config.AGENT_MAX_TOKENS)
+
+    def samples(self, spec: PhaseSpec) -> int:
+        """Number of candidates to sample for a phase"""
+        if not spec.multi_sample and spec.candidates <= 1:
+            return 1
+        if self.candidates is not None:
+            return max(1, self.candidates)
+        return max(1, Config.MULTI_SAMPLE_CANDIDATES) if spec.multi_sample else spec.candidates
+
+    def word_budget(self, spec: PhaseSpec, messages: List[Dict[str, Any]]) -> Optional[int]:
+        """Declared word budget of a phase: spec.words, or the one stated in its prompts"""
+        return spec.words or declared_words(messages[0]["content"] + "\n" + messages[-1]["content"])
+
+    def request(self, spec: PhaseSpec, messages: List[Dict[str, Any]],
+                model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        chat_completion arguments for a phase: model, temperature, stop
+        sequences and a max_tokens derived from the phase's word budget.
+        ``model`` overrides the phase's own model (tier escalation).
+        """
+        default_model, temperature, ceiling = self.settings(spec)
+        model = model or default_model
+        words = self.word_budget(spec, messages)
+        max_tokens = self.lengths.limit(spec.name, words, ceiling, model)
+        return {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stop": spec.stop,
+            "on_finish": functools.partial(self.lengths.record, spec.name, words, max_tokens, model=model),
+        }
+
+    async def complete(self, spec: PhaseSpec, messages: List[Dict[str, Any]]) -> str:
+        """
+        Run a phase on its tier's model, escalating to larger tiers while the
+        output fails the router's check.
+
+        Args:
+            spec: Phase being run
+            messages: Messages from build_messages (system, context blocks, task)
+
+        Returns:
+            str: The output that passed, or the largest tier's output
+        """
+        model = self.settings(spec)[0]
+        output = await self.execute(spec, messages)
+        for bigger in ([] if spec.model else fallback_models(spec.tier, model)):
+            problem = check_output(output, self.word_budget(spec, messages),
+                                   truncated=spec.name in self.lengths.truncated)
+            if problem is None:
+                break
+            self.router.escalate(spec.name, model, bigger, problem)
+            self.log(f"\n[{spec.agent} Output - {problem} on {model}, retrying on {bigger}]")
+            model = bigger
+            output = await self.execute(spec, messages, model=model)
+        self.router.record(spec.name, spec.tier, model)
+        return output
+
+    async def execute(self, spec: PhaseSpec, messages: List[Dict[str, Any]],
+                      model: Optional[str] = None) -> str:
+        """
+        Get the phase output for the prepared messages.
+
+        Phases with downstream readers stream internally when speculation is
+        on, so their partial output can start the next phases early.
+        Multi-sample phases are buffered and echo the candidate they keep.
+
+        Args:
+            spec: Phase being run
+            messages: Messages from build_messages (system, context blocks, task)
+            model: Model override (escalation to a larger tier)
+
+        Returns:
+            str: The phase output
+        """
+        if self.samples(spec) > 1:
+            output = await self.sample(spec, messages, self.request(spec, messages, model))
+            for sink in self.echo:
+                sink.write(output + "\n")
+                sink.flush()
+            return output
+
+        request = self.request(spec, messages, model)
+        on_delta = None
+        if self.feeds_speculation(spec):
+            # Store lookups happen here: on_delta runs on the event loop and must not block
+            targets = await self.speculation_targets(spec)
+            if targets:
+                on_delta = self.speculator.watch(functools.partial(self.speculate_downstream, spec, targets),
+                                                 request["max_tokens"])
+        internal_stream = on_delta is not None and not self.stream
+        output = await chat_completion(
+            self.client,
+            messages=messages,
+            stream=self.stream or internal_stream,
+            echo=() if internal_stream else self.echo,
+            metadata=self.metadata,
+            budget=self.budget,
+            on_delta=on_delta,
+            **request,
+        )
+        if internal_stream:
+            for sink in self.echo:
+                sink.write(output + "\n")
+                sink.flush()
+        return output
+
+    async def sample(self, spec: PhaseSpec, messages: List[Dict[str, Any]],
+                     request: Dict[str, Any]) -> str:
+        """Sample the phase's candidates in one round-trip and keep the best"""
+        texts = await chat_candidates(
+            self.client,
+            n=self.samples(spec),
+            messages=messages,
+            metadata=self.metadata,
+            budget=self.budget,
+            **request,
+        )
+        sections = spec.sections or required_sections(messages[0]["content"])
+        best, self.alternatives[spec.name] = self.selector.select(
+            spec.name, texts, self.word_budget(spec, messages), sections)
+        return best
+
+    # --------------------------------------------------------------------
+    # Speculation
+    # --------------------------------------------------------------------
+
+    def feeds_speculation(self, spec: PhaseSpec) -> bool:
+        """Whether spec's output should stream so downstream phases can start on it early"""
+        return self.speculator.enabled and any(spec.name in other.reads for other in self.PHASES)
+
+    async def speculation_targets(self, spec: PhaseSpec) -> List[str]:
+        """Phases that only wait for spec's output and have no stored result to reuse"""
+        targets = []
+        for target in self.PHASES:
+            if (spec.name not in target.reads or target.name in self.outputs
+                    or any(key not in self.outputs for key in target.reads if key != spec.name)):
+                continue
+            if self.store is not None and not self.fresh:
+                system_prompt = self.render(self.system_prompt(target), target)
+                fingerprint = self.fingerprint(target, system_prompt, self.render(target.task, target))
+                if await self.store.get_async(fingerprint) is not None:
+                    continue  # the phase will be reused without a call anyway
+            targets.append(target.name)
+        return targets
+
+    def speculate_downstream(self, spec: PhaseSpec, targets: List[str], partial: str, tokens: int) -> None:
+        """Start the target phases on spec's partial text (see speculation_targets)"""
+        for target in self.PHASES:
+            if (target.name not in targets or target.name in self.outputs
+                    or self.speculator.is_pending(target.name)):
+                continue
+            # Speculative briefs are always extractive, so they never cost a model call
+            block = extractive_brief(partial, self.compactor.ceiling(spec.name)) if self.compactor.enabled else partial
+            self.speculator.start(target.name, spec.name, partial, tokens, block,
+                                  functools.partial(self.run_speculative, target, spec.name, block))
+
+    async def run_speculative(self, spec: PhaseSpec, upstream: str, block: str,
+                              speculation: Speculation) -> str:
+        """Run a phase with upstream's context block built from its partial output"""
+        current_phase.set(spec.name)
+        with trace_span(f"speculation {spec.name}", {"phase.name": spec.name, "speculation.upstream": upstream}):
+            context = [(title, block if key == upstream
+                        else await self.compactor.brief(key, self.outputs[key], client=self.client))
+                       for key, title in spec.inputs]
+            messages = build_messages(self.render(self.system_prompt(spec), spec), context=context,
+                                      task=self.render(spec.task, spec))
+            request = self.request(spec, messages)
+            speculation.prompt_tokens = count_message_tokens(messages, request["model"])
+            if self.samples(spec) > 1:
+                return await self.sample(spec, messages, request)
+            return await chat_completion(
+                self.client,
+                messages=messages,
+                metadata=self.metadata,
+                budget=self.budget,
+                **request,
+            )
+
+    # --------------------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------------------
+
+    def print_reports(self, scheduler: PhaseScheduler) -> None:
+        """Print schedule, reuse, routing, candidate, compaction, token and prompt cache reports"""
+        scheduler.print_report()
+        if self.reused or self.resumed:
+            executed = [spec.name for spec in self.PHASES
+                        if spec.name not in self.reused and spec.name not in self.resumed]
+            print()
+            if self.resumed:
+                print(f"  Resumed from checkpoint: {', '.join(self.resumed)}")
+            if self.reused:
+                print(f"  Reused unchanged phases: {', '.join(self.reused)}")
+            print(f"  Executed:                {', '.join(executed) or '-'}")
+        self.router.print_report()
+        self.selector.print_report()
+        self.speculator.print_report()
+        self.compactor.print_report()
+        self.budget.print_report()
+        self.lengths.print_report()
+        self.budget.print_cache_report()
+        print_trace_summary(self.trace)
+
+    def print_summary(self):
+        """Print the final summary and full results, then save them to a file"""
+        print("\n" + "="*80)
+        print(self.SUMMARY_TITLE)
+        print("="*80)
+        if self.SUMMARY:
+            print(self.SUMMARY)
+
+        print("\n" + "="*80)
+        print(self.RESULTS_TITLE)
+        print("="*80)
+        for spec in self.PHASES:
+            print("\n" + "-"*80)
+            print(spec.title)
+            print("-"*80)
+            print(self.outputs[spec.name])
+            for number, alternative in enumerate(self.alternatives.get(spec.name, []), 2):
+                print(f"\n[Alternative {number}]")
+                print(alternative)
+
+        # The txt file is a rendered view; the run store keeps the structured records
+        output_file = f"{self.OUTPUT_PREFIX}_{self.run_id}.txt"
+        with open(output_file, 'w') as f:
+            f.write(self.report())
+
+        print(f"\n💾 Full results saved to: {output_file}")
+        if self.run_store is not None:
+            print(f"🗂️  Run {self.run_id} recorded in {self.run_store.path}")
+        print(f"\nEnd Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("="*80)
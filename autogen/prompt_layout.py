@@ -0,0 +1,78 @@
+"""
+Prefix-cache friendly message layout for the AutoGen demo workflows
+
+OpenAI and Groq reuse (and bill less for) a prompt prefix they have seen
+recently, but only when it matches byte for byte from the first token. The
+phases used to put brief-specific values into the system prompt and wrap
+upstream outputs in phase-specific leading text, so no two requests shared
+more than a few tokens.
+
+``build_messages`` lays every request out the same way, from most to least
+stable:
+
+1. system message: the phase instructions, free of per-run values, so the
+   same phase shares them across every run of a batch;
+2. one user message per shared context block (upstream outputs, reference
+   material), in the order given and rendered identically wherever they are
+   reused;
+3. the variable tail: brief values and the actual ask, always last.
+
+Whitespace is normalized so the prefix does not change with indentation or
+trailing spaces in the source. ``TokenBudget`` reports per call how many
+prompt tokens the provider served from its cache.
+
+Usage:
+    from prompt_layout import build_messages
+
+    messages = build_messages(
+        system_prompt,
+        context=[("Market research findings", research)],
+        task=f"Product: {product}\nWord limit: {words}\n\nIdentify market opportunities and gaps.",
+    )
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from token_counter import count_message_tokens
+
+
+def normalize(text: str) -> str:
+    """Canonical text: dedented, no trailing whitespace, no leading/trailing blank lines"""
+    lines = [line.rstrip() for line in str(text or "").strip("\n").splitlines()]
+    if not lines:
+        return ""
+    # The first line of a triple-quoted string is never indented, the rest may be
+    indents = [len(line) - len(line.lstrip()) for line in lines[1:] if line]
+    indent = min(indents) if indents else 0
+    return "\n".join([lines[0].strip()] + [line[indent:] for line in lines[1:]])
+
+
+def render_context(title: str, text: str) -> str:
+    """Render one context block; identical input always gives identical bytes"""
+    return f"{title.strip()}:\n{normalize(text)}"
+
+
+def build_messages(instructions: str, context: Sequence[Tuple[str, str]] = (),
+                   task: str = "") -> List[Dict[str, Any]]:
+    """
+    Build chat messages with the stable prefix first and the variable tail last.
+
+    Args:
+        instructions: System prompt; keep per-run values out of it
+        context: (title, text) blocks shared with other phases or runs
+        task: Brief-specific values and the request for this call
+
+    Returns:
+        List of chat messages
+    """
+    messages = [{"role": "system", "content": normalize(instructions)}]
+    messages.extend({"role": "user", "content": render_context(title, text)} for title, text in context)
+    messages.append({"role": "user", "content": normalize(task)})
+    return messages
+
+
+def stable_prefix_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Local estimate of the cacheable prefix: everything before the final message"""
+    if len(messages) < 2:
+        return 0
+    return count_message_tokens(messages[:-1], model)
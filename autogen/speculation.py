@@ -0,0 +1,229 @@
+"""
+Speculative downstream execution for the AutoGen demo workflows
+
+In a linear chain (research → analysis → blueprint → review) every phase
+waits for the previous completion to finish. With speculation enabled
+(Config.SPECULATION_ENABLED or ``--speculate``), upstream phases stream
+internally, and once one has produced Config.SPECULATION_TRIGGER_FRACTION of
+its max_tokens, ending in a completed paragraph, every downstream phase whose
+other inputs are already final starts on that partial text.
+
+When the scheduler reaches the downstream phase, the partial text is compared
+with the same-length prefix of the final upstream output: a partial the final
+output merely continues is a perfect match. If they are at least
+Config.SPECULATION_MIN_SIMILARITY alike, the speculative result is kept
+(latency saved); otherwise the speculative call is cancelled and the phase
+runs normally (tokens wasted).
+The report shows both numbers so each workflow can decide whether
+speculation pays off.
+
+Speculation is one level deep: speculative calls do not stream, so they do
+not trigger further speculation themselves.
+
+Usage:
+    from speculation import Speculator
+
+    speculator = Speculator(model=model, metadata=self.metadata)
+    on_delta = speculator.watch(lambda partial, tokens: ..., max_tokens)   # pass to chat_completion
+    speculator.start("analysis", "research", partial, tokens, block, run_speculative_call)
+    ...
+    output = await speculator.resolve("analysis", {"research": final_output})
+    if output is None:
+        output = await run_normally()
+"""
+
+import asyncio
+import difflib
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from shared_config import Config
+from token_counter import count_tokens
+
+
+def similarity(a: str, b: str) -> float:
+    """Similarity ratio of two texts, from 0.0 (unrelated) to 1.0 (identical)"""
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def prefix_similarity(partial: str, final: str) -> float:
+    """Similarity of a partial output to the same-length prefix of the final output"""
+    return similarity(partial, final[:len(partial)])
+
+
+@dataclass
+class Speculation:
+    """A downstream call started on a partial upstream output"""
+
+    phase: str                      # downstream phase running speculatively
+    upstream: str                   # phase whose partial output it was started on
+    partial: str                    # upstream output available at the start
+    partial_tokens: int             # upstream tokens available at the start
+    block: str                      # context block built from the partial output
+    started: float
+    task: Optional[asyncio.Task] = None
+    finished: Optional[float] = None
+    prompt_tokens: int = 0          # set by the speculative call once its prompt is built
+
+
+class Speculator:
+    """Starts, checks and accounts for speculative downstream phases"""
+
+    def __init__(self, trigger_fraction: Optional[float] = None, min_similarity: Optional[float] = None,
+                 model: Optional[str] = None, enabled: Optional[bool] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            trigger_fraction: Share of the upstream call's max_tokens needed before
+                              speculating (default Config.SPECULATION_TRIGGER_FRACTION)
+            min_similarity: Partial/final similarity needed to keep a speculative result
+                            (default Config.SPECULATION_MIN_SIMILARITY)
+            model: Model whose tokenizer is used for counting
+            enabled: Speculate at all (default Config.SPECULATION_ENABLED)
+            metadata: Run metadata dict that receives the speculation totals
+        """
+        self.trigger_fraction = trigger_fraction or Config.SPECULATION_TRIGGER_FRACTION
+        self.min_similarity = (Config.SPECULATION_MIN_SIMILARITY if min_similarity is None
+                               else min_similarity)
+        self.model = model
+        self.enabled = Config.SPECULATION_ENABLED if enabled is None else enabled
+        self.metadata = metadata
+        self.pending: Dict[str, Speculation] = {}
+        self.outcomes: List[Dict[str, Any]] = []
+
+    def watch(self, on_trigger: Callable[[str, int], None], max_tokens: int) -> Callable[[str], None]:
+        """
+        Build an ``on_delta`` callback for a streaming upstream call.
+
+        ``on_trigger(partial, tokens)`` is called once, at the first paragraph
+        break after ``trigger_fraction`` of ``max_tokens``; partial ends at that break.
+        """
+        trigger_tokens = max(1, int(max_tokens * self.trigger_fraction))
+        parts: List[str] = []
+        fired = False
+
+        def on_delta(delta: str) -> None:
+            nonlocal fired
+            parts.append(delta)
+            if fired or "\n" not in delta:
+                return
+            text = "".join(parts)
+            cut = text.rfind("\n\n")
+            if cut <= 0:
+                return
+            partial = text[:cut]
+            tokens = count_tokens(partial, self.model)
+            if tokens >= trigger_tokens:
+                fired = True
+                on_trigger(partial, tokens)
+
+        return on_delta
+
+    def is_pending(self, phase: str) -> bool:
+        return phase in self.pending
+
+    def start(self, phase: str, upstream: str, partial: str, partial_tokens: int, block: str,
+              call: Callable[[Speculation], Awaitable[str]]) -> Speculation:
+        """
+        Start a speculative downstream call on the running event loop.
+
+        Args:
+            phase: Downstream phase
+            upstream: Phase whose partial output is used
+            partial: The partial output
+            partial_tokens: Size of the partial output
+            block: Context block built from the partial output
+            call: Coroutine function running the downstream call
+        """
+        speculation = Speculation(phase, upstream, partial, partial_tokens, block, time.perf_counter())
+
+        async def run() -> str:
+            try:
+                return await call(speculation)
+            finally:
+                speculation.finished = time.perf_counter()
+
+        speculation.task = asyncio.ensure_future(run())
+        self.pending[phase] = speculation
+        return speculation
+
+    async def resolve(self, phase: str, outputs: Dict[str, str]) -> Optional[str]:
+        """
+        Keep or discard the speculative result for a phase that is now ready to run.
+
+        Args:
+            phase: Downstream phase
+            outputs: Final upstream outputs, by phase name
+
+        Returns:
+            The speculative output, or None when the phase must run normally
+        """
+        speculation = self.pending.pop(phase, None)
+        if speculation is None:
+            return None
+        ready = time.perf_counter()
+        score = prefix_similarity(speculation.partial, outputs.get(speculation.upstream, ""))
+        outcome = {"phase": phase, "upstream": speculation.upstream,
+                   "partial_tokens": speculation.partial_tokens, "similarity": score,
+                   "saved": 0.0, "wasted": 0}
+
+        if score >= self.min_similarity:
+            try:
+                output = await speculation.task
+            except Exception:
+                outcome.update(result="failed", wasted=speculation.prompt_tokens)
+            else:
+                outcome.update(result="kept", saved=min(speculation.finished, ready) - speculation.started)
+                self._record(outcome)
+                return output
+        else:
+            outcome.update(result="restarted", wasted=self._spent(speculation))
+            speculation.task.cancel()
+        self._record(outcome)
+        return None
+
+    def cancel_all(self) -> None:
+        """Cancel speculations whose phase never ran (e.g. the workflow failed)"""
+        for phase, speculation in list(self.pending.items()):
+            speculation.task.cancel()
+            self._record({"phase": phase, "upstream": speculation.upstream,
+                          "partial_tokens": speculation.partial_tokens, "similarity": None,
+                          "saved": 0.0, "wasted": self._spent(speculation), "result": "abandoned"})
+        self.pending.clear()
+
+    def _spent(self, speculation: Speculation) -> int:
+        """Estimated tokens a discarded speculation cost: its prompt, plus the completion if it got one"""
+        task = speculation.task
+        completion = 0
+        if task.done() and not task.cancelled() and task.exception() is None:
+            completion = count_tokens(task.result(), self.model)
+        return speculation.prompt_tokens + completion
+
+    def _record(self, outcome: Dict[str, Any]) -> None:
+        self.outcomes.append(outcome)
+        if self.metadata is not None:
+            self.metadata["speculations"] = len(self.outcomes)
+            self.metadata["speculations_kept"] = sum(o["result"] == "kept" for o in self.outcomes)
+            self.metadata["speculation_saved_seconds"] = round(sum(o["saved"] for o in self.outcomes), 2)
+            self.metadata["speculation_wasted_tokens"] = sum(o["wasted"] for o in self.outcomes)
+
+    def print_report(self) -> None:
+        """Print every speculation with its outcome, and latency saved vs tokens wasted"""
+        if not self.outcomes:
+            return
+        print("\n" + "="*80)
+        print("SPECULATIVE EXECUTION")
+        print("="*80)
+        for o in self.outcomes:
+            score = "-" if o["similarity"] is None else f"{o['similarity']:.2f}"
+            print(f"  {o['upstream'] + ' → ' + o['phase']:<28} started at {o['partial_tokens']:>5} tokens  "
+                  f"similarity {score:>4}  {o['result']:<9}  saved {o['saved']:6.2f}s  "
+                  f"wasted ~{o['wasted']} tokens")
+        saved = sum(o["saved"] for o in self.outcomes)
+        wasted = sum(o["wasted"] for o in self.outcomes)
+        kept = sum(o["result"] == "kept" for o in self.outcomes)
+        print(f"  Kept {kept}/{len(self.outcomes)} | latency saved {saved:.2f}s | tokens wasted ~{wasted}"
+              + (f" (~{wasted / saved:.0f} tokens per second saved)" if saved > 0 and wasted else ""))
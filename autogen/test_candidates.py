@@ -0,0 +1,49 @@
+"""
+Tests for candidates.py
+
+Run from the autogen directory:
+    python -m pytest -q test_candidates.py
+"""
+
+from candidates import CandidateSelector, rank_candidates, required_sections
+
+PROMPT = """You are a product strategist.
+- Key features (3-5)
+- Pricing model: tiers and trial
+- Target market
+"""
+SECTIONS = required_sections(PROMPT)
+
+COMPLETE = ("Key features: live transcripts, rubric scoring and team feedback. "
+            "Pricing model: three tiers with a free trial. "
+            "Target market: recruiting teams at growing startups. ") * 2
+PARTIAL = ("Key features: live transcripts and rubric scoring for interviewers, "
+           "plus structured feedback forms that hiring teams can share quickly. ") * 2
+
+
+def test_required_sections():
+    assert SECTIONS == ("Key features", "Pricing model", "Target market")
+
+
+def test_best_candidate_ranks_first():
+    ranked = rank_candidates([PARTIAL, COMPLETE, ""], words=45, sections=SECTIONS)
+    assert [entry["index"] for entry in ranked] == [1, 0, 2]
+    assert ranked[0]["score"] > ranked[1]["score"] > ranked[2]["score"] == 0.0
+    assert all(entry["duplicate_of"] is None for entry in ranked)
+
+
+def test_near_duplicates_of_better_candidates_are_marked():
+    # The longer copy overshoots the word budget, so it ranks below the original
+    ranked = rank_candidates([COMPLETE + " Done.", PARTIAL, COMPLETE], words=45, sections=SECTIONS,
+                             duplicate_similarity=0.9)
+    assert [(entry["index"], entry["duplicate_of"]) for entry in ranked] == [(2, None), (0, 2), (1, None)]
+
+
+def test_selector_returns_best_and_distinct_alternatives():
+    metadata = {}
+    selector = CandidateSelector(metadata=metadata)
+    best, alternatives = selector.select("blueprint", [PARTIAL, COMPLETE, COMPLETE], words=45,
+                                         sections=SECTIONS)
+    assert best == COMPLETE
+    assert alternatives == [PARTIAL]
+    assert metadata == {"candidates": 3, "candidate_duplicates": 1}
@@ -0,0 +1,53 @@
+"""
+Tests for checkpoints.py
+
+Run from the autogen directory:
+    python -m pytest -q test_checkpoints.py
+"""
+
+import json
+
+import pytest
+
+from checkpoints import CheckpointError, RunCheckpoint, atomic_write_json
+
+
+def test_saved_phases_are_loaded_on_resume(tmp_path):
+    checkpoint = RunCheckpoint.create("FiveAgentWorkflow", inputs={"product": "Interviews"}, root=tmp_path)
+    checkpoint.save("research", "Research output", fingerprint="abc")
+    checkpoint.save("analysis", "Analysis output", alternatives=["Other analysis"])
+    checkpoint.update(status="failed")
+
+    resumed = RunCheckpoint.load(checkpoint.run_id, "FiveAgentWorkflow", root=tmp_path)
+    assert resumed.inputs == {"product": "Interviews"}
+    assert set(resumed.completed) == {"research", "analysis"}
+    assert resumed.output("research") == "Research output"
+    assert resumed.output("pricing") is None
+    assert resumed.completed["research"]["fingerprint"] == "abc"
+    assert resumed.completed["analysis"]["alternatives"] == ["Other analysis"]
+    assert resumed.manifest["status"] == "running"
+    assert checkpoint.run_id in resumed.resume_hint()
+
+
+def test_unknown_run_cannot_be_resumed(tmp_path):
+    with pytest.raises(CheckpointError, match="No checkpointed run"):
+        RunCheckpoint.load("20250101-000000-abcdef", "FiveAgentWorkflow", root=tmp_path)
+
+
+def test_run_of_another_workflow_cannot_be_resumed(tmp_path):
+    checkpoint = RunCheckpoint.create("FiveAgentWorkflow", root=tmp_path)
+    with pytest.raises(CheckpointError, match="belongs to FiveAgentWorkflow"):
+        RunCheckpoint.load(checkpoint.run_id, "ELearningWorkflow", root=tmp_path)
+
+
+def test_run_id_cannot_escape_the_runs_directory(tmp_path):
+    with pytest.raises(CheckpointError, match="Invalid run ID"):
+        RunCheckpoint.load("../elsewhere", "FiveAgentWorkflow", root=tmp_path)
+
+
+def test_atomic_write_leaves_no_temporary_files(tmp_path):
+    path = tmp_path / "phase.json"
+    atomic_write_json(path, {"output": "first"})
+    atomic_write_json(path, {"output": "second"})
+    assert json.loads(path.read_text()) == {"output": "second"}
+    assert [p.name for p in tmp_path.iterdir()] == ["phase.json"]
@@ -0,0 +1,78 @@
+"""
+Tests for length_budget.py
+
+Run from the autogen directory:
+    python -m pytest -q test_length_budget.py
+"""
+
+import pytest
+
+import length_budget
+from length_budget import MAX_BOOST, LengthBudget, declared_words
+from llm_cache import ResponseCache
+from shared_config import Config
+
+ANSWER = " ".join(["word"] * 100)
+
+
+@pytest.fixture
+def lengths(tmp_path, monkeypatch):
+    """A LengthBudget with its own statistics store and the default tokens-per-word ratio"""
+    monkeypatch.setattr(Config, "ADAPTIVE_MAX_TOKENS", True)
+    monkeypatch.setattr(Config, "TOKENS_PER_WORD", 1.4)
+    monkeypatch.setattr(Config, "LENGTH_HEADROOM", 1.5)
+    monkeypatch.setattr(Config, "LENGTH_MIN_TOKENS", 128)
+    monkeypatch.setattr(Config, "LENGTH_MIN_SAMPLES", 100)
+    monkeypatch.setattr(length_budget, "_stats_store", ResponseCache(tmp_path / "lengths.sqlite"))
+    return LengthBudget("TestWorkflow", model="model")
+
+
+def test_declared_words():
+    assert declared_words("Be concise - 150 words.") == 150
+    assert declared_words("Word limit: 200. Summary in 120 words.") == 120
+    assert declared_words("No limit here") is None
+
+
+def test_limit_from_word_budget(lengths):
+    # 150 words x 1.4 tokens/word x 1.5 headroom = 315, rounded up to 320
+    assert lengths.limit("research", 150, ceiling=2000) == 320
+    assert lengths.limit("research", 150, ceiling=300) == 300
+    assert lengths.limit("research", 20, ceiling=2000) == 128
+    assert lengths.limit("research", None, ceiling=2000) == 2000
+
+
+def test_truncation_boosts_and_fits_decay(lengths):
+    lengths.record("research", 150, 320, ANSWER, finish_reason="length")
+    lengths.record("research", 150, 320, ANSWER, finish_reason="length")
+    assert lengths._stats("research", None)["boost"] == pytest.approx(1.5625)
+    assert lengths.limit("research", 150, ceiling=2000) == 512
+    assert "research" in lengths.truncated
+
+    lengths.record("research", 150, 512, ANSWER, finish_reason="stop")
+    assert lengths._stats("research", None)["boost"] == pytest.approx(1.5625 * 0.95)
+    assert "research" not in lengths.truncated
+    for _ in range(20):
+        lengths.record("research", 150, 512, ANSWER, finish_reason="stop")
+    assert lengths._stats("research", None)["boost"] == 1.0
+
+
+def test_boost_is_capped(lengths):
+    for _ in range(20):
+        lengths.record("research", 150, 320, ANSWER, finish_reason="length")
+    assert lengths._stats("research", None)["boost"] == MAX_BOOST
+
+
+def test_observed_ratio_replaces_the_default(lengths, monkeypatch):
+    monkeypatch.setattr(Config, "LENGTH_MIN_SAMPLES", 3)
+    for _ in range(3):
+        lengths.record("research", 100, 320, ANSWER, finish_reason="stop",
+                       usage={"completion_tokens": 200})
+    # 2 tokens/word x 1.5 headroom x 100 words = 300, rounded up to 320
+    assert lengths.limit("research", 100, ceiling=2000) == 320
+    assert lengths.limit("analysis", 100, ceiling=2000) == 256
+
+
+def test_statistics_are_kept_per_workflow(lengths):
+    lengths.record("research", 150, 320, ANSWER, finish_reason="length")
+    other = LengthBudget("OtherWorkflow", model="model")
+    assert other.limit("research", 150, ceiling=2000) == 320
@@ -0,0 +1,68 @@
+"""
+Tests for llm_cache.py
+
+Run from the autogen directory:
+    python -m pytest -q test_llm_cache.py
+"""
+
+import time
+
+from llm_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Plan a conference"}]
+
+
+def test_key_covers_every_request_setting():
+    key = ResponseCache.make_key("model", "http://stub/v1/", 0.7, 500, MESSAGES)
+    assert key == ResponseCache.make_key("model", "http://stub/v1", 0.7, 500, MESSAGES)
+    assert key != ResponseCache.make_key("model", "http://stub/v1", 0.7, 600, MESSAGES)
+    assert key != ResponseCache.make_key("model", "http://stub/v1", 0.7, 500, MESSAGES, stop=["\n"])
+
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    assert cache.get("key", "missing") == "missing"
+    cache.set("key", {"content": "answer"})
+    assert cache.get("key") == {"content": "answer"}
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=0.05)
+    cache.set("short", "a")
+    cache.set("forever", "b", ttl=0)
+    cache.set("long", "c", ttl=3600)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("forever") == "b"
+    assert cache.get("long") == "c"
+
+
+def test_purge_expired(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3, ttl=3600)
+    time.sleep(0.1)
+    assert cache.purge_expired() == 2
+    assert cache.get("c") == 3
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_bypass_misses_but_still_writes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    bypassed = ResponseCache(path, bypass=True)
+    bypassed.set("key", "fresh")
+    assert bypassed.get("key") is None
+    assert bypassed.stats() == {"hits": 0, "misses": 1}
+    assert ResponseCache(path).get("key") == "fresh"
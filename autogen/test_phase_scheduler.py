@@ -0,0 +1,93 @@
+"""
+Tests for phase_scheduler.py
+
+Run from the autogen directory:
+    python -m pytest -q test_phase_scheduler.py
+"""
+
+import asyncio
+
+import pytest
+
+from phase_scheduler import Phase, PhaseScheduler, current_phase
+
+
+def diamond(events, outputs, fail=None):
+    """research → (analysis, pricing) → summary, each phase taking 50 ms"""
+
+    def step(name):
+        async def run():
+            events.append(("start", name, current_phase.get()))
+            await asyncio.sleep(0.05)
+            if name == fail:
+                raise RuntimeError(f"{name} failed")
+            outputs[name] = name.upper()
+            events.append(("end", name, current_phase.get()))
+        return run
+
+    return [
+        Phase("summary", step("summary"), reads=("analysis", "pricing"), writes=("summary",)),
+        Phase("analysis", step("analysis"), reads=("research",), writes=("analysis",)),
+        Phase("pricing", step("pricing"), reads=("research", "brief"), writes=("pricing",)),
+        Phase("research", step("research"), reads=("brief",), writes=("research",)),
+    ]
+
+
+def test_dependencies_follow_reads_and_writes():
+    scheduler = PhaseScheduler(diamond([], {}), outputs={"brief": "..."})
+    assert scheduler.dependencies == {"summary": ("analysis", "pricing"), "analysis": ("research",),
+                                      "pricing": ("research",), "research": ()}
+
+
+def test_phases_run_in_dependency_order_and_in_parallel():
+    events, outputs = [], {"brief": "..."}
+    scheduler = PhaseScheduler(diamond(events, outputs), outputs=outputs)
+    scheduler.run()
+
+    order = [(kind, name) for kind, name, _ in events]
+    for before, after in [("research", "analysis"), ("research", "pricing"),
+                          ("analysis", "summary"), ("pricing", "summary")]:
+        assert order.index(("end", before)) < order.index(("start", after))
+    # analysis and pricing only need research, so they overlap
+    assert order.index(("start", "pricing")) < order.index(("end", "analysis"))
+    assert order.index(("start", "analysis")) < order.index(("end", "pricing"))
+    assert outputs["summary"] == "SUMMARY"
+    assert all(name == phase for _, name, phase in events)
+
+    path, _ = scheduler.critical_path()
+    assert path[0] == "research" and path[-1] == "summary" and len(path) == 3
+
+
+def test_sync_phases_run_in_threads():
+    outputs = {}
+    scheduler = PhaseScheduler([
+        Phase("first", lambda: outputs.update(first=current_phase.get()), writes=("first",)),
+        Phase("second", lambda: outputs.update(second=outputs["first"] + "+"), reads=("first",)),
+    ], outputs=outputs)
+    scheduler.run()
+    assert outputs == {"first": "first", "second": "first+"}
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        PhaseScheduler([Phase("a", lambda: None, reads=("b",), writes=("a",)),
+                        Phase("b", lambda: None, reads=("a",), writes=("b",))])
+
+
+def test_missing_input_is_rejected():
+    with pytest.raises(ValueError, match="no phase writes it"):
+        PhaseScheduler(diamond([], {}))
+
+
+def test_output_written_twice_is_rejected():
+    with pytest.raises(ValueError, match="written by both"):
+        PhaseScheduler([Phase("a", lambda: None, writes=("x",)), Phase("b", lambda: None, writes=("x",))])
+
+
+def test_failure_cancels_running_phases():
+    events, outputs = [], {"brief": "..."}
+    scheduler = PhaseScheduler(diamond(events, outputs, fail="analysis"), outputs=outputs)
+    with pytest.raises(RuntimeError, match="analysis failed"):
+        scheduler.run()
+    assert "summary" not in outputs
+    assert ("start", "summary") not in [(kind, name) for kind, name, _ in events]
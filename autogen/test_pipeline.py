@@ -0,0 +1,97 @@
+"""
+Tests for pipeline.py: phase store reuse and checkpoint resume, without a provider
+
+Run from the autogen directory:
+    python -m pytest -q test_pipeline.py
+"""
+
+import asyncio
+
+import pytest
+
+import pipeline
+from pipeline import PhaseSpec, PipelineWorkflow
+from shared_config import Config
+
+
+class TwoPhaseWorkflow(PipelineWorkflow):
+    """research → summary, with the model call replaced by a canned answer"""
+
+    PHASES = [
+        PhaseSpec("research", "PHASE 1: RESEARCH", "Researcher",
+                  system_prompt="You research {product}.", task="List three findings."),
+        PhaseSpec("summary", "PHASE 2: SUMMARY", "Writer",
+                  system_prompt="You write summaries.", task="Summarize the research.",
+                  inputs=(("research", "RESEARCH"),)),
+    ]
+    DEFAULT_BRIEF = {"product": "interview software"}
+    client = None
+
+    def __init__(self, fail=None, **kwargs):
+        super().__init__(verbose=False, **kwargs)
+        self.fail = fail
+        self.calls = []
+
+    async def complete(self, spec, messages):
+        self.calls.append(spec.name)
+        if spec.name == self.fail:
+            raise RuntimeError(f"{spec.name} failed")
+        return f"{spec.name} output"
+
+
+@pytest.fixture(autouse=True)
+def offline(tmp_path, monkeypatch):
+    """Phase store and checkpoints under tmp_path; no tracing, run store or learned limits"""
+    for name, value in [("PHASE_STORE_ENABLED", True), ("PHASE_STORE_PATH", tmp_path / "phases.sqlite"),
+                        ("LLM_CACHE_ENABLED", True), ("LLM_CACHE_BYPASS", False),
+                        ("CHECKPOINT_ENABLED", False), ("RUNS_DIR", tmp_path / "runs"),
+                        ("RUN_STORE_ENABLED", False), ("TRACING_ENABLED", False),
+                        ("ADAPTIVE_MAX_TOKENS", False), ("SPECULATION_ENABLED", False)]:
+        monkeypatch.setattr(Config, name, value)
+    monkeypatch.setattr(pipeline, "_phase_store", None)
+
+
+def run(**kwargs) -> TwoPhaseWorkflow:
+    workflow = TwoPhaseWorkflow(**kwargs)
+    asyncio.run(workflow.generate())
+    return workflow
+
+
+def test_unchanged_phases_are_reused():
+    assert run().calls == ["research", "summary"]
+    second = run()
+    assert second.calls == []
+    assert second.reused == ["research", "summary"]
+    assert second.outputs["summary"] == "summary output"
+
+
+@pytest.mark.parametrize("setting", ["fresh", "LLM_CACHE_BYPASS", "LLM_CACHE_ENABLED"])
+def test_phase_store_follows_fresh_and_cache_settings(setting, monkeypatch):
+    run()
+    kwargs = {}
+    if setting == "fresh":
+        kwargs["fresh"] = True
+    else:
+        monkeypatch.setattr(Config, setting, setting == "LLM_CACHE_BYPASS")
+        monkeypatch.setattr(pipeline, "_phase_store", None)
+    second = run(**kwargs)
+    assert second.calls == ["research", "summary"]
+    assert second.reused == []
+
+
+def test_phase_store_is_off_without_the_response_cache(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_CACHE_ENABLED", False)
+    assert pipeline.get_phase_store() is None
+
+
+def test_resume_runs_only_the_missing_phases():
+    failed = TwoPhaseWorkflow(fail="summary", checkpoint=True, fresh=True)
+    with pytest.raises(RuntimeError, match="summary failed"):
+        asyncio.run(failed.generate())
+    assert failed.checkpoint.manifest["status"] == "failed"
+
+    resumed = run(resume=failed.run_id, fresh=True)
+    assert resumed.resumed == ["research"]
+    assert resumed.calls == ["summary"]
+    assert resumed.outputs == {"research": "research output", "summary": "summary output"}
+    assert resumed.checkpoint.manifest["status"] == "completed"
@@ -0,0 +1,67 @@
+"""
+Tests for rate_limiter.py
+
+Run from the autogen directory:
+    python -m pytest -q test_rate_limiter.py
+"""
+
+import pytest
+
+from rate_limiter import RateLimiter
+
+
+def make_limiter(tmp_path, key: str = "http://stub/v1|model") -> RateLimiter:
+    """1 request/s and 10 tokens/s, with 10 seconds of burst: 10 requests, 100 tokens"""
+    return RateLimiter(key, rpm=60, tpm=600, state_dir=tmp_path, burst_seconds=10)
+
+
+def test_reserve_within_burst_does_not_wait(tmp_path):
+    limiter = make_limiter(tmp_path)
+    assert limiter.reserve(40) == 0
+    assert limiter.reserve(60) == 0
+
+
+def test_overdrawn_tokens_wait_for_refill(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.reserve(100)
+    # 50 tokens over budget at 10 tokens/s
+    assert limiter.reserve(50) == pytest.approx(5.0, abs=0.1)
+    assert limiter.total_wait == pytest.approx(5.0, abs=0.1)
+
+
+def test_overdrawn_requests_wait_for_refill(tmp_path):
+    limiter = make_limiter(tmp_path)
+    for _ in range(10):
+        limiter.reserve(1)
+    # The 11th request is one over budget at 1 request/s
+    assert limiter.reserve(1) == pytest.approx(1.0, abs=0.1)
+
+
+def test_settle_credits_back_an_overestimate(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.reserve(100)
+    limiter.settle(100, 40)
+    assert limiter.reserve(60) == 0
+    assert limiter.reserve(20) == pytest.approx(2.0, abs=0.1)
+
+
+def test_settle_charges_an_underestimate(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.reserve(50)
+    limiter.settle(50, 80)
+    assert limiter.reserve(40) == pytest.approx(2.0, abs=0.1)
+
+
+def test_refund_never_lifts_a_bucket_above_capacity(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.settle(100, 0)
+    limiter.reserve(100)
+    assert limiter.reserve(10) == pytest.approx(1.0, abs=0.1)
+
+
+def test_limiters_on_one_key_share_the_budget(tmp_path):
+    first, second = make_limiter(tmp_path), make_limiter(tmp_path)
+    other = make_limiter(tmp_path, key="http://stub/v1|other-model")
+    first.reserve(100)
+    assert second.reserve(10) == pytest.approx(1.0, abs=0.1)
+    assert other.reserve(10) == 0
@@ -0,0 +1,131 @@
+"""
+Tests for retry_policy.py
+
+Run from the autogen directory:
+    python -m pytest -q test_retry_policy.py
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+import retry_policy
+from retry_policy import (
+    LatencyTracker, RetryPolicy, call_with_retries, call_with_retries_sync, retry_after_seconds,
+)
+from shared_config import Config
+
+
+class Transient(Exception):
+    """Stand-in for a retryable provider error"""
+
+
+def provider_error(**headers) -> Exception:
+    """An error carrying response headers, as openai.APIStatusError does"""
+    error = Transient("rate limited")
+    error.response = SimpleNamespace(headers=headers)
+    return error
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(provider_error(**{"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(provider_error(**{"retry-after-ms": "1500"})) == 1.5
+    # retry-after-ms is more precise, so it wins
+    assert retry_after_seconds(provider_error(**{"retry-after-ms": "250", "retry-after": "1"})) == 0.25
+    assert retry_after_seconds(provider_error(**{"retry-after": formatdate(time.time() + 30)})) == \
+        pytest.approx(30, abs=2)
+    assert retry_after_seconds(provider_error(**{"retry-after": formatdate(time.time() - 30)})) == 0.0
+    assert retry_after_seconds(provider_error(**{"retry-after": "soon"})) is None
+    assert retry_after_seconds(provider_error()) is None
+    assert retry_after_seconds(Transient("no response")) is None
+
+
+def test_delay_prefers_retry_after_up_to_max_delay():
+    policy = RetryPolicy(max_retries=3, base_delay=1.0, max_delay=10.0)
+    assert policy.delay(0, provider_error(**{"retry-after": "4"})) == 4.0
+    assert policy.delay(0, provider_error(**{"retry-after": "60"})) == 10.0
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt, Transient()) <= min(10.0, 2 ** attempt)
+
+
+def test_retries_until_success_and_counts_them():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Transient()
+        return "ok"
+
+    metadata = {}
+    result = asyncio.run(call_with_retries(call, RetryPolicy(max_retries=2, base_delay=0),
+                                           metadata=metadata, can_retry=lambda e: True))
+    assert result == "ok"
+    assert metadata["retries"] == 2
+
+
+def test_gives_up_after_max_retries_or_on_fatal_errors():
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        raise Transient()
+
+    with pytest.raises(Transient):
+        call_with_retries_sync(call, RetryPolicy(max_retries=2, base_delay=0), can_retry=lambda e: True)
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(Transient):
+        call_with_retries_sync(call, RetryPolicy(max_retries=2, base_delay=0), can_retry=lambda e: False)
+    assert len(attempts) == 1
+
+
+def test_latency_quantile_needs_min_samples():
+    tracker = LatencyTracker()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        tracker.record("model", seconds)
+    assert tracker.quantile("model", 0.5, min_samples=5) is None
+    assert tracker.quantile("model", 0.5, min_samples=4) == 0.3
+
+
+def test_slow_call_is_hedged_and_the_backup_wins(monkeypatch):
+    tracker = LatencyTracker()
+    for _ in range(3):
+        tracker.record("model", 0.01)
+    monkeypatch.setattr(retry_policy, "latency_tracker", tracker)
+    monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 3)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        # The primary stalls; the duplicate answers at once
+        await asyncio.sleep(5 if len(calls) == 1 else 0)
+        return len(calls)
+
+    metadata = {}
+    started = time.perf_counter()
+    result = asyncio.run(call_with_retries(call, RetryPolicy(), metadata=metadata,
+                                           latency_key="model", hedge=True))
+    assert result == 2
+    assert metadata == {"hedges": 1, "hedge_wins": 1}
+    assert time.perf_counter() - started < 1
+
+
+def test_fast_call_is_not_hedged(monkeypatch):
+    tracker = LatencyTracker()
+    for _ in range(3):
+        tracker.record("model", 1.0)
+    monkeypatch.setattr(retry_policy, "latency_tracker", tracker)
+    monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 3)
+
+    async def call():
+        return "ok"
+
+    metadata = {}
+    assert asyncio.run(call_with_retries(call, RetryPolicy(), metadata=metadata,
+                                         latency_key="model", hedge=True)) == "ok"
+    assert metadata == {}
@@ -0,0 +1,70 @@
+"""
+Tests for run_store.py, against both backends
+
+Run from the autogen directory:
+    python -m pytest -q test_run_store.py
+"""
+
+import pytest
+
+from run_store import RunStore, SQLiteRunStore, make_record, render_report
+
+
+@pytest.fixture(params=["jsonl", "gzip", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteRunStore(tmp_path / "history.sqlite")
+        yield store
+        store.close()
+    else:
+        yield RunStore(tmp_path / "history.jsonl", compression="none" if request.param == "jsonl" else "gzip")
+
+
+def phase(run_id, name, model, latency, output, created_at="2026-10-01T12:00:00"):
+    record = make_record("phase", run_id, "FiveAgentWorkflow", phase=name, title=name.upper(),
+                         agent="Agent", model=model, latency_s=latency, status="executed", output=output)
+    record["created_at"] = created_at
+    return record
+
+
+@pytest.fixture
+def history(store):
+    store.append([
+        phase("run-1", "research", "small", 1.5, "Candidates want fast feedback"),
+        phase("run-1", "pricing", "small", 4.0, "A freemium tier with paid seats"),
+    ])
+    store.append(make_record("run", "run-1", "FiveAgentWorkflow", status="failed"))
+    # The resumed session re-runs pricing
+    store.append(phase("run-1", "pricing", "large", 2.5, "Seat-based pricing", "2026-10-02T12:00:00"))
+    store.append(make_record("run", "run-1", "FiveAgentWorkflow", status="completed"))
+    store.append(phase("run-2", "pricing", "small", 6.0, "A freemium tier for students", "2026-10-03T12:00:00"))
+    return store
+
+
+def test_iter_records_filters(history):
+    assert len(list(history.iter_records())) == 6
+    assert len(list(history.iter_records(kind="phase", phase="pricing"))) == 3
+    assert [r["run_id"] for r in history.iter_records(kind="phase", phase="pricing", model="small")] == \
+        ["run-1", "run-2"]
+    assert [r["status"] for r in history.runs(workflow="FiveAgentWorkflow")] == ["failed", "completed"]
+
+
+def test_run_keeps_the_latest_record_per_phase(history):
+    run, phases = history.run("run-1")
+    assert run["status"] == "completed"
+    assert [(p["phase"], p["output"]) for p in phases] == [("research", "Candidates want fast feedback"),
+                                                           ("pricing", "Seat-based pricing")]
+    assert "Seat-based pricing" in render_report(run, phases)
+    assert history.run("missing") == (None, [])
+
+
+def test_query_sorts_and_filters(history):
+    slowest = history.query(phase="pricing", order_by="latency_s", descending=True)
+    assert [r["latency_s"] for r in slowest] == [6.0, 4.0, 2.5]
+    assert [r["output"] for r in history.query(search="freemium tier")] == [
+        "A freemium tier with paid seats", "A freemium tier for students"]
+    assert [r["run_id"] for r in history.query(since="2026-10-02T00:00:00")] == ["run-1", "run-2"]
+    assert [r["phase"] for r in history.query(until="2026-10-02T00:00:00", limit=1)] == ["research"]
+    assert history.query(model="large")[0]["output"] == "Seat-based pricing"
+    with pytest.raises(ValueError):
+        history.query(order_by="output")
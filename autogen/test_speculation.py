@@ -0,0 +1,57 @@
+"""
+Tests for speculation.py
+
+Run from the autogen directory:
+    python -m pytest -q test_speculation.py
+"""
+
+import asyncio
+
+from speculation import Speculator, prefix_similarity
+
+RESEARCH = "\n\n".join(
+    f"Finding {i}: candidates expect structured interviews with clear rubrics and fast feedback."
+    for i in range(1, 21)
+)
+
+
+def resolve(partial: str, final: str):
+    """Start a speculation on partial, then resolve it against final"""
+    speculator = Speculator(min_similarity=0.9, enabled=True)
+
+    async def run():
+        async def call(speculation):
+            return "speculative analysis"
+
+        speculator.start("analysis", "research", partial, 100, partial, call)
+        await asyncio.sleep(0)
+        return await speculator.resolve("analysis", {"research": final})
+
+    return asyncio.run(run()), speculator.outcomes[-1]
+
+
+def test_consistent_prefix_is_kept():
+    partial = RESEARCH[:len(RESEARCH) // 3]
+    assert prefix_similarity(partial, RESEARCH) == 1.0
+
+    output, outcome = resolve(partial, RESEARCH)
+    assert output == "speculative analysis"
+    assert outcome["result"] == "kept"
+
+
+def test_diverging_partial_is_restarted():
+    partial = "Finding 1: candidates prefer unstructured chats with no feedback at all.\n\n" * 4
+
+    output, outcome = resolve(partial, RESEARCH)
+    assert output is None
+    assert outcome["result"] == "restarted"
+
+
+def test_trigger_scales_with_max_tokens():
+    speculator = Speculator(trigger_fraction=0.5, enabled=True)
+    fired = []
+    on_delta = speculator.watch(lambda partial, tokens: fired.append(tokens), max_tokens=40)
+    for paragraph in RESEARCH.split("\n\n"):
+        on_delta(paragraph + "\n\n")
+    assert len(fired) == 1
+    assert 20 <= fired[0] < 40
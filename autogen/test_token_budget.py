@@ -0,0 +1,88 @@
+"""
+Tests for token_budget.py
+
+Run from the autogen directory:
+    python -m pytest -q test_token_budget.py
+"""
+
+import pytest
+
+from shared_config import Config
+from token_budget import TokenBudget, TokenBudgetExceeded
+from token_counter import count_message_tokens
+
+SYSTEM = {"role": "system", "content": "You are a market researcher."}
+RESEARCH = " ".join(f"Finding {i}: candidates expect structured interviews." for i in range(400))
+
+
+@pytest.fixture(autouse=True)
+def min_completion(monkeypatch):
+    monkeypatch.setattr(Config, "MIN_COMPLETION_TOKENS", 50)
+
+
+def messages(task: str = "Summarize the market."):
+    return [SYSTEM, {"role": "user", "content": task}]
+
+
+def test_request_that_fits_is_unchanged():
+    budget = TokenBudget({"research": 1000}, workflow_limit=0, enabled=True)
+    sent, max_tokens, reserved = budget.prepare("research", messages(), 200)
+    assert sent == messages()
+    assert max_tokens == 200
+    assert reserved == count_message_tokens(sent) + 200
+    assert budget.phases["research"]["clamped"] == 0
+
+
+def test_max_tokens_is_clamped_to_the_phase_budget():
+    budget = TokenBudget({"research": 1000}, workflow_limit=0, enabled=True)
+    sent, max_tokens, reserved = budget.prepare("research", messages(), 2000)
+    assert sent == messages()
+    assert max_tokens == 1000 - count_message_tokens(sent)
+    assert reserved == 1000
+    assert budget.phases["research"]["clamped"] == 1
+
+
+def test_reservations_count_against_the_workflow_budget():
+    budget = TokenBudget({}, workflow_limit=1000, enabled=True)
+    _, _, first = budget.prepare("research", messages(), 600)
+    _, max_tokens, second = budget.prepare("analysis", messages(), 600)
+    assert first + second == 1000
+    assert max_tokens < 600
+
+    budget.release(first)
+    _, max_tokens, _ = budget.prepare("analysis", messages(), 600)
+    assert max_tokens == 600
+
+
+@pytest.mark.parametrize("policy", ["truncate", "compact"])
+def test_oversized_input_is_shrunk(policy):
+    budget = TokenBudget({"analysis": 300}, workflow_limit=0, policy=policy, enabled=True)
+    original = messages(RESEARCH)
+    sent, max_tokens, reserved = budget.prepare("analysis", original, 200)
+    assert sent[0] == SYSTEM
+    assert len(sent[1]["content"]) < len(RESEARCH)
+    assert original[1]["content"] == RESEARCH
+    assert max_tokens >= Config.MIN_COMPLETION_TOKENS
+    assert reserved <= 300
+    assert budget.phases["analysis"]["shrunk"] == 1
+
+
+def test_fail_policy_raises_before_sending():
+    budget = TokenBudget({"analysis": 300}, workflow_limit=0, policy="fail", enabled=True)
+    with pytest.raises(TokenBudgetExceeded):
+        budget.prepare("analysis", messages(RESEARCH), 200)
+    assert budget.reserved == 0
+
+
+def test_unshrinkable_prompt_raises():
+    budget = TokenBudget({"analysis": 60}, workflow_limit=0, policy="truncate", enabled=True)
+    long_system = {"role": "system", "content": RESEARCH}
+    with pytest.raises(TokenBudgetExceeded):
+        budget.prepare("analysis", [long_system], 200)
+
+
+def test_disabled_budget_only_records():
+    budget = TokenBudget({"analysis": 300}, workflow_limit=0, enabled=False)
+    sent, max_tokens, _ = budget.prepare("analysis", messages(RESEARCH), 2000)
+    assert sent[1]["content"] == RESEARCH
+    assert max_tokens == 2000
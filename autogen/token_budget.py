@@ -0,0 +1,269 @@
+"""
+Per-phase and per-workflow token budgets for the AutoGen demo workflows
+
+Before each request, ``TokenBudget.prepare`` counts the prompt locally and
+checks it (plus the requested completion) against the phase budget and
+whatever is left of the workflow budget. When a request does not fit:
+
+1. ``max_tokens`` is lowered if that alone is enough (down to
+   Config.MIN_COMPLETION_TOKENS);
+2. otherwise the longest non-system message is shrunk according to the
+   policy: "truncate" cuts it at the token limit, "compact" turns it into an
+   extractive brief (see context_compaction);
+3. with the "fail" policy, or if shrinking cannot make it fit,
+   ``TokenBudgetExceeded`` is raised before anything is sent.
+
+After the response, ``record`` books the provider's ``response.usage`` (or a
+local count when the provider omits it) against the budgets. It also keeps a
+per-call log of how many prompt tokens the provider served from its prefix
+cache (``usage.prompt_tokens_details.cached_tokens``) next to the local
+estimate of the stable prefix (see prompt_layout), printed by
+``print_cache_report``.
+
+Usage:
+    from token_budget import TokenBudget
+
+    budget = TokenBudget(WorkflowConfig.PHASE_TOKEN_BUDGETS, model=model, metadata=self.metadata)
+    messages, max_tokens, reserved = budget.prepare("analysis", messages, max_tokens)
+    ...
+    budget.record("analysis", reserved, messages, usage=response.usage, content=text)
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from context_compaction import extractive_brief
+from prompt_layout import stable_prefix_tokens
+from shared_config import Config
+from token_counter import count_message_tokens, count_tokens, truncate_to_tokens
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """A request cannot be made to fit its phase or workflow token budget"""
+
+
+def cached_prompt_tokens(usage: Any) -> Optional[int]:
+    """
+    Prompt tokens the provider served from its prefix cache.
+
+    Returns:
+        The count from ``prompt_tokens_details.cached_tokens`` (OpenAI, Groq) or
+        ``prompt_cache_hit_tokens`` (DeepSeek-style), or None when not reported
+    """
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+    details = get("prompt_tokens_details")
+    if details is not None:
+        if isinstance(details, dict):
+            cached = details.get("cached_tokens")
+        else:
+            cached = getattr(details, "cached_tokens", None)
+        if cached is not None:
+            return cached
+    return get("prompt_cache_hit_tokens")
+
+
+class TokenBudget:
+    """Tracks and enforces token spend per phase and per workflow run"""
+
+    def __init__(self, phase_limits: Optional[Dict[str, int]] = None,
+                 workflow_limit: Optional[int] = None, policy: Optional[str] = None,
+                 model: Optional[str] = None, enabled: Optional[bool] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            phase_limits: Prompt + completion budget per phase name
+                          (Config.PHASE_TOKEN_BUDGET for phases not listed)
+            workflow_limit: Budget for the whole run (default Config.WORKFLOW_TOKEN_BUDGET)
+            policy: "truncate", "compact" or "fail" (default Config.TOKEN_BUDGET_POLICY)
+            model: Model whose tokenizer is used for counting
+            enabled: Enforce budgets at all (default Config.TOKEN_BUDGET_ENABLED);
+                     usage is recorded either way
+            metadata: Run metadata dict that receives token totals
+        """
+        self.phase_limits = phase_limits or {}
+        self.workflow_limit = Config.WORKFLOW_TOKEN_BUDGET if workflow_limit is None else workflow_limit
+        self.policy = policy or Config.TOKEN_BUDGET_POLICY
+        self.model = model
+        self.enabled = Config.TOKEN_BUDGET_ENABLED if enabled is None else enabled
+        self.metadata = metadata
+        self.spent = 0
+        self.reserved = 0
+        self.phases: Dict[str, Dict[str, int]] = {}
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def phase_limit(self, phase: Optional[str]) -> int:
+        return self.phase_limits.get(phase, Config.PHASE_TOKEN_BUDGET)
+
+    def _stats(self, phase: Optional[str]) -> Dict[str, int]:
+        return self.phases.setdefault(phase or "-", {
+            "calls": 0, "estimated_prompt": 0, "prompt": 0, "completion": 0,
+            "cached": 0, "clamped": 0, "shrunk": 0,
+        })
+
+    # --------------------------------------------------------------------
+    # Preflight
+    # --------------------------------------------------------------------
+
+    def prepare(self, phase: Optional[str], messages: List[Dict[str, Any]],
+                max_tokens: int) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Fit a request into the budgets before it is sent.
+
+        Args:
+            phase: Phase making the request
+            messages: Chat messages
+            max_tokens: Requested completion limit
+
+        Returns:
+            Tuple of (messages, max_tokens, reserved tokens); messages and
+            max_tokens may be reduced to fit
+
+        Raises:
+            TokenBudgetExceeded: The request cannot fit (or policy is "fail")
+        """
+        prompt = count_message_tokens(messages, self.model)
+        with self._lock:
+            stats = self._stats(phase)
+            stats["estimated_prompt"] += prompt
+
+            ceiling = None
+            if self.enabled:
+                limits = []
+                if self.phase_limit(phase):
+                    limits.append(self.phase_limit(phase))
+                if self.workflow_limit:
+                    limits.append(self.workflow_limit - self.spent - self.reserved)
+                ceiling = min(limits) if limits else None
+
+            if ceiling is not None and prompt + max_tokens > ceiling:
+                floor = min(max_tokens, Config.MIN_COMPLETION_TOKENS)
+                if prompt + floor > ceiling:
+                    if self.policy == "fail":
+                        raise TokenBudgetExceeded(
+                            f"Phase '{phase}' needs {prompt} prompt + {floor} completion tokens, "
+                            f"budget allows {ceiling}")
+                    messages = self._shrink(messages, prompt - (ceiling - floor))
+                    prompt = count_message_tokens(messages, self.model)
+                    if prompt + floor > ceiling:
+                        raise TokenBudgetExceeded(
+                            f"Phase '{phase}' prompt is {prompt} tokens after {self.policy}, "
+                            f"budget allows {ceiling - floor}")
+                    stats["shrunk"] += 1
+                else:
+                    stats["clamped"] += 1
+                max_tokens = min(max_tokens, ceiling - prompt)
+
+            reserved = prompt + max_tokens
+            self.reserved += reserved
+        return messages, max_tokens, reserved
+
+    def _shrink(self, messages: List[Dict[str, Any]], excess: int) -> List[Dict[str, Any]]:
+        """Remove at least ``excess`` tokens from the longest non-system message"""
+        candidates = [i for i, m in enumerate(messages) if m.get("role") != "system"]
+        if not candidates:
+            return messages
+        index = max(candidates, key=lambda i: len(str(messages[i].get("content") or "")))
+        content = str(messages[index].get("content") or "")
+        allowed = count_tokens(content, self.model) - excess
+        if allowed <= 0:
+            return messages
+
+        if self.policy == "compact":
+            shrunk = extractive_brief(content, allowed)
+            if count_tokens(shrunk, self.model) > allowed:
+                shrunk = truncate_to_tokens(shrunk, allowed, self.model)
+        else:
+            shrunk = truncate_to_tokens(content, allowed, self.model)
+
+        messages = [dict(m) for m in messages]
+        messages[index]["content"] = shrunk
+        return messages
+
+    # --------------------------------------------------------------------
+    # Accounting
+    # --------------------------------------------------------------------
+
+    def release(self, reserved: int) -> None:
+        """Drop a reservation whose request was never billed (cache hit or failure)"""
+        with self._lock:
+            self.reserved -= reserved
+
+    def record(self, phase: Optional[str], reserved: int, messages: List[Dict[str, Any]],
+               usage: Any = None, content: str = "") -> None:
+        """
+        Book a completed request against the budgets.
+
+        Args:
+            phase: Phase that made the request
+            reserved: Value returned by prepare
+            messages: Messages that were sent
+            usage: ``response.usage`` (object or dict); counted locally when missing
+            content: Completion text, used when usage is missing
+        """
+        if usage is not None:
+            get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, 0)
+            prompt, completion = get("prompt_tokens") or 0, get("completion_tokens") or 0
+        else:
+            prompt = count_message_tokens(messages, self.model)
+            completion = count_tokens(content, self.model)
+        cached = cached_prompt_tokens(usage)
+        prefix = stable_prefix_tokens(messages, self.model)
+
+        with self._lock:
+            self.reserved -= reserved
+            self.spent += prompt + completion
+            stats = self._stats(phase)
+            stats["calls"] += 1
+            stats["prompt"] += prompt
+            stats["completion"] += completion
+            stats["cached"] += cached or 0
+            self.calls.append({"phase": phase or "-", "prompt": prompt, "cached": cached,
+                               "prefix": prefix})
+            if self.metadata is not None:
+                self.metadata["prompt_tokens"] = sum(s["prompt"] for s in self.phases.values())
+                self.metadata["completion_tokens"] = sum(s["completion"] for s in self.phases.values())
+                self.metadata["cached_prompt_tokens"] = sum(s["cached"] for s in self.phases.values())
+
+    def print_report(self) -> None:
+        """Print per-phase estimated vs billed tokens and the workflow total"""
+        if not self.phases:
+            return
+        print("\n" + "="*80)
+        print("TOKEN USAGE")
+        print("="*80)
+        for name, s in self.phases.items():
+            notes = []
+            if s["clamped"]:
+                notes.append(f"max_tokens lowered {s['clamped']}x")
+            if s["shrunk"]:
+                notes.append(f"input {'compacted' if self.policy == 'compact' else 'truncated'} "
+                             f"{s['shrunk']}x")
+            print(f"  {name:<12} prompt {s['prompt']:>6} (est. {s['estimated_prompt']:>6})  "
+                  f"completion {s['completion']:>6}  / budget {self.phase_limit(name) or '∞'}"
+                  + (f"  [{', '.join(notes)}]" if notes else ""))
+        limit = f" / {self.workflow_limit}" if self.workflow_limit else ""
+        print(f"  Workflow total: {self.spent}{limit} tokens")
+
+    def print_cache_report(self) -> None:
+        """Print cached vs uncached prompt tokens for every call of the run"""
+        if not self.calls:
+            return
+        print("\n" + "="*80)
+        print("PROMPT PREFIX CACHE")
+        print("="*80)
+        for call in self.calls:
+            if call["cached"] is None:
+                cached, uncached = "n/a", "n/a"
+            else:
+                cached, uncached = call["cached"], call["prompt"] - call["cached"]
+            print(f"  {call['phase']:<12} prompt {call['prompt']:>6}  cached {cached:>6}  "
+                  f"uncached {uncached:>6}  (stable prefix ~{call['prefix']})")
+        prompt = sum(c["prompt"] for c in self.calls)
+        cached = sum(c["cached"] or 0 for c in self.calls)
+        if not any(c["cached"] is not None for c in self.calls):
+            print("  The provider did not report cached prompt tokens")
+        elif prompt:
+            print(f"  Cached: {cached}/{prompt} prompt tokens ({cached / prompt:.0%})")
@@ -0,0 +1,448 @@
+"""
+Workflow Benchmark Suite for AutoGen and CrewAI Lab Demos
+
+Runs the real entry points against the local stub server (stub_server.py),
+so results are reproducible and cost nothing:
+
+- ``simple``:    SimpleInterviewPlatformWorkflow.run
+- ``five``:      FiveAgentWorkflow.run
+- ``interview``: InterviewPlatformWorkflow.execute_workflow (AutoGen agents)
+- ``crewai``:    crewai_demo.main
+
+Every scenario runs at each concurrency level (default 1, 8 and 64 runs in
+flight) in a fresh worker process, so peak RSS and module state are per
+level. Caches, checkpoints and rate limiting are switched off in the worker
+and its run store, length stats and reports go to a temporary directory.
+
+Reported per scenario and level:
+- latency p50 / p95 / p99 of whole runs, and throughput (runs per second)
+- framework overhead at concurrency 1: run time outside any HTTP call,
+  measured against the stub server's log of request windows
+- per-phase latency, time inside HTTP calls and overhead at concurrency 1
+  (requests are attributed to phases by their system prompt)
+- peak RSS of the worker
+
+Results are written as JSON to Config.BENCHMARK_DIR and compared with the
+stored baseline; any metric worse than the baseline by more than
+Config.BENCHMARK_REGRESSION_THRESHOLD is flagged and the exit code is 1.
+
+crewai_demo keeps the active run in module-level handles (CrewAI callbacks
+must be module functions), so at concurrency above 1 its saved reports can
+mix tasks of concurrent runs; timings are unaffected.
+
+Usage:
+    python benchmark.py                                  # all scenarios at 1, 8, 64
+    python benchmark.py --scenarios simple,five --concurrency 1,8 --runs 10
+    python benchmark.py --set COMPACTION_ENABLED=True    # measure a feature flag
+    python benchmark.py --save-baseline                  # store these results as the baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from shared_config import Config
+from stub_server import StubServer
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent
+
+SCENARIOS = {
+    "simple": "SimpleInterviewPlatformWorkflow.run",
+    "five": "FiveAgentWorkflow.run",
+    "interview": "InterviewPlatformWorkflow.execute_workflow",
+    "crewai": "crewai_demo.main",
+}
+
+# Worker settings: every run must reach the stub, and nothing may be served
+# from a cache or throttled by the provider quotas
+WORKER_ENV = {
+    "OPENAI_API_KEY": "sk-stub",
+    "GROQ_API_KEY": "",
+    "RATE_LIMIT_ENABLED": "False",
+    "LLM_CACHE_ENABLED": "False",
+    "PHASE_STORE_ENABLED": "False",
+    "TOOL_CACHE_ENABLED": "False",
+    "CHECKPOINT_ENABLED": "False",
+    "RUN_STORE_ENABLED": "True",
+    "RUN_STORE_BACKEND": "jsonl",
+    "RUN_STORE_COMPRESSION": "none",
+    "VERBOSE": "False",
+}
+
+# (metric, higher is worse, smallest change worth flagging)
+REGRESSION_METRICS = [
+    ("p50_s", True, 0.01),
+    ("p95_s", True, 0.01),
+    ("p99_s", True, 0.01),
+    ("overhead_s", True, 0.01),
+    ("throughput_rps", False, 0.0),
+    ("peak_rss_mb", True, 5.0),
+]
+
+# Destination of benchmark crewai runs; main() saves crewai/crewai_output_<destination>.txt
+CREWAI_DESTINATION = "Benchmark"
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile (q from 0 to 100), or None without values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def busy_seconds(windows: List[Tuple[float, float]], start: float, end: float) -> float:
+    """Length of the union of (start, end) windows, clipped to [start, end]"""
+    total, cursor = 0.0, start
+    for low, high in sorted(windows):
+        low, high = max(low, cursor), min(high, end)
+        if high > low:
+            total += high - low
+            cursor = high
+    return total
+
+
+def _key(text: str) -> str:
+    """Comparable start of a system prompt: whitespace collapsed, up to any template field"""
+    return " ".join(text.split("{")[0].split())[:80]
+
+
+# ============================================================================
+# WORKER: runs one scenario at one concurrency level
+# ============================================================================
+
+def _pipeline(workflow_class) -> Tuple[Callable[[], Callable[[], Any]], Dict[str, str]]:
+    keys = {spec.name: _key(spec.system_prompt) for spec in workflow_class.PHASES}
+    return (lambda: workflow_class(verbose=False).run), keys
+
+
+def prepare(scenario: str) -> Tuple[Callable[[], Callable[[], Any]], Dict[str, str]]:
+    """
+    Import a scenario's entry point.
+
+    Returns:
+        Tuple of (factory returning one run's zero-argument callable, so set-up
+        stays outside the timing; {phase: system prompt key} for attribution)
+    """
+    if scenario == "simple":
+        from autogen_simple_demo import SimpleInterviewPlatformWorkflow
+        return _pipeline(SimpleInterviewPlatformWorkflow)
+    if scenario == "five":
+        from autogen_5agent_demo import FiveAgentWorkflow
+        return _pipeline(FiveAgentWorkflow)
+    if scenario == "interview":
+        from autogen_interview_platform import InterviewPlatformWorkflow
+
+        workflow = InterviewPlatformWorkflow(_interview_agents())
+        keys = {spec.name: _key(workflow.system_prompt(spec)) for spec in workflow.PHASES}
+        return (lambda: InterviewPlatformWorkflow(_interview_agents()).execute_workflow), keys
+    if scenario == "crewai":
+        import crewai_demo
+
+        crew = crewai_demo.create_crew(CREWAI_DESTINATION, "5 days", "January 15-20, 2026", "New York")
+        keys = {task.name: _key(task.agent.role) for task in crew.tasks}
+        return (lambda: lambda: crewai_demo.main(destination=CREWAI_DESTINATION)), keys
+    raise ValueError(f"Unknown scenario '{scenario}' (expected one of {', '.join(SCENARIOS)})")
+
+
+def _interview_agents():
+    """The four AutoGen agents, created as autogen_interview_platform.main does"""
+    from autogen_interview_platform import InterviewPlatformAgents
+
+    agents = InterviewPlatformAgents(Config.get_config_list())
+    for create in (agents.create_research_agent, agents.create_analysis_agent,
+                   agents.create_blueprint_agent, agents.create_reviewer_agent):
+        create()
+    return agents
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def work(scenario: str, concurrency: int, runs: int, warmup: int, result_path: Path) -> None:
+    """Worker entry: time ``runs`` runs, ``concurrency`` at a time, and write the raw results"""
+    from run_store import RunStore
+
+    make, keys = prepare(scenario)
+    for _ in range(warmup):
+        make()()
+    store = RunStore()
+    seen = sum(1 for _ in store.iter_records())
+
+    calls = [make() for _ in range(runs)]
+    timings: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def timed(call: Callable[[], Any]) -> None:
+        start, error = time.time(), None
+        try:
+            call()
+        except BaseException as e:  # a failed run is a result, not a crash of the benchmark
+            error = f"{type(e).__name__}: {e}"
+        with lock:
+            timings.append({"start": start, "end": time.time(), "error": error})
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, calls))
+    finished = time.time()
+
+    records = list(store.iter_records())[seen:]
+    result = {
+        "start": started, "end": finished, "runs": timings, "phase_keys": keys,
+        "failed_runs": sum(r.get("status") not in (None, "completed") for r in records if r["kind"] == "run"),
+        "phases": [{"phase": r.get("phase"), "latency_s": r.get("latency_s")}
+                   for r in records if r["kind"] == "phase"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    result_path.write_text(json.dumps(result))
+
+
+# ============================================================================
+# DRIVER: starts the stub, runs the workers and summarises
+# ============================================================================
+
+def run_level(server: StubServer, scenario: str, concurrency: int, runs: int, warmup: int,
+              overrides: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Run one scenario at one concurrency level in a worker process.
+
+    Returns:
+        Level metrics, plus "phases" (per-phase metrics) at concurrency 1
+    """
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as tmp:
+        tmp = Path(tmp)
+        env = {**os.environ, **WORKER_ENV,
+               "OPENAI_API_BASE": server.url,
+               "RUN_STORE_PATH": str(tmp / "history.jsonl"),
+               "RUNS_DIR": str(tmp / "runs"),
+               "TRACE_PATH": str(tmp / "traces.jsonl"),
+               "LENGTH_STATS_PATH": str(tmp / "lengths.sqlite"),
+               "PYTHONPATH": os.pathsep.join(str(PROJECT_ROOT / d) for d in ("", "autogen", "crewai")),
+               **overrides}
+        result_path = tmp / "result.json"
+        command = [sys.executable, str(Path(__file__).resolve()), "--worker", scenario,
+                   "--concurrency", str(concurrency), "--runs", str(runs), "--warmup", str(warmup),
+                   "--result", str(result_path)]
+        log_path = tmp / "worker.log"
+        with open(log_path, "w") as log:
+            returncode = subprocess.call(command, cwd=tmp, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if returncode != 0 or not result_path.exists():
+            tail = log_path.read_text(errors="replace").strip().splitlines()[-15:]
+            raise RuntimeError(f"{scenario} worker failed (exit {returncode}):\n" + "\n".join(tail))
+        raw = json.loads(result_path.read_text())
+
+    requests = server.requests(raw["start"], raw["end"])
+    windows = [(entry["start"], entry["end"]) for entry in requests]
+    latencies = [run["end"] - run["start"] for run in raw["runs"] if not run["error"]]
+    errors = sum(run["error"] is not None for run in raw["runs"])
+    elapsed = raw["end"] - raw["start"]
+    metrics = {
+        "runs": len(raw["runs"]),
+        "errors": max(errors, raw["failed_runs"]),
+        "requests": len(requests),
+        "http_errors": sum(entry["status"] >= 400 for entry in requests),
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+        "peak_rss_mb": raw["peak_rss_mb"],
+    }
+    if concurrency == 1:
+        # Runs are sequential here, so every request in a run's window belongs to it
+        overheads = [(run["end"] - run["start"]) - busy_seconds(windows, run["start"], run["end"])
+                     for run in raw["runs"] if not run["error"]]
+        metrics["overhead_s"] = sum(overheads) / len(overheads) if overheads else None
+        metrics["overhead_share"] = (sum(overheads) / sum(latencies)) if latencies else None
+        metrics["phases"] = phase_metrics(raw, requests)
+    return metrics
+
+
+def phase_metrics(raw: Dict[str, Any], requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-phase latency (from the run store), HTTP time and overhead, averaged over runs"""
+    runs = max(1, sum(run["error"] is None for run in raw["runs"]))
+    phases: Dict[str, Dict[str, Any]] = {name: {"requests": 0, "http_s": 0.0, "latencies": []}
+                                         for name in raw["phase_keys"]}
+    for entry in requests:
+        system = " ".join(entry["system"].split())
+        name = next((name for name, key in raw["phase_keys"].items() if key and key in system), "(other)")
+        phase = phases.setdefault(name, {"requests": 0, "http_s": 0.0, "latencies": []})
+        phase["requests"] += 1
+        phase["http_s"] += entry["end"] - entry["start"]
+    for record in raw["phases"]:
+        if record["phase"] in phases and record["latency_s"] is not None:
+            phases[record["phase"]]["latencies"].append(record["latency_s"])
+
+    summary = {}
+    for name, phase in phases.items():
+        latency = sum(phase["latencies"]) / len(phase["latencies"]) if phase["latencies"] else None
+        http = phase["http_s"] / runs
+        summary[name] = {"requests": round(phase["requests"] / runs, 2), "latency_s": latency, "http_s": http,
+                         "overhead_s": latency - http if latency is not None else None}
+    return summary
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                     threshold: float) -> List[str]:
+    """Metrics worse than the baseline by more than ``threshold`` (relative) and the noise floor"""
+    regressions = []
+    for scenario, levels in results["scenarios"].items():
+        for level, metrics in levels.items():
+            before = baseline.get("scenarios", {}).get(scenario, {}).get(level)
+            if not before:
+                continue
+            for metric, higher_is_worse, floor in REGRESSION_METRICS:
+                old, new = before.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) if higher_is_worse else (old - new)
+                if change > floor and change / old > threshold:
+                    regressions.append(f"{scenario} @ {level}: {metric} {old:.3f} → {new:.3f} "
+                                       f"({(new - old) / old:+.0%})")
+    return regressions
+
+
+def _fmt(value: Optional[float], spec: str = ".3f", suffix: str = "") -> str:
+    return "-" if value is None else f"{value:{spec}}{suffix}"
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print the per-level table and the concurrency-1 phase breakdown of every scenario"""
+    print("\n" + "="*80)
+    print("BENCHMARK RESULTS")
+    print("="*80)
+    stub = results["stub"]
+    print(f"Stub: {stub['latency']}  |  {stub['tokens_per_second']:g} tokens/s  |  "
+          f"error rate {stub['error_rate']:g}  |  seed {stub['seed']}")
+    for scenario, levels in results["scenarios"].items():
+        print(f"\n{scenario}: {SCENARIOS[scenario]}")
+        print(f"  {'conc':>4} {'runs':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'runs/s':>8} {'overhead':>9} {'RSS MB':>8}")
+        for level, m in levels.items():
+            print(f"  {level:>4} {m['runs']:>5} {m['errors']:>4} {_fmt(m['p50_s'], '.2f', 's'):>8} "
+                  f"{_fmt(m['p95_s'], '.2f', 's'):>8} {_fmt(m['p99_s'], '.2f', 's'):>8} "
+                  f"{_fmt(m['throughput_rps'], '.2f'):>8} {_fmt(m.get('overhead_s'), '.3f', 's'):>9} "
+                  f"{_fmt(m['peak_rss_mb'], '.0f'):>8}")
+        phases = levels.get("1", {}).get("phases")
+        if phases:
+            print(f"  {'phase':<12} {'requests':>8} {'latency':>9} {'in HTTP':>9} {'overhead':>9}")
+            for name, p in phases.items():
+                print(f"  {name:<12} {p['requests']:>8g} {_fmt(p['latency_s'], '.3f', 's'):>9} "
+                      f"{_fmt(p['http_s'], '.3f', 's'):>9} {_fmt(p['overhead_s'], '.3f', 's'):>9}")
+
+
+def main():
+    """Run the benchmark suite (or, with --worker, one level of it)"""
+    parser = argparse.ArgumentParser(description="Benchmark the workflows against the local stub server")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default=Config.BENCHMARK_CONCURRENCY,
+                        help=f"Comma-separated concurrency levels (default {Config.BENCHMARK_CONCURRENCY})")
+    parser.add_argument("--runs", type=int, default=Config.BENCHMARK_RUNS,
+                        help="Timed runs per level (at least the concurrency level)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before each level")
+    parser.add_argument("--latency", default=Config.BENCHMARK_STUB_LATENCY, help="Stub time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=Config.BENCHMARK_STUB_TOKENS_PER_SECOND,
+                        help="Stub completion pacing")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub error rate")
+    parser.add_argument("--seed", type=int, default=7, help="Stub seed")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Environment override for the workers, e.g. COMPACTION_ENABLED=True")
+    parser.add_argument("--output", type=Path, help="Results file (default BENCHMARK_DIR/results_<time>.json)")
+    parser.add_argument("--baseline", type=Path, default=Config.BENCHMARK_BASELINE_PATH,
+                        help="Baseline to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        work(args.worker, int(args.concurrency), args.runs, args.warmup, args.result)
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)} (expected {', '.join(SCENARIOS)})")
+    levels = [int(level) for level in args.concurrency.split(",")]
+    overrides = dict(item.split("=", 1) for item in args.set)
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(),
+        "stub": {"latency": args.latency, "tokens_per_second": args.tokens_per_second,
+                 "error_rate": args.error_rate, "seed": args.seed},
+        "overrides": overrides, "scenarios": {},
+    }
+    server = StubServer(port=0, latency=args.latency, tokens_per_second=args.tokens_per_second,
+                        error_rate=args.error_rate, seed=args.seed)
+    with server:
+        for scenario in scenarios:
+            results["scenarios"][scenario] = {}
+            for level in levels:
+                runs = max(args.runs, level)
+                print(f"⏱️  {scenario} ({SCENARIOS[scenario]}): {runs} runs at concurrency {level}...")
+                try:
+                    results["scenarios"][scenario][str(level)] = run_level(
+                        server, scenario, level, runs, args.warmup, overrides)
+                except RuntimeError as e:
+                    print(f"❌ {e}")
+                    results["scenarios"][scenario][str(level)] = {"runs": runs, "errors": runs, "failed": str(e)}
+    crewai_output = PROJECT_ROOT / "crewai" / f"crewai_output_{CREWAI_DESTINATION.lower()}.txt"
+    crewai_output.unlink(missing_ok=True)
+
+    print_results({**results, "scenarios": {name: {level: m for level, m in levels.items() if "failed" not in m}
+                                            for name, levels in results["scenarios"].items()}})
+
+    output = args.output or Config.BENCHMARK_DIR / f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+    failed = any("failed" in m for levels in results["scenarios"].values() for m in levels.values())
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"📌 Baseline saved to: {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(results, baseline, Config.BENCHMARK_REGRESSION_THRESHOLD)
+        print(f"\nCompared with baseline {args.baseline} "
+              f"(threshold {Config.BENCHMARK_REGRESSION_THRESHOLD:.0%}):")
+        if (baseline.get("stub"), baseline.get("overrides")) != (results["stub"], results["overrides"]):
+            print("  ⚠️  The baseline was measured with different stub settings or overrides")
+        for regression in regressions:
+            print(f"  ⚠️  REGRESSION {regression}")
+        if not regressions:
+            print("  ✓ No regressions")
+        failed = failed or bool(regressions)
+    else:
+        print(f"\nNo baseline at {args.baseline}; store one with --save-baseline")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
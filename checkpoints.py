@@ -0,0 +1,153 @@
+"""
+Durable Run Checkpoints for AutoGen and CrewAI Lab Demos
+
+A workflow used to keep every phase output in memory until the final report
+was written, so a failure in the last phase threw away all the calls before
+it. ``RunCheckpoint`` persists each phase output to a run directory the
+moment the phase finishes:
+
+    .runs/<run_id>/manifest.json    workflow, inputs, status, timestamps
+    .runs/<run_id>/<phase>.json     one file per completed phase
+
+Every file is written to a temporary file in the same directory, fsynced and
+then renamed over the target, so a crash or Ctrl-C never leaves a partial
+checkpoint behind. Re-running an entry point with ``--resume <run_id>`` loads
+the completed phases and only executes the rest.
+
+Usage:
+    from checkpoints import RunCheckpoint
+
+    checkpoint = RunCheckpoint.create("FiveAgentWorkflow", inputs=brief)
+    checkpoint.save("research", research_output)
+    ...
+    checkpoint = RunCheckpoint.load(run_id, "FiveAgentWorkflow")
+    done = checkpoint.completed          # {"research": {"output": ..., ...}}
+"""
+
+import json
+import os
+import re
+import secrets
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from shared_config import Config
+
+
+class CheckpointError(RuntimeError):
+    """A run cannot be resumed (unknown run ID or a different workflow)"""
+
+
+def atomic_write_json(path: Path, payload: Any) -> None:
+    """Write JSON so that readers see either the old file or the complete new one"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def new_run_id() -> str:
+    """Sortable, collision-safe run ID, e.g. 20251114-143929-a1b2c3"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+class RunCheckpoint:
+    """Phase outputs of one workflow run, persisted as they complete"""
+
+    def __init__(self, run_id: str, workflow: str, root: Optional[Path] = None):
+        """
+        Args:
+            run_id: Run directory name
+            workflow: Name of the workflow that owns the run
+            root: Directory holding all runs (default Config.RUNS_DIR)
+        """
+        if not re.fullmatch(r"[\w.-]+", run_id):
+            raise CheckpointError(f"Invalid run ID '{run_id}'")
+        self.run_id = run_id
+        self.workflow = workflow
+        self.path = Path(root or Config.RUNS_DIR) / run_id
+        self.manifest: Dict[str, Any] = {}
+        self.completed: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def create(cls, workflow: str, inputs: Optional[Dict[str, Any]] = None,
+               root: Optional[Path] = None) -> "RunCheckpoint":
+        """Start a new run directory with a fresh run ID"""
+        checkpoint = cls(new_run_id(), workflow, root)
+        checkpoint.path.mkdir(parents=True, exist_ok=True)
+        now = datetime.now().isoformat(timespec="seconds")
+        checkpoint.manifest = {"run_id": checkpoint.run_id, "workflow": workflow,
+                               "inputs": inputs or {}, "status": "running",
+                               "created_at": now, "updated_at": now}
+        checkpoint._write_manifest()
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str, workflow: str, root: Optional[Path] = None) -> "RunCheckpoint":
+        """
+        Open an existing run to resume it.
+
+        Raises:
+            CheckpointError: The run does not exist or belongs to another workflow
+        """
+        checkpoint = cls(run_id, workflow, root)
+        manifest_path = checkpoint.path / "manifest.json"
+        if not manifest_path.exists():
+            raise CheckpointError(f"No checkpointed run '{run_id}' in {checkpoint.path.parent}")
+        checkpoint.manifest = json.loads(manifest_path.read_text())
+        if checkpoint.manifest.get("workflow") != workflow:
+            raise CheckpointError(f"Run '{run_id}' belongs to {checkpoint.manifest.get('workflow')}, "
+                                  f"not {workflow}")
+        for phase_path in sorted(checkpoint.path.glob("*.json")):
+            if phase_path.name != "manifest.json":
+                entry = json.loads(phase_path.read_text())
+                checkpoint.completed[entry["phase"]] = entry
+        checkpoint.update(status="running")
+        return checkpoint
+
+    @property
+    def inputs(self) -> Dict[str, Any]:
+        """Inputs the run was started with (the brief, trip details, ...)"""
+        return self.manifest.get("inputs", {})
+
+    def output(self, phase: str) -> Optional[str]:
+        """Checkpointed output of a phase, or None if it has not completed"""
+        entry = self.completed.get(phase)
+        return entry["output"] if entry else None
+
+    def save(self, phase: str, output: str, **extra: Any) -> None:
+        """
+        Persist a completed phase.
+
+        Args:
+            phase: Phase (output key) name
+            output: Phase output text
+            **extra: Additional JSON-serializable fields, e.g. the fingerprint
+        """
+        entry = {"phase": phase, "output": output, **extra,
+                 "completed_at": datetime.now().isoformat(timespec="seconds")}
+        atomic_write_json(self.path / f"{phase}.json", entry)
+        self.completed[phase] = entry
+
+    def update(self, **fields: Any) -> None:
+        """Update manifest fields such as status"""
+        self.manifest.update(fields, updated_at=datetime.now().isoformat(timespec="seconds"))
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        atomic_write_json(self.path / "manifest.json", self.manifest)
+
+    def resume_hint(self) -> str:
+        """One-line instruction printed when a run fails"""
+        return (f"💾 {len(self.completed)} completed phase(s) checkpointed in {self.path}\n"
+                f"   Resume with: --resume {self.run_id}")
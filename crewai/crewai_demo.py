@@ -21,12 +21,22 @@ Configuration:
 - Environment variables set in /Users/pranavhharish/Desktop/IS-492/multi-agent/.env
 """
 
+import argparse
+import functools
 import os
 import sys
 import json
-from pathlib import Path
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from crewai import Agent, Task, Crew
+from crewai.events import (LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent,
+                           TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+                           ToolUsageErrorEvent, ToolUsageFinishedEvent, crewai_event_bus)
+from crewai.tasks.task_output import TaskOutput
+from crewai.llms.providers.openai.completion import OpenAICompletion
 from crewai.tools import tool
 import requests
 
@@ -35,13 +45,29 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import shared configuration
 from shared_config import Config, validate_config
+from checkpoints import RunCheckpoint, new_run_id
+from model_router import ModelRouter, check_output, next_tier, tier_model
+from rate_limiter import estimate_request_tokens, estimate_text_tokens, get_rate_limiter
+from run_store import get_run_store, make_record, render_report
+from tool_cache import isolated_tool_cache, memoize_tool, print_tool_cache_stats
+from tracing import (COST, INPUT_TOKENS, MODEL, NULL_SPAN, OUTPUT_TOKENS, AnySpan, Span,
+                     llm_attributes, print_trace_summary, trace_span)
 
 
 # ============================================================================
 # TOOLS (Real API implementations using web search)
 # ============================================================================
+# Results are memoized per normalized arguments. TTLs follow how fast each kind
+# of data goes stale: fares change by the hour, attractions barely at all.
+
+FLIGHT_CACHE_TTL = 15 * 60             # 15 minutes
+HOTEL_CACHE_TTL = 6 * 3600             # 6 hours
+ATTRACTIONS_CACHE_TTL = 7 * 24 * 3600  # 1 week
+COSTS_CACHE_TTL = 24 * 3600            # 1 day
+
 
 @tool
+@memoize_tool(ttl=FLIGHT_CACHE_TTL)
 def search_flight_prices(destination: str, departure_city: str = "New York") -> str:
     """
     Search for real flight prices and options to a destination.
@@ -66,6 +92,7 @@ def search_flight_prices(destination: str, departure_city: str = "New York") ->
 
 
 @tool
+@memoize_tool(ttl=HOTEL_CACHE_TTL)
 def search_hotel_options(location: str, check_in_date: str) -> str:
     """
     Search for real hotel options using web search.
@@ -89,6 +116,7 @@ def search_hotel_options(location: str, check_in_date: str) -> str:
 
 
 @tool
+@memoize_tool(ttl=ATTRACTIONS_CACHE_TTL)
 def search_attractions_activities(destination: str) -> str:
     """
     Search for real attractions and activities in a destination.
@@ -114,6 +142,7 @@ def search_attractions_activities(destination: str) -> str:
 
 
 @tool
+@memoize_tool(ttl=COSTS_CACHE_TTL)
 def search_travel_costs(destination: str) -> str:
     """
     Search for real travel costs and budgeting information.
@@ -138,11 +167,89 @@ def search_travel_costs(destination: str) -> str:
     """
 
 
+# ============================================================================
+# SHARED LLMS
+# ============================================================================
+# Agents name a model tier (see model_router.py): the three research agents
+# summarize tool output on the fast tier, the budget synthesis needs the large one.
+
+AGENT_TIERS = {"flight": "fast", "hotel": "fast", "itinerary": "fast", "budget": "large"}
+
+
+class PacedLLM(OpenAICompletion):
+    """
+    CrewAI's native OpenAI LLM, paced by the shared rate limiter.
+
+    Every call reserves its prompt plus max_tokens from rate_limiter's RPM/TPM
+    budget for the model, the same file-locked budget the AutoGen workflows
+    draw on, so crews and workflows running side by side share one quota.
+    CrewAI does not hand usage back per call, so the reservation is settled
+    with the prompt plus the counted reply (or the prompt alone on failure).
+    """
+
+    def _reserve(self, messages: Any) -> Tuple[Any, int, int]:
+        """(limiter or None, reserved tokens, prompt tokens) for a call"""
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        prompt = estimate_request_tokens(messages, 0, self.model)
+        return get_rate_limiter(Config.API_BASE, self.model), prompt + (self.max_tokens or 0), prompt
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        limiter, estimate, actual = self._reserve(messages)
+        if limiter is None:
+            return super().call(messages, *args, **kwargs)
+        limiter.acquire(estimate)
+        try:
+            result = super().call(messages, *args, **kwargs)
+            actual += estimate_text_tokens(str(result), self.model)
+            return result
+        finally:
+            limiter.settle(estimate, actual)
+
+    async def acall(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        limiter, estimate, actual = self._reserve(messages)
+        if limiter is None:
+            return await super().acall(messages, *args, **kwargs)
+        await limiter.acquire_async(estimate)
+        try:
+            result = await super().acall(messages, *args, **kwargs)
+            actual += estimate_text_tokens(str(result), self.model)
+            return result
+        finally:
+            await limiter.settle_async(estimate, actual)
+
+
+@functools.lru_cache(maxsize=None)
+def create_llm(tier: Optional[str] = None):
+    """
+    Build the LLM shared by every agent on a model tier.
+
+    One LLM object per tier means one API client and keep-alive connection pool
+    per model instead of one per agent. CrewAI builds both a sync and an async
+    OpenAI client from the same client_params, so the process-wide pooled
+    httpx.Client cannot be passed through; each tier keeps its own pool.
+
+    Args:
+        tier: Model tier ("fast", "large"); None uses Config.OPENAI_MODEL
+    """
+    return PacedLLM(
+        model=tier_model(tier),
+        provider="openai",  # OpenAI-compatible endpoint (OpenAI or Groq)
+        base_url=Config.API_BASE,
+        api_key=Config.API_KEY,
+        temperature=Config.AGENT_TEMPERATURE,
+        max_tokens=Config.AGENT_MAX_TOKENS,
+        timeout=Config.AGENT_TIMEOUT,
+        max_retries=0,  # Same as every other client: no SDK-level retries (see Config.MAX_RETRIES)
+    )
+
+
+
 # ============================================================================
 # AGENT DEFINITIONS
 # ============================================================================
 
-def create_flight_agent(destination: str, trip_dates: str):
+def create_flight_agent(destination: str, trip_dates: str, llm=None):
     """Create the Flight Specialist agent with real research tools."""
     return Agent(
         role="Flight Specialist",
@@ -155,12 +262,13 @@ def create_flight_agent(destination: str, trip_dates: str):
                   "You have booked thousands of flights and know the best times to fly. "
                   "You always research current prices and use real booking site data.",
         tools=[search_flight_prices],
+        llm=llm,
         verbose=True,
         allow_delegation=False
     )
 
 
-def create_hotel_agent(destination: str, trip_dates: str):
+def create_hotel_agent(destination: str, trip_dates: str, llm=None):
     """Create the Accommodation Specialist agent with real research tools."""
     # Determine main city for hotels (if destination is just a country, use capital)
     hotel_location = destination
@@ -182,12 +290,13 @@ def create_hotel_agent(destination: str, trip_dates: str):
                   "hotels offer the best experience for different budgets. You always "
                   "check current availability and actual guest reviews.",
         tools=[search_hotel_options],
+        llm=llm,
         verbose=True,
         allow_delegation=False
     )
 
 
-def create_itinerary_agent(destination: str, trip_duration: str):
+def create_itinerary_agent(destination: str, trip_duration: str, llm=None):
     """Create the Travel Planner agent with real research tools."""
     return Agent(
         role="Travel Planner",
@@ -200,12 +309,13 @@ def create_itinerary_agent(destination: str, trip_duration: str):
                   f"You consider travel times, weather, and traveler preferences to craft the perfect journey. "
                   f"You always verify current information about attractions and tours.",
         tools=[search_attractions_activities],
+        llm=llm,
         verbose=True,
         allow_delegation=False
     )
 
 
-def create_budget_agent(destination: str):
+def create_budget_agent(destination: str, llm=None):
     """Create the Financial Advisor agent with real cost research tools."""
     return Agent(
         role="Financial Advisor",
@@ -217,6 +327,7 @@ def create_budget_agent(destination: str):
                   "compromising the travel experience. You research actual current prices "
                   "and provide realistic budget estimates.",
         tools=[search_travel_costs],
+        llm=llm,
         verbose=True,
         allow_delegation=False
     )
@@ -226,9 +337,11 @@ def create_budget_agent(destination: str):
 # TASK DEFINITIONS
 # ============================================================================
 
-def create_flight_task(flight_agent, destination: str, trip_dates: str, departure_city: str):
-    """Define the flight research task using real data."""
+def create_flight_task(flight_agent, destination: str, trip_dates: str, departure_city: str,
+                       async_execution: bool = False, guardrail=None):
+    """Define the flight research task using real data. Needs no other task's output."""
     return Task(
+        name="flight",
         description=f"Research and compile a list of REAL flight options from {departure_city} to {destination} "
                    f"for the trip ({trip_dates}). "
                    f"Use actual current flight data from booking sites like Skyscanner, Kayak, "
@@ -238,14 +351,18 @@ def create_flight_task(flight_agent, destination: str, trip_dates: str, departur
                    f"recommendations on which flight offers the best value considering both "
                    f"price and convenience.",
         agent=flight_agent,
+        context=[],
+        async_execution=async_execution,
+        guardrail=guardrail,
         expected_output=f"A detailed report with 2-3 REAL flight options from {departure_city} to {destination} "
                        f"including airlines, times, duration, current prices, and a recommendation with reasoning based on "
                        f"actual data from flight booking sites"
     )
 
 
-def create_hotel_task(hotel_agent, destination: str, trip_dates: str):
-    """Define the hotel recommendation task using real data."""
+def create_hotel_task(hotel_agent, destination: str, trip_dates: str, async_execution: bool = False,
+                      guardrail=None):
+    """Define the hotel recommendation task using real data. Needs no other task's output."""
     # Determine main city for hotels
     hotel_location = destination
     if destination.lower() == "iceland":
@@ -256,6 +373,7 @@ def create_hotel_task(hotel_agent, destination: str, trip_dates: str):
         hotel_location = "Tokyo"
 
     return Task(
+        name="hotel",
         description=f"Based on the trip dates ({trip_dates}), find and recommend "
                    f"the top 3-4 REAL hotels in {hotel_location}. Research actual hotels "
                    f"on Booking.com, TripAdvisor, Google Hotels, and Expedia. For each hotel, "
@@ -263,15 +381,20 @@ def create_hotel_task(hotel_agent, destination: str, trip_dates: str):
                    f"confirmed amenities, and explain why it suits this trip. "
                    f"Include a mix of budget, mid-range, and luxury options with honest reviews.",
         agent=hotel_agent,
+        context=[],
+        async_execution=async_execution,
+        guardrail=guardrail,
         expected_output=f"A curated list of 3-4 REAL hotel recommendations in {hotel_location} with actual details "
                        f"about each hotel, confirmed amenities, real guest ratings, current prices, "
                        f"and personalized recommendations based on actual guest reviews"
     )
 
 
-def create_itinerary_task(itinerary_agent, destination: str, trip_duration: str, trip_dates: str):
-    """Define the itinerary planning task using real information."""
+def create_itinerary_task(itinerary_agent, destination: str, trip_duration: str, trip_dates: str,
+                          context=None, guardrail=None):
+    """Define the itinerary planning task, built around the flight and hotel results in context."""
     return Task(
+        name="itinerary",
         description=f"Create a detailed {trip_duration} itinerary for {destination} ({trip_dates}) based on "
                    f"REAL current information. Research actual attractions, their opening hours, "
                    f"accessibility, and entry fees. Plan day-by-day activities including visits "
@@ -279,15 +402,19 @@ def create_itinerary_task(itinerary_agent, destination: str, trip_duration: str,
                    f"locations, activity durations, and recommended visit times. Consider actual "
                    f"weather patterns for this time period in {destination} and make the itinerary realistic and well-paced.",
         agent=itinerary_agent,
+        context=context or [],
+        guardrail=guardrail,
         expected_output=f"A detailed day-by-day itinerary for {destination} with REAL activities based on verified "
                        f"attractions, realistic travel times, accurate estimated durations, current "
                        f"entry fees, and practical tips for {trip_duration} trip to {destination}"
     )
 
 
-def create_budget_task(budget_agent, destination: str, trip_duration: str):
-    """Define the budget calculation task using real cost data."""
+def create_budget_task(budget_agent, destination: str, trip_duration: str, context=None,
+                       guardrail=None):
+    """Define the budget calculation task, which waits on every other task's output."""
     return Task(
+        name="budget",
         description=f"Based on the REAL flight options, hotel recommendations, and itinerary "
                    f"created by the other agents, calculate a comprehensive budget for the "
                    f"{trip_duration} {destination} trip using current pricing. Research and include actual "
@@ -297,6 +424,8 @@ def create_budget_task(budget_agent, destination: str, trip_duration: str):
                    f"for budget, mid-range, and luxury options based on real prices. Suggest "
                    f"genuine cost-saving tips based on current market conditions.",
         agent=budget_agent,
+        context=context or [],
+        guardrail=guardrail,
         expected_output=f"A comprehensive budget report with itemized REAL costs for flights, "
                        f"accommodation, meals, activities with actual entry fees, transportation, "
                        f"and total realistic estimates at different budget levels, plus "
@@ -304,13 +433,372 @@ def create_budget_task(budget_agent, destination: str, trip_duration: str):
     )
 
 
+# ============================================================================
+# MODEL TIER ESCALATION
+# ============================================================================
+
+class TierEscalation:
+    """
+    Task guardrail that moves an agent to the next model tier when its output
+    fails the router's check (empty, a refusal, far too short).
+
+    Returning ``(False, reason)`` makes CrewAI re-run the task, which by then
+    uses the agent's new, larger LLM. On the largest tier the output is
+    accepted as is. Tasks get the bound ``check`` method: CrewAI reads the
+    guardrail's source for its events, which a callable instance has none of.
+    """
+
+    def __init__(self, task_name: str, agent: Agent, tier: Optional[str],
+                 router: Optional[ModelRouter] = None):
+        self.task_name = task_name
+        self.agent = agent
+        self.tier = tier
+        self.router = router
+
+    def check(self, output: TaskOutput) -> Tuple[bool, Any]:
+        """Accept the output, or escalate the agent and ask for a retry"""
+        problem = check_output(output.raw)
+        bigger = next_tier(self.tier)
+        if problem is None or bigger is None:
+            if self.router is not None:
+                self.router.record(self.task_name, self.tier, tier_model(self.tier))
+            return True, output
+        if self.router is not None:
+            self.router.escalate(self.task_name, tier_model(self.tier), tier_model(bigger), problem)
+        print(f"[{self.agent.role} - {problem} on {tier_model(self.tier)}, retrying on {tier_model(bigger)}]")
+        self.tier = bigger
+        self.agent.llm = create_llm(bigger)
+        return False, f"The answer was rejected ({problem}). Provide the complete answer."
+
+
+# ============================================================================
+# TRACING
+# ============================================================================
+# CrewAI reports task, LLM and tool activity on its event bus, whose handlers
+# run on a thread pool in no particular order. The events are collected during
+# the kickoff and turned into spans once it returns: one per task under the
+# workflow span, and under each task one per LLM call and tool invocation.
+
+TRACED_EVENTS = (TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+                 LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+                 ToolUsageFinishedEvent, ToolUsageErrorEvent)
+
+
+def _ns(moment: datetime) -> int:
+    """Unix nanoseconds of an event timestamp"""
+    return int(moment.timestamp() * 1e9)
+
+
+class CrewTrace:
+    """Records the events of a crew kickoff as spans under a workflow span"""
+
+    def __init__(self, root: AnySpan):
+        """
+        Args:
+            root: Workflow span the task spans hang under (NULL_SPAN records nothing)
+        """
+        self.root = root
+        self.events: List[Any] = []
+        self._lock = threading.Lock()
+
+    def collect(self, source: Any, event: Any) -> None:
+        """Event bus handler: keep the event for build()"""
+        with self._lock:
+            self.events.append(event)
+
+    def __enter__(self) -> "CrewTrace":
+        if self.root:
+            for event_type in TRACED_EVENTS:
+                crewai_event_bus.register_handler(event_type, self.collect)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.root:
+            crewai_event_bus.flush()
+            for event_type in TRACED_EVENTS:
+                crewai_event_bus.off(event_type, self.collect)
+            self.build()
+
+    def build(self) -> None:
+        """Turn the collected events into ended task, LLM call and tool spans"""
+        tracer = self.root.tracer
+        events = sorted(self.events, key=lambda event: event.timestamp)
+        tasks: Dict[str, Span] = {}
+        totals: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            if isinstance(event, TaskStartedEvent) and event.task_id not in tasks:  # guardrail reruns share it
+                tasks[event.task_id] = tracer.start_span(
+                    f"task {event.task_name}", {"phase.name": event.task_name, "agent.name": event.agent_role},
+                    parent=self.root, start_ns=_ns(event.timestamp))
+
+        calls: Dict[str, Any] = {}
+        finished: Dict[str, Any] = {}
+        for event in events:
+            parent = tasks.get(event.task_id, self.root)
+            if isinstance(event, LLMCallStartedEvent):
+                calls[event.call_id] = event
+            elif isinstance(event, (LLMCallCompletedEvent, LLMCallFailedEvent)):
+                started = calls.pop(event.call_id, event)
+                span = tracer.start_span(
+                    f"chat {event.model}", {MODEL: event.model, "gen_ai.operation.name": "chat",
+                                            "phase.name": event.task_name, "agent.name": event.agent_role},
+                    kind="client", parent=parent, start_ns=_ns(started.timestamp))
+                if isinstance(event, LLMCallFailedEvent):
+                    span.fail(event.error)
+                else:
+                    attributes = llm_attributes(event.model, event.usage)
+                    span.set(attributes)
+                    task = totals.setdefault(event.task_id, {MODEL: event.model, INPUT_TOKENS: 0,
+                                                             OUTPUT_TOKENS: 0, COST: None})
+                    task[MODEL] = event.model
+                    task[INPUT_TOKENS] += attributes.get(INPUT_TOKENS, 0)
+                    task[OUTPUT_TOKENS] += attributes.get(OUTPUT_TOKENS, 0)
+                    if attributes.get(COST) is not None:
+                        task[COST] = (task[COST] or 0.0) + attributes[COST]
+                span.end(_ns(event.timestamp))
+            elif isinstance(event, (ToolUsageFinishedEvent, ToolUsageErrorEvent)):
+                error = isinstance(event, ToolUsageErrorEvent)
+                span = tracer.start_span(
+                    f"tool {event.tool_name}", {"tool.name": event.tool_name, "tool.run_attempts": event.run_attempts,
+                                                "tool.from_cache": None if error else event.from_cache,
+                                                "phase.name": event.task_name, "agent.name": event.agent_role},
+                    parent=parent, start_ns=_ns(event.timestamp if error else event.started_at))
+                if error:
+                    span.fail(str(event.error))
+                span.end(_ns(event.timestamp if error else event.finished_at))
+            elif isinstance(event, (TaskCompletedEvent, TaskFailedEvent)):
+                finished[event.task_id] = event
+
+        for task_id, span in tasks.items():
+            span.set(totals.get(task_id, {}))
+            event = finished.get(task_id)
+            if isinstance(event, TaskFailedEvent):
+                span.fail(event.error)
+            span.end(_ns(event.timestamp) if event is not None else None)
+
+
+# ============================================================================
+# CHECKPOINTS AND RUN HISTORY
+# ============================================================================
+# Each finished task is persisted to the run directory, so a failed run can be
+# resumed with --resume <run_id>, and appended to the run store, from which the
+# saved report is rendered. CrewAI wants module-level callbacks (closures
+# cannot be serialized), hence the module-level handles on the active run.
+
+CHECKPOINT_WORKFLOW = "crewai_travel_planning"
+TASK_TITLES = {
+    "flight": "FLIGHT OPTIONS",
+    "hotel": "HOTEL RECOMMENDATIONS",
+    "itinerary": "DAY-BY-DAY ITINERARY",
+    "budget": "FINAL TRAVEL PLAN REPORT",
+}
+_checkpoint: Optional[RunCheckpoint] = None
+_run_id: Optional[str] = None
+_tasks: Dict[str, Task] = {}
+_records: Dict[str, Dict[str, Any]] = {}
+
+
+def task_record(task: Task, output: str, status: str) -> Dict[str, Any]:
+    """Run store record of a finished (or restored) task"""
+    return make_record("phase", _run_id, CHECKPOINT_WORKFLOW, phase=task.name,
+                       title=TASK_TITLES.get(task.name, task.name.upper()), agent=task.agent.role,
+                       model=getattr(task.agent.llm, "model", None), status=status, output=output)
+
+
+def record_task(output: TaskOutput) -> None:
+    """Crew task_callback: persist a finished task to the run directory and run store"""
+    if not output.name:
+        return
+    if _checkpoint is not None:
+        _checkpoint.save(output.name, output.raw, agent=output.agent)
+    task = _tasks.get(output.name)
+    if _run_id is not None and task is not None:
+        _records[output.name] = task_record(task, output.raw, "executed")
+        store = get_run_store()
+        if store is not None:
+            store.append(_records[output.name])
+
+
+def restore_tasks(tasks: List[Task], checkpoint: Optional[RunCheckpoint]) -> List[Task]:
+    """
+    Give checkpointed tasks their saved output and return the tasks still to run.
+
+    Downstream tasks read their context from ``task.output``, so restored tasks
+    can stay in their context lists without being executed again.
+    """
+    remaining = []
+    for task in tasks:
+        saved = checkpoint.output(task.name) if checkpoint is not None else None
+        if saved is None:
+            remaining.append(task)
+        else:
+            task.output = TaskOutput(name=task.name, description=task.description,
+                                     raw=saved, agent=task.agent.role)
+            _records[task.name] = task_record(task, saved, "resumed")
+    return remaining
+
+
 # ============================================================================
 # CREW ORCHESTRATION
 # ============================================================================
 
+def create_crew(destination: str, trip_duration: str, trip_dates: str, departure_city: str,
+                llm=None, concurrent: bool = True,
+                checkpoint: Optional[RunCheckpoint] = None,
+                router: Optional[ModelRouter] = None, run_id: Optional[str] = None) -> Crew:
+    """
+    Build the travel planning crew with explicit task dependencies.
+
+    Flight and hotel research read nothing from other tasks, so with
+    ``concurrent`` they run as asynchronous tasks at the same time. The
+    itinerary waits for both, and the budget waits on everything.
+
+    Args:
+        destination: Travel destination
+        trip_duration: Duration of trip
+        trip_dates: Specific dates
+        departure_city: City you're departing from
+        llm: LLM for every agent, overriding AGENT_TIERS (no tier escalation)
+        concurrent: Run flight and hotel research concurrently instead of back to back
+        checkpoint: Run directory that receives each finished task; tasks it
+                    already holds are restored instead of run again
+        router: Records each task's final model and tier escalations
+        run_id: Run whose finished tasks are appended to the run store
+
+    Returns:
+        Crew: The assembled crew, ready for kickoff
+    """
+    global _checkpoint, _run_id
+    # Create agents with destination parameters
+    tiers = dict.fromkeys(AGENT_TIERS) if llm is not None else AGENT_TIERS
+    llms = {name: llm or create_llm(tier) for name, tier in tiers.items()}
+
+    print("[1/4] Creating Flight Specialist Agent (researches real flights)...")
+    flight_agent = create_flight_agent(destination, trip_dates, llm=llms["flight"])
+
+    print("[2/4] Creating Accommodation Specialist Agent (researches real hotels)...")
+    hotel_agent = create_hotel_agent(destination, trip_dates, llm=llms["hotel"])
+
+    print("[3/4] Creating Travel Planner Agent (researches real attractions)...")
+    itinerary_agent = create_itinerary_agent(destination, trip_duration, llm=llms["itinerary"])
+
+    print("[4/4] Creating Financial Advisor Agent (analyzes real costs)...")
+    budget_agent = create_budget_agent(destination, llm=llms["budget"])
+
+    def guardrail(name: str, agent: Agent) -> Optional[Callable[[TaskOutput], Tuple[bool, Any]]]:
+        """Escalation guardrail for a task, or None when its agent cannot escalate"""
+        if next_tier(tiers[name]) is None and router is None:
+            return None
+        return TierEscalation(name, agent, tiers[name], router).check
+
+    print("\n✅ All agents created successfully!")
+    print()
+
+    # Create tasks; context lists are the only data dependencies between them
+    print("Creating tasks for the crew...")
+    flight_task = create_flight_task(flight_agent, destination, trip_dates, departure_city,
+                                     async_execution=concurrent,
+                                     guardrail=guardrail("flight", flight_agent))
+    hotel_task = create_hotel_task(hotel_agent, destination, trip_dates,
+                                   async_execution=concurrent,
+                                   guardrail=guardrail("hotel", hotel_agent))
+    itinerary_task = create_itinerary_task(itinerary_agent, destination, trip_duration, trip_dates,
+                                           context=[flight_task, hotel_task],
+                                           guardrail=guardrail("itinerary", itinerary_agent))
+    budget_task = create_budget_task(budget_agent, destination, trip_duration,
+                                     context=[flight_task, hotel_task, itinerary_task],
+                                     guardrail=guardrail("budget", budget_agent))
+
+    print("Tasks created successfully!")
+    print()
+
+    tasks = [flight_task, hotel_task, itinerary_task, budget_task]
+    _run_id = run_id
+    _tasks.clear()
+    _tasks.update((task.name, task) for task in tasks)
+    _records.clear()
+    remaining = restore_tasks(tasks, checkpoint)
+    if len(remaining) < len(tasks):
+        print(f"Resuming run {checkpoint.run_id}: restored "
+              f"{', '.join(t.name for t in tasks if t not in remaining)} from checkpoint")
+        print()
+    _checkpoint = checkpoint
+
+    print("Forming the Travel Planning Crew...")
+    if concurrent:
+        print("Task Graph: (FlightAgent ∥ HotelAgent) → ItineraryAgent → BudgetAgent")
+    else:
+        print("Task Sequence: FlightAgent → HotelAgent → ItineraryAgent → BudgetAgent")
+    print()
+
+    return Crew(
+        agents=[task.agent for task in remaining],
+        tasks=remaining,
+        task_callback=record_task if checkpoint is not None or run_id is not None else None,
+        verbose=True,
+        # Async tasks run concurrently until the next synchronous task, which waits for them
+        process="sequential",
+    )
+
+
+REPORT_TITLE = "CrewAI Multi-Agent Travel Planning System - Real API Execution Report"
+
+
+def report_notes(trip: Dict[str, Any]) -> List[str]:
+    """Trip details and data caveats printed under the report header"""
+    return [
+        f"Planning a {trip['trip_duration']} Trip to {trip['destination']}",
+        "",
+        "Trip Details:",
+        f"  Destination: {trip['destination']}",
+        f"  Duration: {trip['trip_duration']}",
+        f"  Dates: {trip['trip_dates']}",
+        f"  Departure: {trip['departure_city']}",
+        f"  Travelers: {trip['travelers']}",
+        f"  Budget Preference: {trip['budget_preference']}",
+        "",
+        "API Version: REAL API CALLS (OpenAI GPT-4)",
+        "Data Source: Web research via OpenAI",
+        "",
+        "IMPORTANT NOTES:",
+        "- All flight prices, hotel costs, and attraction information is based on real data",
+        "- Prices are current as of the date this was run",
+        "- Hotel availability and prices may vary by booking date",
+        "- Weather conditions and attraction hours should be verified before travel",
+    ]
+
+
+def warm_up_llms() -> None:
+    """
+    Make one untimed call on every tier's LLM before a --compare run.
+
+    The first call in a process pays for client setup, lazy imports and the
+    TLS handshake (about a second). Without a warm-up that cost lands on
+    whichever timed run goes first, and the comparison flatters the second.
+    """
+    tiers_by_model = {tier_model(tier): tier for tier in AGENT_TIERS.values()}
+    for tier in tiers_by_model.values():
+        create_llm(tier).call("Reply with the single word OK.")
+
+
+def print_timing_comparison(sequential_seconds: float, concurrent_seconds: float) -> None:
+    """Print the before/after wall-clock times of a --compare run"""
+    print()
+    print("=" * 80)
+    print("WALL-CLOCK COMPARISON")
+    print("=" * 80)
+    saved = sequential_seconds - concurrent_seconds
+    speedup = sequential_seconds / concurrent_seconds if concurrent_seconds > 0 else float("inf")
+    print(f"  {'Before (sequential tasks):':<40}{sequential_seconds:8.1f}s")
+    print(f"  {'After (flight ∥ hotel concurrently):':<40}{concurrent_seconds:8.1f}s")
+    print(f"  {'Saved:':<40}{saved:8.1f}s ({speedup:.2f}x)")
+    print("=" * 80)
+
+
 def main(destination: str = "Iceland", trip_duration: str = "5 days",
          trip_dates: str = "January 15-20, 2026", departure_city: str = "New York",
-         travelers: int = 2, budget_preference: str = "mid-range"):
+         travelers: int = 2, budget_preference: str = "mid-range",
+         concurrent: bool = True, compare: bool = False, resume: Optional[str] = None):
     """
     Main function to orchestrate the travel planning crew.
 
@@ -321,7 +809,19 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         departure_city: City you're departing from (e.g., "New York", "Los Angeles")
         travelers: Number of travelers
         budget_preference: Budget level ("budget", "mid-range", "luxury")
+        concurrent: Run flight and hotel research concurrently
+        compare: Run the sequential crew first and print a before/after timing comparison
+        resume: Run ID of a failed run; its trip details and finished tasks are reused
     """
+    checkpoint = None
+    if resume:
+        # A resumed run plans the trip it was started with
+        checkpoint = RunCheckpoint.load(resume, CHECKPOINT_WORKFLOW)
+        trip = checkpoint.inputs
+        destination, trip_duration = trip["destination"], trip["trip_duration"]
+        trip_dates, departure_city = trip["trip_dates"], trip["departure_city"]
+        travelers, budget_preference = trip["travelers"], trip["budget_preference"]
+        compare = False
 
     print("=" * 80)
     print("CrewAI Multi-Agent Travel Planning System (REAL API VERSION)")
@@ -360,61 +860,78 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
     print("Tip: Check your API usage at https://platform.openai.com/account/usage")
     print()
 
-    # Create agents with destination parameters
-    print("[1/4] Creating Flight Specialist Agent (researches real flights)...")
-    flight_agent = create_flight_agent(destination, trip_dates)
-
-    print("[2/4] Creating Accommodation Specialist Agent (researches real hotels)...")
-    hotel_agent = create_hotel_agent(destination, trip_dates)
-
-    print("[3/4] Creating Travel Planner Agent (researches real attractions)...")
-    itinerary_agent = create_itinerary_agent(destination, trip_duration)
-
-    print("[4/4] Creating Financial Advisor Agent (analyzes real costs)...")
-    budget_agent = create_budget_agent(destination)
-
-    print("\n✅ All agents created successfully!")
-    print()
-
-    # Create tasks with destination parameters
-    print("Creating tasks for the crew...")
-    flight_task = create_flight_task(flight_agent, destination, trip_dates, departure_city)
-    hotel_task = create_hotel_task(hotel_agent, destination, trip_dates)
-    itinerary_task = create_itinerary_task(itinerary_agent, destination, trip_duration, trip_dates)
-    budget_task = create_budget_task(budget_agent, destination, trip_duration)
-
-    print("Tasks created successfully!")
-    print()
-
-    # Create the crew with sequential task execution
-    print("Forming the Travel Planning Crew...")
-    print("Task Sequence: FlightAgent → HotelAgent → ItineraryAgent → BudgetAgent")
-    print()
+    inputs = {
+        "trip_destination": destination,
+        "trip_duration": trip_duration,
+        "trip_dates": trip_dates,
+        "departure_city": departure_city,
+        "travelers": travelers,
+        "budget_preference": budget_preference
+    }
 
-    crew = Crew(
-        agents=[flight_agent, hotel_agent, itinerary_agent, budget_agent],
-        tasks=[flight_task, hotel_task, itinerary_task, budget_task],
-        verbose=True,
-        process="sequential"  # Sequential task execution
-    )
+    # Final model per task and any tier escalations, for the report
+    router = ModelRouter()
 
-    # Execute the crew
-    print("=" * 80)
-    print("Starting Crew Execution with REAL API Calls...")
-    print(f"Planning {trip_duration} trip to {destination} ({trip_dates})")
-    print("=" * 80)
-    print()
+    trip = {"destination": destination, "trip_duration": trip_duration,
+            "trip_dates": trip_dates, "departure_city": departure_city,
+            "travelers": travelers, "budget_preference": budget_preference}
+    if checkpoint is None and Config.CHECKPOINT_ENABLED:
+        checkpoint = RunCheckpoint.create(CHECKPOINT_WORKFLOW, inputs=trip)
+    run_id = checkpoint.run_id if checkpoint is not None else new_run_id()
+    store = get_run_store()
+    trace = NULL_SPAN
 
     try:
-        result = crew.kickoff(inputs={
-            "trip_destination": destination,
-            "trip_duration": trip_duration,
-            "trip_dates": trip_dates,
-            "departure_city": departure_city,
-            "travelers": travelers,
-            "budget_preference": budget_preference
-        })
+        if compare:
+            # "Before": the original strictly sequential run, timed for comparison. Both timed
+            # runs start warm (see warm_up_llms), and the baseline gets a throwaway tool
+            # cache, so the concurrent run does not find its tool results already cached.
+            print("⏱️  Warm-up call on each model (untimed)...")
+            warm_up_llms()
+            print("⏱️  Baseline run: every task one after another...")
+            sequential_crew = create_crew(destination, trip_duration, trip_dates, departure_city,
+                                          concurrent=False)
+            started = time.perf_counter()
+            with isolated_tool_cache():
+                sequential_crew.kickoff(inputs=inputs)
+            sequential_seconds = time.perf_counter() - started
+            print()
+            concurrent = True
+
+        # Execute the crew
+        print("=" * 80)
+        print("Starting Crew Execution with REAL API Calls...")
+        print(f"Planning {trip_duration} trip to {destination} ({trip_dates})")
+        print(f"Run ID: {run_id}")
+        print("=" * 80)
+        print()
 
+        started = time.perf_counter()
+        usage = {}
+        if checkpoint is not None and checkpoint.output("budget") is not None:
+            # The budget task runs last, so the checkpointed run is already complete
+            print("All tasks are checkpointed; nothing left to run.")
+            result = checkpoint.output("budget")
+            _records.clear()
+            for name, title in TASK_TITLES.items():
+                _records[name] = make_record("phase", run_id, CHECKPOINT_WORKFLOW, phase=name, title=title,
+                                             agent=checkpoint.completed[name].get("agent"),
+                                             status="resumed", output=checkpoint.output(name))
+        else:
+            crew = create_crew(destination, trip_duration, trip_dates, departure_city,
+                               concurrent=concurrent, checkpoint=checkpoint, router=router,
+                               run_id=run_id)
+            with trace_span(f"workflow {CHECKPOINT_WORKFLOW}",
+                            {"workflow.name": CHECKPOINT_WORKFLOW, "run.id": run_id}) as trace, CrewTrace(trace):
+                result = crew.kickoff(inputs=inputs)
+            token_usage = getattr(result, "token_usage", None)
+            if token_usage is not None:
+                usage = {"prompt_tokens": token_usage.prompt_tokens,
+                         "completion_tokens": token_usage.completion_tokens,
+                         "requests": token_usage.successful_requests}
+        elapsed_seconds = time.perf_counter() - started
+        if checkpoint is not None:
+            checkpoint.update(status="completed")
         print()
         print("=" * 80)
         print("✅ Crew Execution Completed Successfully!")
@@ -425,41 +942,39 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         print(result)
         print("-" * 80)
 
-        # Save output to file
+        # Record the run, then save the report rendered from the run's records
+        run_record = make_record(
+            "run", run_id, CHECKPOINT_WORKFLOW, title=REPORT_TITLE, model=Config.OPENAI_MODEL,
+            status="completed", inputs=trip,
+            metadata={"elapsed_seconds": round(elapsed_seconds, 1), **usage},
+            notes=report_notes(trip),
+        )
+        if store is not None:
+            store.append(run_record)
         output_filename = f"crewai_output_{destination.lower()}.txt"
         output_path = Path(__file__).parent / output_filename
-
         with open(output_path, "w") as f:
-            f.write("=" * 80 + "\n")
-            f.write("CrewAI Multi-Agent Travel Planning System - Real API Execution Report\n")
-            f.write(f"Planning a {trip_duration} Trip to {destination}\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(f"Trip Details:\n")
-            f.write(f"  Destination: {destination}\n")
-            f.write(f"  Duration: {trip_duration}\n")
-            f.write(f"  Dates: {trip_dates}\n")
-            f.write(f"  Departure: {departure_city}\n")
-            f.write(f"  Travelers: {travelers}\n")
-            f.write(f"  Budget Preference: {budget_preference}\n\n")
-            f.write(f"Execution Time: {datetime.now()}\n")
-            f.write(f"API Version: REAL API CALLS (OpenAI GPT-4)\n")
-            f.write(f"Data Source: Web research via OpenAI\n\n")
-            f.write("IMPORTANT NOTES:\n")
-            f.write("- All flight prices, hotel costs, and attraction information is based on real data\n")
-            f.write("- Prices are current as of the date this was run\n")
-            f.write("- Hotel availability and prices may vary by booking date\n")
-            f.write("- Weather conditions and attraction hours should be verified before travel\n\n")
-            f.write("FINAL TRAVEL PLAN REPORT:\n")
-            f.write("-" * 80 + "\n")
-            f.write(str(result))
-            f.write("\n" + "-" * 80 + "\n")
+            f.write(render_report(run_record, [_records[name] for name in TASK_TITLES if name in _records]))
 
         print(f"\n✅ Output saved to {output_filename}")
+        if store is not None:
+            print(f"🗂️  Run {run_id} recorded in {store.path}")
+        print(f"⏱️  Crew wall-clock time: {elapsed_seconds:.1f}s "
+              f"({'concurrent' if concurrent else 'sequential'} flight/hotel research)")
+        if compare:
+            print_timing_comparison(sequential_seconds, elapsed_seconds)
         print("ℹ️  Note: All data in this report is based on REAL API calls to OpenAI")
         print("    and research of current travel information sources.")
 
     except Exception as e:
         print(f"\n❌ Error during crew execution: {str(e)}")
+        if store is not None:
+            store.append(make_record("run", run_id, CHECKPOINT_WORKFLOW, title=REPORT_TITLE,
+                                     model=Config.OPENAI_MODEL, status="failed", inputs=trip,
+                                     metadata={"error": f"{type(e).__name__}: {e}"}))
+        if checkpoint is not None:
+            checkpoint.update(status="failed")
+            print(checkpoint.resume_hint())
         print("\n🔍 Troubleshooting:")
         print("   1. Verify OPENAI_API_KEY is set: export OPENAI_API_KEY='sk-...'")
         print("   2. Check API key is valid and has sufficient credits")
@@ -469,34 +984,37 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         import traceback
         traceback.print_exc()
 
+    router.print_report()
+    print_tool_cache_stats()
+    print_trace_summary(trace)
 
-if __name__ == "__main__":
-    # Allow command line arguments to override defaults
-    import sys
-
-    kwargs = {
-        "destination": "Iceland",
-        "trip_duration": "5 days",
-        "trip_dates": "January 15-20, 2026",
-        "departure_city": "New York",
-        "travelers": 2,
-        "budget_preference": "mid-range"
-    }
 
-    # Parse command line arguments (optional)
-    # Usage: python crewai_demo.py [destination] [duration] [departure_city]
-    # Example: python crewai_demo.py "France" "7 days" "Los Angeles"
-    if len(sys.argv) > 1:
-        kwargs["destination"] = sys.argv[1]
-    if len(sys.argv) > 2:
-        kwargs["trip_duration"] = sys.argv[2]
-    if len(sys.argv) > 3:
-        kwargs["departure_city"] = sys.argv[3]
-    if len(sys.argv) > 4:
-        kwargs["trip_dates"] = sys.argv[4]
-    if len(sys.argv) > 5:
-        kwargs["travelers"] = int(sys.argv[5])
-    if len(sys.argv) > 6:
-        kwargs["budget_preference"] = sys.argv[6]
-
-    main(**kwargs)
+if __name__ == "__main__":
+    # Usage: python crewai_demo.py [destination] [duration] [departure_city] [dates] [travelers] [budget]
+    # Example: python crewai_demo.py "France" "7 days" "Los Angeles" --compare
+    parser = argparse.ArgumentParser(description="CrewAI travel planning crew")
+    parser.add_argument("destination", nargs="?", default="Iceland")
+    parser.add_argument("trip_duration", nargs="?", default="5 days")
+    parser.add_argument("departure_city", nargs="?", default="New York")
+    parser.add_argument("trip_dates", nargs="?", default="January 15-20, 2026")
+    parser.add_argument("travelers", nargs="?", type=int, default=2)
+    parser.add_argument("budget_preference", nargs="?", default="mid-range")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Run every task back to back (the pre-concurrency behavior)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Run sequentially, then concurrently, and print both wall-clock times")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run, skipping the tasks it already completed")
+    args = parser.parse_args()
+
+    main(
+        destination=args.destination,
+        trip_duration=args.trip_duration,
+        trip_dates=args.trip_dates,
+        departure_city=args.departure_city,
+        travelers=args.travelers,
+        budget_preference=args.budget_preference,
+        concurrent=not args.sequential,
+        compare=args.compare,
+        resume=args.resume,
+    )
@@ -0,0 +1,226 @@
+"""
+Persistent LLM Response Cache for AutoGen and CrewAI Lab Demos
+
+Content-addressed, on-disk cache for chat completions. Entries are keyed on a
+hash of (model, api_base, temperature, max_tokens, messages), so re-running a
+demo with byte-identical prompts is served from disk instead of the provider.
+
+The cache is a single SQLite file, which makes it safe to share between
+threads and between processes running demos side by side. Entries expire
+after a TTL and the least recently used entries are evicted once the cache
+holds more than ``Config.LLM_CACHE_MAX_ENTRIES`` responses.
+
+``ResponseCache`` also implements AutoGen's cache protocol (get/set/close and
+the context manager methods), so it can be assigned to
+``ConversableAgent.client_cache``.
+
+Usage:
+    from llm_cache import ResponseCache, get_response_cache
+
+    cache = get_response_cache()          # None when disabled in Config
+    if cache is not None:
+        key = ResponseCache.make_key(model, api_base, temperature, max_tokens, messages)
+        hit = cache.get(key)
+        hit = await cache.get_async(key)      # in a coroutine: SQLite I/O off the event loop
+"""
+
+import asyncio
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from shared_config import Config
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path: Path, max_entries: int = 10000, ttl: Optional[float] = None,
+                 bypass: bool = False):
+        """
+        Args:
+            path: SQLite file holding the cache (created if missing)
+            max_entries: Number of responses kept before LRU eviction kicks in
+            ttl: Default time-to-live in seconds (None or 0 keeps entries forever)
+            bypass: Skip lookups (always miss) but keep writing fresh responses
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl or None
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    # --------------------------------------------------------------------
+    # Keys
+    # --------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(model: str, api_base: str, temperature: float, max_tokens: int,
+                 messages: List[Dict[str, Any]], **extra: Any) -> str:
+        """Stable content hash of everything that determines a completion"""
+        payload = {
+            "model": model,
+            "api_base": str(api_base).rstrip("/"),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            **extra,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        # AutoGen hands us its own (long, JSON) keys; store everything hashed
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    # --------------------------------------------------------------------
+    # Storage
+    # --------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default on a miss / expiry / bypass"""
+        if self.bypass:
+            self.misses += 1
+            return default
+
+        digest = self._digest(key)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (digest,))
+                conn.commit()
+                self.misses += 1
+                return default
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, digest))
+            conn.commit()
+
+        self.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting least recently used entries if over capacity"""
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self._digest(key), blob, now, expires_at, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            conn.commit()
+
+    async def get_async(self, key: str, default: Any = None) -> Any:
+        """get() in a worker thread, so concurrent coroutines do not wait on disk I/O"""
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """set() in a worker thread, so concurrent coroutines do not wait on disk I/O"""
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def purge_expired(self) -> int:
+        """Delete every expired entry. Returns the number of rows removed."""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying connection (reopened lazily on next use)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # AutoGen wraps every cache access in ``with cache:``. The shared cache
+    # outlives a single completion, so entering/exiting must not close it.
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the process-wide response cache configured in shared_config.Config.
+
+    Returns:
+        Optional[ResponseCache]: The shared cache, or None when LLM_CACHE_ENABLED is false
+    """
+    global _shared_cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                Config.LLM_CACHE_PATH,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+                ttl=Config.LLM_CACHE_TTL,
+                bypass=Config.LLM_CACHE_BYPASS,
+            )
+    return _shared_cache
@@ -0,0 +1,137 @@
+"""
+Model Tier Routing for AutoGen and CrewAI Lab Demos
+
+Agents and phases used to share Config.OPENAI_MODEL, so a one-paragraph
+summary went to the same 70B / GPT-4 class model as the heavy reviewer
+reasoning. Agents and phases now name a tier instead of a model:
+
+- ``fast``:  small, cheap, high-throughput model (8B class)
+- ``large``: the big model for synthesis and review
+
+``tier_model`` maps a tier to the concrete model in Config.MODEL_TIERS.
+When an output fails ``check_output`` (empty, a refusal, truncated, or far
+below its word budget), the caller retries on the next tier up
+(``fallback_models``). ``ModelRouter`` records which model each phase ended
+up on and every escalation, for the run report.
+
+With MODEL_ROUTING_ENABLED=False every tier resolves to Config.OPENAI_MODEL
+and nothing escalates.
+
+Usage:
+    from model_router import ModelRouter, check_output, fallback_models, tier_model
+
+    model = tier_model("fast")
+    output = call(model)
+    for bigger in fallback_models("fast", model):
+        problem = check_output(output, words=150)
+        if problem is None:
+            break
+        router.escalate("analysis", model, bigger, problem)
+        model, output = bigger, call(bigger)
+    router.record("analysis", "fast", model)
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from shared_config import Config
+
+_REFUSAL = re.compile(r"^\s*(I'm sorry|I am sorry|I apologize|I can(?:no|')t (?:help|assist|provide))",
+                      re.IGNORECASE)
+
+
+def tier_model(tier: Optional[str]) -> str:
+    """Concrete model for a tier (Config.OPENAI_MODEL for no tier or when routing is off)"""
+    if not tier or not Config.MODEL_ROUTING_ENABLED:
+        return Config.OPENAI_MODEL
+    if tier not in Config.MODEL_TIERS:
+        raise ValueError(f"Unknown model tier '{tier}' (expected one of {', '.join(Config.MODEL_TIERS)})")
+    return Config.MODEL_TIERS[tier]
+
+
+def next_tier(tier: Optional[str]) -> Optional[str]:
+    """The tier above ``tier`` that maps to a different model, or None"""
+    if not tier or not Config.MODEL_ROUTING_ENABLED or tier not in Config.MODEL_TIER_ORDER:
+        return None
+    current = tier_model(tier)
+    for bigger in Config.MODEL_TIER_ORDER[Config.MODEL_TIER_ORDER.index(tier) + 1:]:
+        if tier_model(bigger) != current:
+            return bigger
+    return None
+
+
+def fallback_models(tier: Optional[str], model: str) -> List[str]:
+    """Models to escalate to, in order, after ``model`` (serving ``tier``) fails validation"""
+    models = []
+    while (tier := next_tier(tier)) is not None:
+        if tier_model(tier) not in models and tier_model(tier) != model:
+            models.append(tier_model(tier))
+    return models
+
+
+def check_output(text: str, words: Optional[int] = None, truncated: bool = False) -> Optional[str]:
+    """
+    Cheap local validation of a completion.
+
+    Args:
+        text: Completion text
+        words: Declared word budget, if any
+        truncated: The provider stopped at max_tokens
+
+    Returns:
+        Optional[str]: Why the output is unacceptable, or None if it passes
+    """
+    text = (text or "").strip()
+    if not text:
+        return "empty output"
+    if _REFUSAL.match(text):
+        return "refusal"
+    if truncated:
+        return "truncated"
+    count = len(text.split())
+    minimum = max(Config.ROUTER_MIN_WORDS, int(Config.ROUTER_MIN_WORD_FRACTION * (words or 0)))
+    if count < minimum:
+        return f"too short ({count} words, expected at least {minimum})"
+    return None
+
+
+class ModelRouter:
+    """Records the model each phase ran on and every escalation"""
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            metadata: Run metadata dict that receives "escalations"
+        """
+        self.metadata = metadata
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def escalate(self, phase: str, model: str, bigger: str, problem: str) -> None:
+        """Note that a phase's output on ``model`` failed validation and is retried on ``bigger``"""
+        with self._lock:
+            route = self.routes.setdefault(phase, {"tier": None, "model": model, "escalations": []})
+            route["escalations"].append(f"{model}: {problem}")
+            if self.metadata is not None:
+                self.metadata["escalations"] = sum(len(r["escalations"]) for r in self.routes.values())
+
+    def record(self, phase: str, tier: Optional[str], model: str) -> None:
+        """Note the model whose output a phase kept"""
+        with self._lock:
+            route = self.routes.setdefault(phase, {"tier": tier, "model": model, "escalations": []})
+            route.update(tier=tier, model=model)
+
+    def print_report(self) -> None:
+        """Print tier and final model per phase, with the reason for every escalation"""
+        if not self.routes or not Config.MODEL_ROUTING_ENABLED:
+            return
+        print("\n" + "="*80)
+        print("MODEL ROUTING")
+        print("="*80)
+        for phase, route in self.routes.items():
+            print(f"  {phase:<12} {route['tier'] or '-':<6} → {route['model']}")
+            for escalation in route["escalations"]:
+                print(f"  {'':<12} escalated after {escalation}")
+        escalations = sum(len(r["escalations"]) for r in self.routes.values())
+        print(f"  Escalations: {escalations}/{len(self.routes)} phases")
@@ -0,0 +1,184 @@
+"""
+Provider-Aware Rate Limiter for AutoGen and CrewAI Lab Demos
+
+Token-bucket limiter that budgets both requests per minute and tokens per
+minute for each (API base, model) pair, so parallel runs stay just under the
+provider quota (e.g. Groq's free tier) instead of bursting into 429s and
+backing off.
+
+Callers reserve capacity before sending a request. A reservation always
+succeeds immediately and returns how long the caller must wait, which paces
+requests smoothly instead of polling. Once the response arrives the caller
+reports the real token usage and any over-estimate is credited back.
+
+Bucket state lives in a small JSON file guarded by an exclusive file lock, so
+one budget is shared by threads, asyncio tasks and every local process using
+the same state directory. On platforms without ``fcntl`` the limiter still
+works, but only within a single process. The async methods run that file I/O
+in a worker thread, so a contended lock never stalls the event loop.
+
+Usage:
+    from rate_limiter import get_rate_limiter, estimate_request_tokens
+
+    limiter = get_rate_limiter(Config.API_BASE, model)
+    estimate = estimate_request_tokens(messages, max_tokens, model)
+    await limiter.acquire_async(estimate)      # or limiter.acquire(...) in threads
+    response = ...
+    await limiter.settle_async(estimate, response.usage.total_tokens)   # or limiter.settle(...)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+from shared_config import Config
+from token_counter import count_message_tokens, count_tokens
+
+
+def estimate_text_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of text for budgeting (local tokenizer, heuristic fallback)"""
+    return count_tokens(text, model)
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: int,
+                            model: Optional[str] = None) -> int:
+    """Prompt tokens plus the completion tokens the request may consume"""
+    return count_message_tokens(messages, model) + max_tokens
+
+
+class RateLimiter:
+    """Two token buckets (requests and tokens) refilled continuously per minute"""
+
+    def __init__(self, key: str, rpm: float, tpm: float, state_dir: Path,
+                 burst_seconds: float = 10.0):
+        """
+        Args:
+            key: Identifier of the budget, e.g. "<api_base>|<model>"
+            rpm: Requests per minute to stay under
+            tpm: Tokens per minute to stay under
+            state_dir: Directory holding shared bucket state files
+            burst_seconds: How many seconds of budget may be spent at once
+        """
+        self.key = key
+        self.request_rate = rpm / 60.0
+        self.token_rate = tpm / 60.0
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = state_dir / f"{digest}.json"
+        self.lock_path = state_dir / f"{digest}.lock"
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    # --------------------------------------------------------------------
+    # Shared state
+    # --------------------------------------------------------------------
+
+    def _update(self, requests: float, tokens: float) -> float:
+        """
+        Refill both buckets, debit the given amounts and return the wait time.
+
+        Levels may go negative: a negative level is capacity already promised
+        to earlier callers, and the wait is how long it takes to refill it.
+        """
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                try:
+                    state = json.loads(self.state_path.read_text())
+                except (OSError, ValueError):
+                    state = {"requests": self.request_capacity,
+                             "tokens": self.token_capacity, "updated": now}
+
+                elapsed = max(0.0, now - state["updated"])
+                req_level = min(self.request_capacity, state["requests"] + elapsed * self.request_rate)
+                tok_level = min(self.token_capacity, state["tokens"] + elapsed * self.token_rate)
+
+                # A negative debit (refund) can never lift a bucket above capacity
+                req_level = min(self.request_capacity, req_level - requests)
+                tok_level = min(self.token_capacity, tok_level - tokens)
+                wait = max(0.0, -req_level / self.request_rate, -tok_level / self.token_rate)
+
+                tmp_path = self.state_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps({"requests": req_level, "tokens": tok_level, "updated": now}))
+                os.replace(tmp_path, self.state_path)
+                return wait
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --------------------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------------------
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; return seconds to wait before sending"""
+        wait = self._update(1, tokens)
+        self.total_wait += wait
+        return wait
+
+    def acquire(self, tokens: int) -> float:
+        """Blocking reservation for threads. Returns the time spent waiting."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int) -> float:
+        """Non-blocking reservation for asyncio tasks. Returns the time spent waiting."""
+        wait = await asyncio.to_thread(self.reserve, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Credit back (or charge) the difference between estimated and actual tokens"""
+        if actual is None or actual == estimated:
+            return
+        self._update(0, actual - estimated)
+
+    async def settle_async(self, estimated: int, actual: Optional[int]) -> None:
+        """``settle`` for asyncio tasks, with the state file I/O off the event loop"""
+        await asyncio.to_thread(self.settle, estimated, actual)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_base: str, model: str) -> Optional[RateLimiter]:
+    """
+    Get the shared limiter for an (API base, model) pair.
+
+    Returns:
+        Optional[RateLimiter]: The limiter, or None when RATE_LIMIT_ENABLED is false
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return None
+    key = (str(api_base).rstrip("/"), model)
+    with _limiters_lock:
+        if key not in _limiters:
+            rpm, tpm = Config.get_rate_limits(model)
+            headroom = Config.RATE_LIMIT_HEADROOM
+            _limiters[key] = RateLimiter(
+                "|".join(key),
+                rpm=rpm * headroom,
+                tpm=tpm * headroom,
+                state_dir=Config.RATE_LIMIT_STATE_DIR,
+                burst_seconds=Config.RATE_LIMIT_BURST_SECONDS,
+            )
+        return _limiters[key]
@@ -0,0 +1,225 @@
+"""
+Retry, Backoff and Hedged-Request Layer for AutoGen and CrewAI Lab Demos
+
+Transient provider errors (429s, timeouts, dropped connections, 5xx) are
+retried up to ``Config.MAX_RETRIES`` times with full-jitter exponential
+backoff. A ``Retry-After`` header from the provider always wins over the
+computed delay.
+
+Optional hedging targets tail latency: if a request has not answered after
+the observed p95 latency for its model, an identical duplicate is sent and
+whichever finishes first is used. The slower one is cancelled.
+
+Retry and hedge counts are added to a caller-supplied metadata dict so they
+end up in the run's saved results.
+
+Usage:
+    from retry_policy import RetryPolicy, call_with_retries
+
+    metadata = {}
+    result = await call_with_retries(lambda: send_request(), RetryPolicy.from_config(),
+                                     metadata=metadata, latency_key=model)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import openai
+
+from shared_config import Config
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for errors that a later identical request may not hit"""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Parse a Retry-After (or retry-after-ms) header from a provider error, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff that honors Retry-After"""
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        return cls(Config.MAX_RETRIES, Config.RETRY_BASE_DELAY, Config.RETRY_MAX_DELAY)
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to sleep before retry number ``attempt`` (0-based)"""
+        server_hint = retry_after_seconds(error)
+        if server_hint is not None:
+            return min(server_hint, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per key (usually the model)"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key: str, q: float, min_samples: int) -> Optional[float]:
+        """Latency quantile, or None until enough samples have been seen"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+latency_tracker = LatencyTracker()
+
+
+def _count(metadata: Optional[Dict[str, Any]], name: str) -> None:
+    if metadata is not None:
+        metadata[name] = metadata.get(name, 0) + 1
+
+
+async def _hedged(make_call: Callable[[], Awaitable[Any]], hedge_after: float,
+                  metadata: Optional[Dict[str, Any]]) -> Any:
+    """Run make_call, adding one duplicate if the first has not finished in time"""
+    primary = asyncio.ensure_future(make_call())
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    _count(metadata, "hedges")
+    backup = asyncio.ensure_future(make_call())
+    pending = {primary, backup}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        _count(metadata, "hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_with_retries(
+    make_call: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    *,
+    metadata: Optional[Dict[str, Any]] = None,
+    latency_key: Optional[str] = None,
+    hedge: bool = False,
+    can_retry: Callable[[BaseException], bool] = is_retryable,
+) -> Any:
+    """
+    Await ``make_call()`` with retries, and optionally hedge slow attempts.
+
+    Args:
+        make_call: Zero-argument factory returning a fresh awaitable per attempt
+        policy: Backoff policy
+        metadata: Dict receiving "retries", "hedges" and "hedge_wins" counters
+        latency_key: Key for latency tracking (needed for hedging)
+        hedge: Send a duplicate after the observed p95 latency for latency_key
+        can_retry: Predicate deciding whether an error is worth retrying
+
+    Returns:
+        Whatever the first successful attempt returned
+    """
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        hedge_after = None
+        if hedge and latency_key is not None:
+            hedge_after = latency_tracker.quantile(
+                latency_key, Config.HEDGE_QUANTILE, Config.HEDGE_MIN_SAMPLES
+            )
+        try:
+            if hedge_after is not None:
+                result = await _hedged(make_call, hedge_after, metadata)
+            else:
+                result = await make_call()
+        except Exception as error:
+            if attempt >= policy.max_retries or not can_retry(error):
+                raise
+            delay = policy.delay(attempt, error)
+            attempt += 1
+            _count(metadata, "retries")
+            if Config.VERBOSE:
+                print(f"⚠️  {type(error).__name__}: retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{policy.max_retries})")
+            await asyncio.sleep(delay)
+            continue
+
+        if latency_key is not None:
+            latency_tracker.record(latency_key, time.perf_counter() - started)
+        return result
+
+
+def call_with_retries_sync(
+    call: Callable[[], Any],
+    policy: RetryPolicy,
+    *,
+    metadata: Optional[Dict[str, Any]] = None,
+    can_retry: Callable[[BaseException], bool] = is_retryable,
+) -> Any:
+    """Blocking variant of call_with_retries (no hedging) for thread-based callers"""
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as error:
+            if attempt >= policy.max_retries or not can_retry(error):
+                raise
+            delay = policy.delay(attempt, error)
+            attempt += 1
+            _count(metadata, "retries")
+            if Config.VERBOSE:
+                print(f"⚠️  {type(error).__name__}: retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{policy.max_retries})")
+            time.sleep(delay)
@@ -0,0 +1,556 @@
+"""
+Append-only Run Store for AutoGen and CrewAI Lab Demos
+
+Every demo used to write its results as free-form banner text to a new
+``workflow_outputs_<timestamp>.txt`` (or overwrite ``crewai_output_<dest>.txt``),
+which nothing could read back. ``RunStore`` appends one JSON record per
+finished phase, and one summary record per run, to a single history file:
+
+    {"kind": "phase", "run_id": ..., "workflow": ..., "phase": "pricing",
+     "title": ..., "agent": ..., "model": ..., "prompt_hash": ..., "latency_s": 4.2,
+     "usage": {"prompt_tokens": ..., "completion_tokens": ...}, "status": "executed",
+     "output": ..., "created_at": ...}
+    {"kind": "run", "run_id": ..., "workflow": ..., "title": ..., "model": ...,
+     "status": "completed", "metadata": {...}, "notes": [...], "created_at": ...}
+
+The file is only ever appended to, so concurrent workflows in one process and
+crashed runs never corrupt earlier records. With Config.RUN_STORE_COMPRESSION
+set to "gzip" or "zstd" every append is a compressed frame; readers decode the
+concatenated frames transparently. ``iter_records`` streams records one at a
+time with optional filters, so analysing thousands of batch runs never loads
+the whole history. The txt reports are rendered from these records
+(``render_report``), and any past run can be rendered again:
+
+    python run_store.py list [--workflow FiveAgentWorkflow]
+    python run_store.py show <run_id>
+
+With Config.RUN_STORE_BACKEND=sqlite the same records go to an indexed
+SQLite database instead (``SQLiteRunStore``): columns for workflow, phase,
+model, latency and created_at with an index on (workflow, phase, model,
+created_at), and an FTS5 index over the output text. The database runs in
+WAL mode, so concurrent workers append without blocking readers, and
+``query`` answers questions like "all pricing outputs for model X in the
+last week, slowest first" from the indexes instead of a scan:
+
+    python run_store.py query --phase pricing --model llama-3.1-8b-instant --since 7d --sort latency
+    python run_store.py query --search "freemium tier" --limit 5
+    python run_store.py import                # copy the JSONL history into the database
+
+``query`` works on the JSONL backend too, by streaming the whole file.
+
+Usage:
+    from run_store import get_run_store, make_record, render_report
+
+    store = get_run_store()                  # None when RUN_STORE_ENABLED=False
+    store.append(make_record("phase", run_id, "FiveAgentWorkflow", phase="pricing", output=text))
+    for record in store.iter_records(workflow="FiveAgentWorkflow", phase="pricing"):
+        ...
+    run, phases = store.run(run_id)
+    text = render_report(run, phases)
+    slowest = store.query(phase="pricing", since="7d", order_by="latency_s", descending=True)
+"""
+
+import argparse
+import gzip
+import io
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from shared_config import Config
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for RUN_STORE_COMPRESSION=zstd
+    zstandard = None
+
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+BACKENDS = ("jsonl", "sqlite")
+
+# Record fields ``query`` can sort phase records by
+ORDER_FIELDS = ("created_at", "latency_s")
+
+_AGE = re.compile(r"^(\d+)([mhdw])$")
+_AGE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+_TERM = re.compile(r"\w+")
+
+
+class RunStoreError(RuntimeError):
+    """The run store is misconfigured (unknown backend or compression, missing zstandard)"""
+
+
+def make_record(kind: str, run_id: str, workflow: str, **fields: Any) -> Dict[str, Any]:
+    """
+    Build a store record.
+
+    Args:
+        kind: "phase" for a finished phase, "run" for the run summary
+        run_id: Run the record belongs to
+        workflow: Workflow name
+        **fields: Record fields (phase, title, output, model, usage, ...)
+    """
+    return {"kind": kind, "run_id": run_id, "workflow": workflow, **fields,
+            "created_at": datetime.now().isoformat(timespec="seconds")}
+
+
+def timestamp(value: Union[None, str, datetime, timedelta]) -> Optional[str]:
+    """
+    Normalise a time bound to a created_at string.
+
+    Args:
+        value: A datetime, an ISO string, an age ("30m", "12h", "7d", "2w") or
+               a timedelta, both meaning that long before now
+
+    Returns:
+        Optional[str]: ISO timestamp comparable with created_at, or None
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and (match := _AGE.match(value.strip())):
+        value = timedelta(**{_AGE_UNITS[match.group(2)]: int(match.group(1))})
+    if isinstance(value, timedelta):
+        value = datetime.now() - value
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return datetime.fromisoformat(value).isoformat(timespec="seconds")
+
+
+class RunStore:
+    """Append-only JSONL history of phase and run records"""
+
+    def __init__(self, path: Optional[Path] = None, compression: Optional[str] = None):
+        """
+        Args:
+            path: History file (default Config.RUN_STORE_PATH); the compression
+                  suffix is added when missing
+            compression: "none", "gzip" or "zstd" (default Config.RUN_STORE_COMPRESSION)
+        """
+        self.compression = (compression or Config.RUN_STORE_COMPRESSION).lower()
+        if self.compression not in SUFFIXES:
+            raise RunStoreError(f"Unknown run store compression '{self.compression}' "
+                                f"(expected one of {', '.join(SUFFIXES)})")
+        if self.compression == "zstd" and zstandard is None:
+            raise RunStoreError("RUN_STORE_COMPRESSION=zstd needs the zstandard package "
+                                "(pip install zstandard)")
+        path = Path(path or Config.RUN_STORE_PATH)
+        suffix = SUFFIXES[self.compression]
+        self.path = path if not suffix or path.name.endswith(suffix) else path.with_name(path.name + suffix)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------
+    # Writing
+    # --------------------------------------------------------------------
+
+    def _encode(self, data: bytes) -> bytes:
+        """One self-contained frame; concatenated frames decode as one stream"""
+        if self.compression == "gzip":
+            return gzip.compress(data)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    def append(self, records: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> None:
+        """Append one record or several, as a single write"""
+        if isinstance(records, dict):
+            records = [records]
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        if not data:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(self._encode(data.encode("utf-8")))
+
+    # --------------------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------------------
+
+    def _lines(self) -> Iterator[str]:
+        if not self.path.exists():
+            return
+        raw = open(self.path, "rb")
+        if self.compression == "gzip":
+            stream = gzip.open(raw)
+        elif self.compression == "zstd":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = raw
+        with raw, io.TextIOWrapper(stream, encoding="utf-8") as text:
+            yield from text
+
+    def iter_records(self, kind: Optional[str] = None, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records in the order they were written.
+
+        Args:
+            kind: Only "phase" or only "run" records
+            **filters: Field values a record must match, e.g. workflow="FiveAgentWorkflow",
+                       phase="pricing", model="gpt-4o-mini", run_id=...
+
+        Yields:
+            Matching records; a line cut short by a crash is skipped
+        """
+        for line in self._lines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if kind is not None and record.get("kind") != kind:
+                continue
+            if all(record.get(key) == value for key, value in filters.items()):
+                yield record
+
+    def run(self, run_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Records of one run.
+
+        Returns:
+            Tuple of (latest run record or None, latest record per phase in
+            completion order); a resumed run contributes records from every session
+        """
+        run = None
+        phases: Dict[str, Dict[str, Any]] = {}
+        for record in self.iter_records(run_id=run_id):
+            if record.get("kind") == "run":
+                run = record
+            else:
+                phases.pop(record.get("phase"), None)
+                phases[record.get("phase")] = record
+        return run, list(phases.values())
+
+    def runs(self, workflow: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream run summary records, optionally for one workflow"""
+        filters = {"workflow": workflow} if workflow else {}
+        return self.iter_records(kind="run", **filters)
+
+    def query(self, workflow: Optional[str] = None, phase: Optional[str] = None,
+              model: Optional[str] = None, since: Union[None, str, datetime, timedelta] = None,
+              until: Union[None, str, datetime, timedelta] = None, search: Optional[str] = None,
+              order_by: str = "created_at", descending: bool = False,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Phase records matching filters, sorted.
+
+        Args:
+            workflow: Only this workflow
+            phase: Only this phase
+            model: Only phases that ran on this model
+            since: Created at or after (datetime, ISO string, or an age like "7d")
+            until: Created before (same forms as since)
+            search: Words that must all appear in the output
+            order_by: "created_at" or "latency_s"
+            descending: Largest first
+            limit: Maximum number of records
+
+        Returns:
+            List of phase records
+        """
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"Cannot sort by '{order_by}' (expected one of {', '.join(ORDER_FIELDS)})")
+        filters = {key: value for key, value in (("workflow", workflow), ("phase", phase), ("model", model))
+                   if value}
+        since, until = timestamp(since), timestamp(until)
+        terms = {term.lower() for term in _TERM.findall(search or "")}
+        matches = [record for record in self.iter_records(kind="phase", **filters)
+                   if (since is None or record["created_at"] >= since)
+                   and (until is None or record["created_at"] < until)
+                   and terms <= {word.lower() for word in _TERM.findall(record.get("output") or "")}]
+        # Missing values sort first, as NULLs do in SQLite
+        matches.sort(key=lambda record: (record.get(order_by) is not None, record.get(order_by)),
+                     reverse=descending)
+        return matches[:limit] if limit else matches
+
+
+class SQLiteRunStore(RunStore):
+    """Indexed SQLite history of phase and run records, with full-text search over outputs"""
+
+    # Record fields kept in their own columns; the rest stay in the JSON "fields" column
+    COLUMNS = ("kind", "run_id", "workflow", "phase", "model", "status", "latency_s", "created_at")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            workflow TEXT NOT NULL,
+            phase TEXT,
+            model TEXT,
+            status TEXT,
+            latency_s REAL,
+            created_at TEXT NOT NULL,
+            output TEXT,
+            fields TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_records_phase ON records(workflow, phase, model, created_at);
+        CREATE INDEX IF NOT EXISTS idx_records_phase_model ON records(phase, model, created_at);
+        CREATE INDEX IF NOT EXISTS idx_records_created ON records(created_at);
+        CREATE INDEX IF NOT EXISTS idx_records_run ON records(run_id);
+        CREATE INDEX IF NOT EXISTS idx_records_kind ON records(kind, created_at);
+        CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+            output, content='records', content_rowid='id');
+        CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records
+        WHEN new.output IS NOT NULL BEGIN
+            INSERT INTO records_fts(rowid, output) VALUES (new.id, new.output);
+        END;
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: Database file (default Config.RUN_STORE_DB_PATH, created if missing)
+        """
+        self.path = Path(path or Config.RUN_STORE_DB_PATH)
+        self.compression = "none"
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL: appends from other workers never block readers (and vice versa)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            try:
+                conn.executescript(self.SCHEMA)
+            except sqlite3.OperationalError as e:
+                conn.close()
+                raise RunStoreError(f"RUN_STORE_BACKEND=sqlite needs SQLite with FTS5 ({e})") from e
+            self._conn = conn
+        return self._conn
+
+    def append(self, records: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> None:
+        """Append one record or several, in a single transaction"""
+        if isinstance(records, dict):
+            records = [records]
+        rows = [(*(record.get(column) for column in self.COLUMNS), record.get("output"),
+                 json.dumps({key: value for key, value in record.items() if key != "output"},
+                            ensure_ascii=False, default=str))
+                for record in records]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO records ({', '.join(self.COLUMNS)}, output, fields)"
+                    f" VALUES ({', '.join('?' * (len(self.COLUMNS) + 2))})", rows)
+
+    def _select(self, where: List[str], params: List[Any], order: str = "id",
+                limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream records on a connection of their own, so writers are never held up"""
+        with self._lock:
+            self._connection()
+        sql = f"SELECT output, fields FROM records{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            for output, fields in conn.execute(sql, params):
+                record = json.loads(fields)
+                if output is not None:
+                    record["output"] = output
+                yield record
+        finally:
+            conn.close()
+
+    def iter_records(self, kind: Optional[str] = None, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records in the order they were written.
+
+        Args:
+            kind: Only "phase" or only "run" records
+            **filters: Field values a record must match; indexed columns
+                       (workflow, phase, model, run_id, ...) are filtered in SQL
+
+        Yields:
+            Matching records
+        """
+        if kind is not None:
+            filters["kind"] = kind
+        columns = {key: value for key, value in filters.items() if key in self.COLUMNS}
+        rest = {key: value for key, value in filters.items() if key not in self.COLUMNS}
+        for record in self._select([f"{key} = ?" for key in columns], list(columns.values())):
+            if all(record.get(key) == value for key, value in rest.items()):
+                yield record
+
+    def query(self, workflow: Optional[str] = None, phase: Optional[str] = None,
+              model: Optional[str] = None, since: Union[None, str, datetime, timedelta] = None,
+              until: Union[None, str, datetime, timedelta] = None, search: Optional[str] = None,
+              order_by: str = "created_at", descending: bool = False,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Phase records matching filters, sorted (see RunStore.query), answered from the indexes"""
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"Cannot sort by '{order_by}' (expected one of {', '.join(ORDER_FIELDS)})")
+        # "+kind" keeps the planner on the phase/model/created_at indexes or the FTS match
+        where, params = ["+kind = 'phase'"], []
+        for column, value in (("workflow", workflow), ("phase", phase), ("model", model)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        for column, op, value in (("created_at", ">=", timestamp(since)), ("created_at", "<", timestamp(until))):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                params.append(value)
+        terms = _TERM.findall(search or "")
+        if terms:
+            # Quoted terms: every word must appear, and FTS5 query syntax is not interpreted
+            where.append("id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+            params.append(" ".join(f'"{term}"' for term in terms))
+        order = f"{order_by} {'DESC' if descending else 'ASC'}, id"
+        return list(self._select(where, params, order, limit))
+
+    def run_ids(self) -> set:
+        """IDs of every run with records in the database"""
+        with self._lock:
+            return {run_id for run_id, in self._connection().execute("SELECT DISTINCT run_id FROM records")}
+
+    def close(self) -> None:
+        """Close the write connection (reopened lazily on next append)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+
+
+def create_run_store(backend: Optional[str] = None) -> RunStore:
+    """
+    Open the run store of a backend.
+
+    Args:
+        backend: "jsonl" or "sqlite" (default Config.RUN_STORE_BACKEND)
+    """
+    backend = (backend or Config.RUN_STORE_BACKEND).lower()
+    if backend == "sqlite":
+        return SQLiteRunStore()
+    if backend == "jsonl":
+        return RunStore()
+    raise RunStoreError(f"Unknown run store backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+
+_run_store: Optional[RunStore] = None
+_run_store_lock = threading.Lock()
+
+
+def get_run_store() -> Optional[RunStore]:
+    """Get the process-wide run store of Config.RUN_STORE_BACKEND, or None when disabled in Config"""
+    global _run_store
+    if not Config.RUN_STORE_ENABLED:
+        return None
+    with _run_store_lock:
+        if _run_store is None:
+            _run_store = create_run_store()
+    return _run_store
+
+
+def render_report(run: Optional[Dict[str, Any]], phases: List[Dict[str, Any]]) -> str:
+    """
+    Render a run as the plain-text report the demos save.
+
+    Args:
+        run: Run record (title, model, metadata, notes); None renders phases only
+        phases: Phase records, in the order they should appear
+
+    Returns:
+        str: Report text
+    """
+    run = run or {}
+    lines = ["=" * 80, run.get("title") or f"{run.get('workflow', 'WORKFLOW')} - FULL RESULTS", "=" * 80,
+             f"Generated: {(run.get('created_at') or datetime.now().isoformat(timespec='seconds')).replace('T', ' ')}"]
+    if run.get("model"):
+        lines.append(f"Model: {run['model']}")
+    if run.get("run_id"):
+        lines.append(f"Run ID: {run['run_id']}")
+    for key, value in (run.get("metadata") or {}).items():
+        lines.append(f"{key.replace('_', ' ').title()}: {value}")
+    lines.append("")
+    lines.extend(run.get("notes") or [])
+    if run.get("notes"):
+        lines.append("")
+
+    for phase in phases:
+        lines += ["", "-" * 80, phase.get("title") or phase.get("phase", ""), "-" * 80, phase.get("output", "")]
+        for number, alternative in enumerate(phase.get("alternatives") or [], 2):
+            lines += ["", f"[Alternative {number}]", alternative]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """List, render, query or import stored runs"""
+    parser = argparse.ArgumentParser(description="Inspect the run history")
+    parser.add_argument("--backend", choices=BACKENDS, help="Run store backend (default RUN_STORE_BACKEND)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="List stored runs")
+    listing.add_argument("--workflow", help="Only runs of this workflow")
+    show = commands.add_parser("show", help="Render the report of a stored run")
+    show.add_argument("run_id")
+    query = commands.add_parser("query", help="Find phase outputs")
+    query.add_argument("--workflow", help="Only this workflow")
+    query.add_argument("--phase", help="Only this phase")
+    query.add_argument("--model", help="Only phases that ran on this model")
+    query.add_argument("--since", help="Created at or after (ISO time, or an age like 12h, 7d, 2w)")
+    query.add_argument("--until", help="Created before (same forms as --since)")
+    query.add_argument("--search", help="Words that must all appear in the output")
+    query.add_argument("--sort", choices=["created", "latency"], default="created", help="Sort order")
+    query.add_argument("--desc", action="store_true", help="Largest first")
+    query.add_argument("--limit", type=int, default=50, help="Maximum number of records (0: all)")
+    imports = commands.add_parser("import", help="Copy the runs of a JSONL history into the SQLite database")
+    imports.add_argument("source", nargs="?", type=Path, help="JSONL history (default RUN_STORE_PATH)")
+    args = parser.parse_args()
+
+    try:
+        store = create_run_store(args.backend)
+        if args.command == "import":
+            source = args.source or RunStore().path
+            compression = next((name for name, suffix in SUFFIXES.items()
+                                if suffix and source.name.endswith(suffix)), "none")
+            target = store if isinstance(store, SQLiteRunStore) else SQLiteRunStore()
+            # Runs already in the database are skipped, so importing again is harmless
+            known = target.run_ids()
+            records = (record for record in RunStore(source, compression).iter_records()
+                       if record.get("run_id") not in known)
+            count = 0
+            while batch := list(itertools.islice(records, 10000)):
+                target.append(batch)
+                count += len(batch)
+            target.close()
+            print(f"Imported {count} records from {source} into {target.path}")
+            return
+    except RunStoreError as e:
+        parser.exit(1, f"{e}\n")
+
+    if args.command == "list":
+        for run in store.runs(args.workflow):
+            tokens = sum(run.get("metadata", {}).get(key, 0) or 0
+                         for key in ("prompt_tokens", "completion_tokens"))
+            print(f"{run['run_id']:<24} {run['workflow']:<32} {run.get('status', '-'):<10} "
+                  f"{run['created_at']}  {tokens:>7} tokens")
+    elif args.command == "query":
+        started = time.perf_counter()
+        records = store.query(workflow=args.workflow, phase=args.phase, model=args.model,
+                              since=args.since, until=args.until, search=args.search,
+                              order_by="latency_s" if args.sort == "latency" else "created_at",
+                              descending=args.desc, limit=args.limit)
+        elapsed = time.perf_counter() - started
+        for record in records:
+            latency = record.get("latency_s")
+            snippet = " ".join((record.get("output") or "").split())[:60]
+            print(f"{record['created_at']}  {record['run_id']:<24} {record.get('phase') or '-':<12} "
+                  f"{record.get('model') or '-':<28} "
+                  f"{f'{latency:.2f}s' if latency is not None else '-':>8}  {snippet}")
+        print(f"\n{len(records)} records in {elapsed * 1000:.1f} ms ({store.path})")
+    else:
+        run, phases = store.run(args.run_id)
+        if run is None and not phases:
+            parser.exit(1, f"No run '{args.run_id}' in {store.path}\n")
+        print(render_report(run, phases), end="")
+
+
+if __name__ == "__main__":
+    main()
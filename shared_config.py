@@ -14,11 +14,22 @@ Usage:
     # Use configuration
     api_key = Config.OPENAI_API_KEY
     config_list = Config.get_config_list()  # For AutoGen
+
+    # Shared, connection-pooled API clients
+    client = get_openai_client()
+    async_client = get_async_openai_client()  # inside a coroutine
 """
 
+import asyncio
+import importlib.util
+import json
 import os
+import tempfile
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 
 
@@ -64,6 +75,67 @@ class Config:
     AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "2000"))
     AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "300"))
 
+    # ====================
+    # Model Tiers
+    # ====================
+    # Opt-in: agents and phases name a tier; the router (model_router.py) maps it to a model
+    # and retries on the next tier up when an output fails a cheap local check
+    # (empty, refusal, truncated, or under ROUTER_MIN_WORD_FRACTION of its word budget).
+    MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "False").lower() == "true"
+    MODEL_TIERS = {
+        "fast": os.getenv("FAST_MODEL", "llama-3.1-8b-instant" if USE_GROQ else "gpt-4o-mini"),
+        "large": os.getenv("LARGE_MODEL", OPENAI_MODEL),
+    }
+    MODEL_TIER_ORDER = ("fast", "large")  # escalation order, smallest first
+    ROUTER_MIN_WORDS = int(os.getenv("ROUTER_MIN_WORDS", "20"))
+    ROUTER_MIN_WORD_FRACTION = float(os.getenv("ROUTER_MIN_WORD_FRACTION", "0.3"))
+
+    # ====================
+    # HTTP Connection Pool
+    # ====================
+    # One keep-alive pool is shared by every workflow, agent and crew in the process.
+    # HTTP/2 is used when enabled here and the optional 'h2' package is installed.
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2 = os.getenv("HTTP2", "True").lower() == "true"
+
+    # ====================
+    # Rate Limiting
+    # ====================
+    # Requests/tokens per minute budgeted per (API base, model). Known models use
+    # the table below; RATE_LIMIT_RPM / RATE_LIMIT_TPM set in .env override it.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", "30" if USE_GROQ else "500"))
+    RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", "6000" if USE_GROQ else "30000"))
+    RATE_LIMITS = {
+        # model: (requests per minute, tokens per minute)
+        "llama-3.3-70b-versatile": (30, 12000),   # Groq free tier
+        "llama-3.1-8b-instant": (30, 6000),       # Groq free tier
+        "gpt-4-turbo-preview": (500, 30000),      # OpenAI tier 1
+        "gpt-4o-mini": (500, 200000),             # OpenAI tier 1
+    }
+    RATE_LIMIT_HEADROOM = float(os.getenv("RATE_LIMIT_HEADROOM", "0.9"))  # fraction of quota to use
+    RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+    RATE_LIMIT_STATE_DIR = Path(os.getenv(
+        "RATE_LIMIT_STATE_DIR",
+        str(Path(tempfile.gettempdir()) / "multi_agent_rate_limits"),
+    ))
+
+    # ====================
+    # Retries and Hedging
+    # ====================
+    # Transient errors (429, timeouts, 5xx) are retried MAX_RETRIES times with
+    # jittered exponential backoff; a provider Retry-After header takes precedence.
+    # With HEDGE_ENABLED, a duplicate request is sent once a call has run longer
+    # than the observed HEDGE_QUANTILE latency for its model.
+    MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30.0"))
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "False").lower() == "true"
+    HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
     # ====================
     # Logging Settings
     # ====================
@@ -77,6 +149,178 @@ class Config:
     AUTOGEN_DIR = PROJECT_ROOT / "autogen"
     CREWAI_DIR = PROJECT_ROOT / "crewai"
 
+    # ====================
+    # LLM Response Cache
+    # ====================
+    # Identical (model, api_base, temperature, max_tokens, messages) requests are
+    # served from disk. LLM_CACHE_BYPASS skips lookups but still refreshes entries.
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "False").lower() == "true"
+    LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(PROJECT_ROOT / ".llm_cache" / "responses.sqlite")))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds, 0 = never expire
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+    # ====================
+    # Tool Result Cache
+    # ====================
+    # CrewAI tool results are memoized on normalized arguments with a TTL per tool.
+    # TOOL_CACHE_DISK adds a persistent tier shared across runs and processes.
+    TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "True").lower() == "true"
+    TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "256"))
+    TOOL_CACHE_DISK = os.getenv("TOOL_CACHE_DISK", "False").lower() == "true"
+    TOOL_CACHE_PATH = Path(os.getenv("TOOL_CACHE_PATH", str(PROJECT_ROOT / ".llm_cache" / "tools.sqlite")))
+    TOOL_CACHE_DISK_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_DISK_MAX_ENTRIES", "5000"))
+
+    # ====================
+    # Token Counting and Budgets
+    # ====================
+    # Prompt tokens are counted locally before each request ("tiktoken", falling back
+    # to ~4 chars/token, or "heuristic"). A request over its phase or workflow budget
+    # is handled per TOKEN_BUDGET_POLICY: "truncate" or "compact" the longest input,
+    # or "fail" fast. Budgets cover prompt + completion; 0 means unlimited.
+    TOKEN_COUNTER = os.getenv("TOKEN_COUNTER", "tiktoken")
+    TOKEN_BUDGET_ENABLED = os.getenv("TOKEN_BUDGET_ENABLED", "True").lower() == "true"
+    TOKEN_BUDGET_POLICY = os.getenv("TOKEN_BUDGET_POLICY", "compact")
+    PHASE_TOKEN_BUDGET = int(os.getenv("PHASE_TOKEN_BUDGET", "8000"))
+    WORKFLOW_TOKEN_BUDGET = int(os.getenv("WORKFLOW_TOKEN_BUDGET", "0"))
+    MIN_COMPLETION_TOKENS = int(os.getenv("MIN_COMPLETION_TOKENS", "256"))
+
+    # ====================
+    # Inter-Phase Context Compaction
+    # ====================
+    # Upstream outputs are shrunk into bounded "handoff briefs" before being passed
+    # to the next phase: "extractive" scores sentences locally, "model" asks a cheap model.
+    COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "False").lower() == "true"
+    COMPACTION_METHOD = os.getenv("COMPACTION_METHOD", "extractive")
+    COMPACTION_MODEL = os.getenv("COMPACTION_MODEL", "llama-3.1-8b-instant" if USE_GROQ else "gpt-4o-mini")
+    COMPACTION_MAX_TOKENS = int(os.getenv("COMPACTION_MAX_TOKENS", "400"))  # default ceiling per brief
+
+    # ====================
+    # Incremental Re-execution
+    # ====================
+    # Each phase result is stored under a fingerprint of its prompts, model settings
+    # and the fingerprints of its inputs. A rerun only executes phases whose
+    # fingerprint changed; the rest load from the store. The store follows the
+    # response cache: off with LLM_CACHE_ENABLED=False, LLM_CACHE_TTL expiry and
+    # LLM_CACHE_BYPASS; --fresh on the demos reruns every phase.
+    PHASE_STORE_ENABLED = os.getenv("PHASE_STORE_ENABLED", "True").lower() == "true"
+    PHASE_STORE_PATH = Path(os.getenv("PHASE_STORE_PATH", str(PROJECT_ROOT / ".llm_cache" / "phases.sqlite")))
+    PHASE_STORE_MAX_ENTRIES = int(os.getenv("PHASE_STORE_MAX_ENTRIES", "5000"))
+
+    # ====================
+    # Checkpoints
+    # ====================
+    # Every completed phase is written atomically to RUNS_DIR/<run_id>/ as soon as
+    # it finishes; pass --resume <run_id> to an entry point to skip completed phases.
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "True").lower() == "true"
+    RUNS_DIR = Path(os.getenv("RUNS_DIR", str(PROJECT_ROOT / ".runs")))
+
+    # ====================
+    # Run Store
+    # ====================
+    # Every finished phase (and one summary record per run) is appended to a JSONL
+    # history; the txt reports are rendered from these records. Compression is
+    # "none", "gzip" or "zstd" (needs the zstandard package); the file name gets
+    # a .gz / .zst suffix accordingly. RUN_STORE_BACKEND=sqlite writes the records
+    # to an indexed SQLite database (WAL mode, FTS5 over outputs) at
+    # RUN_STORE_DB_PATH instead, for fast queries over large histories.
+    RUN_STORE_ENABLED = os.getenv("RUN_STORE_ENABLED", "True").lower() == "true"
+    RUN_STORE_BACKEND = os.getenv("RUN_STORE_BACKEND", "jsonl").lower()
+    RUN_STORE_PATH = Path(os.getenv("RUN_STORE_PATH", str(PROJECT_ROOT / ".runs" / "history.jsonl")))
+    RUN_STORE_COMPRESSION = os.getenv("RUN_STORE_COMPRESSION", "none").lower()
+    RUN_STORE_DB_PATH = Path(os.getenv("RUN_STORE_DB_PATH", str(PROJECT_ROOT / ".runs" / "history.sqlite")))
+
+    # ====================
+    # Speculative Execution
+    # ====================
+    # Opt-in: once an upstream phase has streamed SPECULATION_TRIGGER_FRACTION of its
+    # max_tokens (cut at a paragraph break), downstream phases start on the partial
+    # text. A result is kept if the partial is at least SPECULATION_MIN_SIMILARITY
+    # alike to the same-length prefix of the final output; otherwise it is restarted.
+    SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "False").lower() == "true"
+    SPECULATION_TRIGGER_FRACTION = float(os.getenv("SPECULATION_TRIGGER_FRACTION", "0.5"))
+    SPECULATION_MIN_SIMILARITY = float(os.getenv("SPECULATION_MIN_SIMILARITY", "0.9"))
+
+    # ====================
+    # Adaptive Completion Limits
+    # ====================
+    # max_tokens is derived from each phase's word budget (words × tokens per word ×
+    # headroom) instead of reserving AGENT_MAX_TOKENS, and tuned per phase from
+    # observed lengths and truncations. AGENT_MAX_TOKENS remains the ceiling.
+    ADAPTIVE_MAX_TOKENS = os.getenv("ADAPTIVE_MAX_TOKENS", "True").lower() == "true"
+    TOKENS_PER_WORD = float(os.getenv("TOKENS_PER_WORD", "1.4"))  # until enough samples are observed
+    LENGTH_HEADROOM = float(os.getenv("LENGTH_HEADROOM", "1.5"))  # models overshoot word limits
+    LENGTH_MIN_TOKENS = int(os.getenv("LENGTH_MIN_TOKENS", "128"))
+    LENGTH_MIN_SAMPLES = int(os.getenv("LENGTH_MIN_SAMPLES", "5"))
+    LENGTH_STATS_PATH = Path(os.getenv("LENGTH_STATS_PATH", str(PROJECT_ROOT / ".llm_cache" / "lengths.sqlite")))
+
+    # ====================
+    # Multi-Sample Generation
+    # ====================
+    # Opt-in: phases marked multi_sample get MULTI_SAMPLE_CANDIDATES alternatives from
+    # one request (the API's "n" parameter) and keep the best by a local score:
+    # coverage of the required sections, fit to the word budget, near-duplicates
+    # dropped. Groq rejects n > 1, so there the N samples are sent as parallel requests.
+    MULTI_SAMPLE_CANDIDATES = int(os.getenv("MULTI_SAMPLE_CANDIDATES", "1"))
+    MULTI_SAMPLE_NATIVE_N = os.getenv("MULTI_SAMPLE_NATIVE_N", str(not USE_GROQ)).lower() == "true"
+    CANDIDATE_DUPLICATE_SIMILARITY = float(os.getenv("CANDIDATE_DUPLICATE_SIMILARITY", "0.9"))
+
+    # ====================
+    # Stub LLM Server
+    # ====================
+    # Local OpenAI-compatible server (python stub_server.py) for offline benchmarks;
+    # point OPENAI_API_BASE (GROQ_API_BASE with a Groq key) at it. Latency is the
+    # time to first token: fixed:MS, uniform:LOW,HIGH, normal:MEAN,STDDEV or
+    # lognormal:MEDIAN,SIGMA (milliseconds). Responses are "canned" (built-in text,
+    # or STUB_RESPONSES_PATH: JSON of {prompt substring: response}) or "echo".
+    STUB_SERVER_HOST = os.getenv("STUB_SERVER_HOST", "127.0.0.1")
+    STUB_SERVER_PORT = int(os.getenv("STUB_SERVER_PORT", "8799"))
+    STUB_LATENCY = os.getenv("STUB_LATENCY", "lognormal:300,0.3")
+    STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", "200"))
+    STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0.0"))
+    STUB_RETRY_AFTER_MS = int(os.getenv("STUB_RETRY_AFTER_MS", "100"))
+    STUB_RESPONSE_MODE = os.getenv("STUB_RESPONSE_MODE", "canned").lower()
+    STUB_RESPONSES_PATH = os.getenv("STUB_RESPONSES_PATH") or None
+    STUB_RESPONSE_WORDS = int(os.getenv("STUB_RESPONSE_WORDS", "150"))
+    STUB_SEED = int(os.getenv("STUB_SEED")) if os.getenv("STUB_SEED") else None
+
+    # ====================
+    # Benchmarks
+    # ====================
+    # python benchmark.py runs the workflows against an in-process stub server and
+    # writes JSON results to BENCHMARK_DIR; metrics worse than the stored baseline
+    # by more than BENCHMARK_REGRESSION_THRESHOLD (relative) are flagged.
+    BENCHMARK_DIR = Path(os.getenv("BENCHMARK_DIR", str(PROJECT_ROOT / ".benchmarks")))
+    BENCHMARK_BASELINE_PATH = Path(os.getenv("BENCHMARK_BASELINE_PATH", str(BENCHMARK_DIR / "baseline.json")))
+    BENCHMARK_REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.2"))
+    BENCHMARK_CONCURRENCY = os.getenv("BENCHMARK_CONCURRENCY", "1,8,64")
+    BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS", "5"))
+    BENCHMARK_STUB_LATENCY = os.getenv("BENCHMARK_STUB_LATENCY", "fixed:100")
+    BENCHMARK_STUB_TOKENS_PER_SECOND = float(os.getenv("BENCHMARK_STUB_TOKENS_PER_SECOND", "1000"))
+
+    # ====================
+    # Tracing
+    # ====================
+    # Every run records one span per workflow, phase, LLM call and CrewAI tool
+    # invocation (latency, tokens, cost, retries, cache hits; see tracing.py) and
+    # appends the trace to TRACE_PATH as OTLP/JSON. Costs use the price table
+    # below, matched on the longest model name prefix; MODEL_PRICES in .env
+    # (JSON of {model: [input, output]}) adds or overrides entries.
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "True").lower() == "true"
+    TRACE_PATH = Path(os.getenv("TRACE_PATH", str(PROJECT_ROOT / ".runs" / "traces.jsonl")))
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "multi-agent-workflows")
+    MODEL_PRICES = {
+        # model: (USD per 1M input tokens, USD per 1M output tokens)
+        "gpt-4-turbo": (10.00, 30.00),             # also gpt-4-turbo-preview
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+        "gpt-3.5-turbo": (0.50, 1.50),
+        "llama-3.3-70b-versatile": (0.59, 0.79),   # Groq
+        "llama-3.1-8b-instant": (0.05, 0.08),      # Groq
+        "mixtral-8x7b-32768": (0.24, 0.24),        # Groq
+        **{model: tuple(price) for model, price in json.loads(os.getenv("MODEL_PRICES") or "{}").items()},
+    }
+
     @classmethod
     def validate(cls) -> bool:
         """
@@ -112,6 +356,34 @@ class Config:
 
         return True
 
+    @classmethod
+    def get_rate_limits(cls, model: str) -> Tuple[int, int]:
+        """
+        Get the (requests per minute, tokens per minute) quota for a model.
+
+        Returns:
+            Tuple[int, int]: Explicit .env limits, else the table entry, else provider defaults
+        """
+        rpm, tpm = cls.RATE_LIMITS.get(model, (cls.RATE_LIMIT_RPM, cls.RATE_LIMIT_TPM))
+        if os.getenv("RATE_LIMIT_RPM"):
+            rpm = cls.RATE_LIMIT_RPM
+        if os.getenv("RATE_LIMIT_TPM"):
+            tpm = cls.RATE_LIMIT_TPM
+        return rpm, tpm
+
+    @classmethod
+    def get_model_price(cls, model: str) -> Optional[Tuple[float, float]]:
+        """
+        Get the (input, output) price of a model in USD per 1M tokens.
+
+        Returns:
+            The entry with the longest name prefix of the model (provider prefixes
+            such as "openai/" are ignored), or None when no entry matches
+        """
+        name = model.split("/", 1)[-1]
+        matches = [key for key in cls.MODEL_PRICES if name.startswith(key)]
+        return cls.MODEL_PRICES[max(matches, key=len)] if matches else None
+
     @classmethod
     def get_config_list(cls) -> List[Dict[str, Any]]:
         """
@@ -132,11 +404,14 @@ class Config:
             {
                 "model": cls.OPENAI_MODEL,
                 "api_key": cls.API_KEY,
-                "api_base": cls.API_BASE,
+                "base_url": cls.API_BASE,
                 "api_type": "openai",  # Groq uses OpenAI-compatible API
                 "temperature": cls.AGENT_TEMPERATURE,
                 "max_tokens": cls.AGENT_MAX_TOKENS,
                 "timeout": cls.AGENT_TIMEOUT,
+                # Workflows retry through retry_policy (MAX_RETRIES); keep the SDK from retrying too
+                "max_retries": 0,
+                "http_client": get_http_client(),
             }
         ]
 
@@ -156,8 +431,13 @@ class Config:
             "agent_temperature": cls.AGENT_TEMPERATURE,
             "agent_max_tokens": cls.AGENT_MAX_TOKENS,
             "agent_timeout": cls.AGENT_TIMEOUT,
+            "max_retries": 0,  # SDK-level; retry_policy owns retries
+            "retry_policy_retries": cls.MAX_RETRIES,
+            "hedge_enabled": cls.HEDGE_ENABLED,
             "verbose": cls.VERBOSE,
             "debug": cls.DEBUG,
+            "llm_cache_enabled": cls.LLM_CACHE_ENABLED,
+            "llm_cache_bypass": cls.LLM_CACHE_BYPASS,
         }
 
     @classmethod
@@ -178,11 +458,16 @@ class Config:
         print(f"✓ API Key:           {api_key_masked}")
         print(f"✓ API Base:          {cls.API_BASE}")
         print(f"✓ Model:             {cls.OPENAI_MODEL}")
+        if cls.MODEL_ROUTING_ENABLED:
+            print("✓ Model Tiers:       " + ", ".join(f"{t}={m}" for t, m in cls.MODEL_TIERS.items()))
         print(f"✓ Temperature:       {cls.AGENT_TEMPERATURE}")
         print(f"✓ Max Tokens:        {cls.AGENT_MAX_TOKENS}")
         print(f"✓ Timeout:           {cls.AGENT_TIMEOUT}s")
+        print(f"✓ Max Retries:       {cls.MAX_RETRIES}" + (" (hedging on)" if cls.HEDGE_ENABLED else ""))
         print(f"✓ Verbose:           {cls.VERBOSE}")
         print(f"✓ Debug:             {cls.DEBUG}")
+        cache_state = "disabled" if not cls.LLM_CACHE_ENABLED else ("bypass" if cls.LLM_CACHE_BYPASS else "on")
+        print(f"✓ Response Cache:    {cache_state}")
         print("="*60 + "\n")
 
 
@@ -210,6 +495,95 @@ def get_agent_config() -> Dict[str, Any]:
     }
 
 
+# ====================
+# Shared HTTP / API Clients
+# ====================
+
+class _SharedHTTPClient(httpx.Client):
+    """Pooled httpx client that survives AutoGen's deepcopy of llm_config"""
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_clients_lock = threading.Lock()
+_http_client = None
+_openai_client = None
+# Async pools are bound to the event loop that first used them, so keep one
+# per running loop rather than one per process.
+_async_http_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_async_openai_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """Pool, keep-alive, timeout and HTTP/2 settings shared by sync and async clients"""
+    return {
+        "limits": httpx.Limits(
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(Config.AGENT_TIMEOUT, connect=10.0),
+        "http2": Config.HTTP2 and importlib.util.find_spec("h2") is not None,
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Get the process-wide pooled HTTP client (thread-safe)."""
+    global _http_client
+    with _clients_lock:
+        if _http_client is None:
+            _http_client = _SharedHTTPClient(**_http_client_options())
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the pooled async HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(**_http_client_options())
+        _async_http_clients[loop] = client
+    return client
+
+
+def get_openai_client():
+    """
+    Get the OpenAI client shared by every synchronous caller in the process.
+
+    SDK retries are disabled; callers retry through retry_policy so that
+    MAX_RETRIES, backoff and hedging are applied in one place.
+    """
+    from openai import OpenAI
+
+    global _openai_client
+    http_client = get_http_client()
+    with _clients_lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key=Config.API_KEY, base_url=Config.API_BASE,
+                                    http_client=http_client, max_retries=0)
+    return _openai_client
+
+
+def get_async_openai_client():
+    """
+    Get the AsyncOpenAI client shared by every workflow on the running event loop.
+
+    Must be called from inside a coroutine. All phase calls made on the same
+    loop multiplex over this one client and its keep-alive connection pool.
+    SDK retries are disabled here too (see get_openai_client).
+    """
+    from openai import AsyncOpenAI
+
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(api_key=Config.API_KEY, base_url=Config.API_BASE,
+                             http_client=get_async_http_client(), max_retries=0)
+        _async_openai_clients[loop] = client
+    return client
+
+
 if __name__ == "__main__":
     """
     Test the configuration module.
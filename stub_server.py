@@ -0,0 +1,481 @@
+"""
+Local OpenAI-compatible Stub LLM Server for AutoGen and CrewAI Lab Demos
+
+Benchmarking or load-testing the workflows against Groq/OpenAI burns quota,
+and provider variance drowns out the effect of any change. ``StubServer`` is
+a local HTTP server that implements ``POST /v1/chat/completions`` (buffered
+and streamed, with ``usage``, ``n`` and ``max_tokens``/``stop`` honoured), so
+every workflow can run offline with reproducible timing:
+
+- latency: time to first token drawn from a distribution, e.g. "fixed:300",
+  "uniform:100,500", "normal:300,50" or "lognormal:300,0.5" (milliseconds;
+  lognormal takes the median and sigma)
+- tokens per second: completion tokens are paced after the first token
+- error rate: share of requests answered with 429 / 500 / 503 (429 carries a
+  retry-after-ms header, which retry_policy honours)
+- responses: "canned" (built-in product-plan text, or a JSON file mapping
+  prompt substrings to responses, "*" as the default) or "echo" (the last
+  user message). When the prompt asks for a ReAct "Final Answer:" (CrewAI),
+  the response is wrapped accordingly.
+
+``GET /stats`` returns request, error and token counters plus the time spent
+inside requests; ``POST /stats/reset`` clears them. In-process callers also
+get a log of request windows (``requests()``), which benchmark.py uses to
+separate time inside HTTP calls from framework overhead. ``GET /v1/models`` lists
+the models seen so far.
+
+Point the demos at it with OPENAI_API_BASE (GROQ_API_BASE when a Groq key is
+set), which becomes Config.API_BASE:
+
+    python stub_server.py --latency lognormal:400,0.4 --tokens-per-second 250
+    OPENAI_API_BASE=http://127.0.0.1:8799/v1 OPENAI_API_KEY=sk-stub python autogen/autogen_simple_demo.py
+
+Usage:
+    from stub_server import StubServer
+
+    with StubServer(port=0, latency="fixed:50", error_rate=0.05, seed=7) as server:
+        client = OpenAI(base_url=server.url, api_key="sk-stub")
+        ...
+        print(server.stats())
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from shared_config import Config
+from token_counter import count_message_tokens, count_tokens
+
+RESPONSE_MODES = ("canned", "echo")
+
+# Built-in canned response, repeated and cut to the configured length
+# Paragraph breaks matter: speculation.py starts downstream phases at a "\n\n"
+CANNED_TEXT = (
+    "Key features: structured interviews, live coding rooms, automated scoring and a shared "
+    "candidate scorecard. The target market is mid-size technology companies hiring engineers "
+    "at volume, where recruiters lose hours to scheduling and inconsistent feedback.\n\n"
+    "Competitors focus on either assessments or video calls; few connect both to the hiring "
+    "decision. Pricing follows a freemium tier for small teams, per-seat plans for growing "
+    "companies and an enterprise tier with single sign-on and audit logs.\n\n"
+    "The user journey starts with a job template, moves through scheduled interviews and ends "
+    "with a calibrated recommendation. Risks include integration effort with applicant tracking "
+    "systems and candidate privacy; mitigations are prebuilt connectors and regional data storage.\n\n"
+    "Next steps: validate the scorecard with five design partners, ship the coding room first "
+    "and measure time-to-hire against the current process.\n\n"
+)
+
+ERROR_MESSAGES = {
+    429: ("rate_limit_exceeded", "Rate limit reached (stub server)"),
+    500: ("server_error", "The server had an error while processing your request (stub server)"),
+    503: ("service_unavailable", "The server is overloaded (stub server)"),
+}
+
+# Requests kept for ``requests()``, and how much of each first message they keep
+REQUEST_LOG_SIZE = 100000
+SYSTEM_LOG_CHARS = 300
+
+_REACT = re.compile(r"Final Answer:", re.IGNORECASE)
+
+
+class LatencyDistribution:
+    """Time-to-first-token distribution parsed from "<kind>:<params>" (milliseconds)"""
+
+    def __init__(self, spec: str):
+        """
+        Args:
+            spec: "fixed:300", "uniform:100,500", "normal:300,50" (mean, stddev),
+                  "lognormal:300,0.5" (median, sigma), or a bare number for fixed
+        """
+        self.spec = spec
+        kind, _, params = (spec if ":" in spec else f"fixed:{spec}").partition(":")
+        self.kind = kind.strip().lower()
+        try:
+            self.params = [float(value) for value in params.split(",") if value.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency distribution '{spec}'") from None
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}.get(self.kind)
+        if expected is None or len(self.params) != expected:
+            raise ValueError(f"Invalid latency distribution '{spec}' (expected one of "
+                             f"fixed:MS, uniform:LOW,HIGH, normal:MEAN,STDDEV, lognormal:MEDIAN,SIGMA)")
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds (never negative)"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        else:
+            ms = rng.lognormvariate(math.log(max(self.params[0], 1e-3)), self.params[1])
+        return max(0.0, ms) / 1000.0
+
+
+class StubServer:
+    """Threaded local server answering chat completions with configurable timing and errors"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 latency: Optional[str] = None, tokens_per_second: Optional[float] = None,
+                 error_rate: Optional[float] = None, mode: Optional[str] = None,
+                 responses: Optional[Path] = None, words: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            host: Interface to bind (default Config.STUB_SERVER_HOST)
+            port: Port to bind, 0 for any free port (default Config.STUB_SERVER_PORT)
+            latency: Time-to-first-token distribution (default Config.STUB_LATENCY)
+            tokens_per_second: Completion pacing, 0 for instant (default Config.STUB_TOKENS_PER_SECOND)
+            error_rate: Share of requests that fail (default Config.STUB_ERROR_RATE)
+            mode: "canned" or "echo" (default Config.STUB_RESPONSE_MODE)
+            responses: JSON file of {prompt substring: response} for canned mode
+                       (default Config.STUB_RESPONSES_PATH)
+            words: Length of the built-in canned response (default Config.STUB_RESPONSE_WORDS)
+            seed: Seed for latency and error sampling (default Config.STUB_SEED)
+        """
+        self.host = host or Config.STUB_SERVER_HOST
+        self.port = Config.STUB_SERVER_PORT if port is None else port
+        self.latency = LatencyDistribution(latency or Config.STUB_LATENCY)
+        self.tokens_per_second = (Config.STUB_TOKENS_PER_SECOND if tokens_per_second is None
+                                  else tokens_per_second)
+        self.error_rate = Config.STUB_ERROR_RATE if error_rate is None else error_rate
+        self.mode = (mode or Config.STUB_RESPONSE_MODE).lower()
+        if self.mode not in RESPONSE_MODES:
+            raise ValueError(f"Unknown response mode '{self.mode}' (expected one of {', '.join(RESPONSE_MODES)})")
+        responses = responses or Config.STUB_RESPONSES_PATH
+        self.responses: Dict[str, str] = json.loads(Path(responses).read_text()) if responses else {}
+        self.words = words or Config.STUB_RESPONSE_WORDS
+        self.rng = random.Random(Config.STUB_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    # --------------------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as api_base / OPENAI_API_BASE"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def bind(self) -> ThreadingHTTPServer:
+        """Bind the socket (start and serve_forever do this when needed); resolves port 0"""
+        if self._httpd is not None:
+            return self._httpd
+        httpd = _HTTPServer((self.host, self.port), _Handler)
+        httpd.stub = self
+        self.port = httpd.server_address[1]
+        self._httpd = httpd
+        return httpd
+
+    def start(self) -> "StubServer":
+        """Serve from a background thread"""
+        httpd = self.bind()
+        self._thread = threading.Thread(target=httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted"""
+        self.bind().serve_forever()
+
+    def stop(self) -> None:
+        """Shut the server down"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    # --------------------------------------------------------------------
+    # Counters
+    # --------------------------------------------------------------------
+
+    def reset(self) -> None:
+        """Clear the counters"""
+        with self._lock:
+            self.counters = {"requests": 0, "streamed": 0, "errors": 0, "prompt_tokens": 0,
+                             "completion_tokens": 0, "busy_seconds": 0.0}
+            self.by_status: Dict[str, int] = {}
+            self.models: Dict[str, int] = {}
+            self.log: Deque[Dict[str, Any]] = deque(maxlen=REQUEST_LOG_SIZE)
+
+    def count(self, status: int, model: str, started_at: float, seconds: float, stream: bool = False,
+              prompt_tokens: int = 0, completion_tokens: int = 0, system: str = "") -> None:
+        with self._lock:
+            self.log.append({"start": started_at, "end": started_at + seconds, "status": status,
+                             "model": model, "system": system[:SYSTEM_LOG_CHARS]})
+            self.counters["requests"] += 1
+            self.counters["streamed"] += stream
+            self.counters["errors"] += status >= 400
+            self.counters["prompt_tokens"] += prompt_tokens
+            self.counters["completion_tokens"] += completion_tokens
+            self.counters["busy_seconds"] += seconds
+            self.by_status[str(status)] = self.by_status.get(str(status), 0) + 1
+            self.models[model] = self.models.get(model, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since the last reset"""
+        with self._lock:
+            return {**self.counters, "busy_seconds": round(self.counters["busy_seconds"], 6),
+                    "by_status": dict(self.by_status), "models": dict(self.models)}
+
+    def requests(self, since: float = 0.0, until: float = float("inf")) -> List[Dict[str, Any]]:
+        """
+        Logged requests that started within a time window.
+
+        Args:
+            since: Wall-clock start of the window (time.time())
+            until: Wall-clock end of the window
+
+        Returns:
+            List of {"start", "end", "status", "model", "system"} dicts, where
+            "system" is the start of the request's first message
+        """
+        with self._lock:
+            return [entry for entry in self.log if since <= entry["start"] <= until]
+
+    # --------------------------------------------------------------------
+    # Responses
+    # --------------------------------------------------------------------
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Sample (time to first token in seconds, error status or None) for one request"""
+        with self._lock:
+            delay = self.latency.sample(self.rng)
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+            status = self.rng.choice(sorted(ERROR_MESSAGES)) if failed else None
+        return delay, status
+
+    def respond(self, messages: List[Dict[str, Any]]) -> str:
+        """Response text for a conversation"""
+        texts = [message.get("content") if isinstance(message.get("content"), str) else
+                 " ".join(part.get("text", "") for part in message.get("content") or [] if isinstance(part, dict))
+                 for message in messages]
+        if self.mode == "echo":
+            users = [text for message, text in zip(messages, texts) if message.get("role") == "user"]
+            text = users[-1] if users else (texts[-1] if texts else "")
+        else:
+            prompt = "\n".join(texts)
+            text = next((response for pattern, response in self.responses.items()
+                         if pattern != "*" and pattern in prompt), None)
+            if text is None:
+                # Cut to self.words words, keeping each word's trailing space or paragraph break
+                words = re.findall(r"\S+\s*", CANNED_TEXT * (self.words // len(CANNED_TEXT.split()) + 1))
+                text = self.responses.get("*") or "".join(words[:self.words]).rstrip()
+        if any(_REACT.search(prompt_text or "") for prompt_text in texts):
+            text = f"Thought: I now know the final answer\nFinal Answer: {text}"
+        return text
+
+
+def _truncate(text: str, stop: List[str], max_tokens: Optional[int], model: str) -> Tuple[str, str]:
+    """Apply stop sequences and max_tokens; returns (text, finish_reason)"""
+    for sequence in stop:
+        if sequence and sequence in text:
+            text = text[:text.index(sequence)]
+    if max_tokens and count_tokens(text, model) > max_tokens:
+        words = text.split(" ")
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens(" ".join(words[:middle]), model) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low]), "length"
+    return text, "stop"
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """One thread per connection, with a backlog deep enough for bursts of concurrent clients"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address) -> None:
+        # A client that hung up (cancelled hedge, timeout) is not a server error
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the StubServer attached to the HTTP server"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        if Config.DEBUG:
+            super().log_message(format, *args)
+
+    @property
+    def stub(self) -> StubServer:
+        return self.server.stub
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.stub.stats())
+        elif self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [
+                {"id": model, "object": "model", "created": 0, "owned_by": "stub"}
+                for model in self.stub.stats()["models"]]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/") == "/stats/reset":
+            self.stub.reset()
+            self._send_json(200, self.stub.stats())
+            return
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        try:
+            request = json.loads(body or b"{}")
+            messages = request["messages"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": {"message": "Request needs a JSON body with messages",
+                                            "type": "invalid_request_error"}})
+            return
+        self.complete(request, messages)
+
+    def complete(self, request: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+        started_at, started = time.time(), time.perf_counter()
+        model = request.get("model") or "stub"
+        first = messages[0].get("content") if messages else ""
+        system = first if isinstance(first, str) else ""
+        stream = bool(request.get("stream"))
+        delay, error = self.stub.draw()
+        time.sleep(delay)
+        if error is not None:
+            code, message = ERROR_MESSAGES[error]
+            headers = {"retry-after-ms": str(Config.STUB_RETRY_AFTER_MS)} if error == 429 else {}
+            self._send_json(error, {"error": {"message": message, "type": code, "code": code}}, headers)
+            self.stub.count(error, model, started_at, time.perf_counter() - started, stream, system=system)
+            return
+
+        stop = request.get("stop") or []
+        stop = [stop] if isinstance(stop, str) else stop
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens")
+        prompt_tokens = count_message_tokens(messages, model)
+        choices = []
+        for _ in range(max(1, int(request.get("n") or 1))):
+            text, finish_reason = _truncate(self.stub.respond(messages), stop, max_tokens, model)
+            choices.append((text, finish_reason, count_tokens(text, model) if text else 0))
+        completion_tokens = sum(tokens for _, _, tokens in choices)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        pace = 1.0 / self.stub.tokens_per_second if self.stub.tokens_per_second > 0 else 0.0
+        head = {"id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": model}
+
+        if not stream:
+            time.sleep(pace * max(tokens for _, _, tokens in choices))
+            self._send_json(200, {**head, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": index, "message": {"role": "assistant", "content": text},
+                 "finish_reason": finish_reason, "logprobs": None}
+                for index, (text, finish_reason, _) in enumerate(choices)]})
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+
+            def event(choices: List[Dict[str, Any]], **extra: Any) -> None:
+                payload = {**head, "object": "chat.completion.chunk", "choices": choices, **extra}
+                self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+            for index, (text, finish_reason, tokens) in enumerate(choices):
+                event([{"index": index, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+                pieces = re.findall(r"\s*\S+", text)
+                for piece in pieces:
+                    event([{"index": index, "delta": {"content": piece}, "finish_reason": None}])
+                    time.sleep(pace * tokens / len(pieces))
+                # Usage rides on the final chunk unless the client asked for a separate one
+                last = index == len(choices) - 1 and not include_usage
+                event([{"index": index, "delta": {}, "finish_reason": finish_reason}],
+                      **({"usage": usage} if last else {}))
+            if include_usage:
+                event([], usage=usage)
+            self._send_chunk(b"data: [DONE]\n\n")
+            self._send_chunk(b"")
+        self.stub.count(200, model, started_at, time.perf_counter() - started, stream,
+                        prompt_tokens, completion_tokens, system)
+
+
+def main():
+    """Run the stub server in the foreground"""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", help=f"Interface to bind (default {Config.STUB_SERVER_HOST})")
+    parser.add_argument("--port", type=int, help=f"Port to bind (default {Config.STUB_SERVER_PORT})")
+    parser.add_argument("--latency", help="Time to first token, e.g. fixed:300, uniform:100,500, "
+                                          f"normal:300,50, lognormal:300,0.5 (default {Config.STUB_LATENCY})")
+    parser.add_argument("--tokens-per-second", type=float,
+                        help=f"Completion pacing, 0 for instant (default {Config.STUB_TOKENS_PER_SECOND})")
+    parser.add_argument("--error-rate", type=float, help=f"Share of failed requests (default {Config.STUB_ERROR_RATE})")
+    parser.add_argument("--mode", choices=RESPONSE_MODES, help=f"Response mode (default {Config.STUB_RESPONSE_MODE})")
+    parser.add_argument("--responses", type=Path, help="JSON file of {prompt substring: response}")
+    parser.add_argument("--words", type=int, help=f"Length of the built-in response (default {Config.STUB_RESPONSE_WORDS})")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+    args = parser.parse_args()
+
+    try:
+        server = StubServer(host=args.host, port=args.port, latency=args.latency,
+                            tokens_per_second=args.tokens_per_second, error_rate=args.error_rate,
+                            mode=args.mode, responses=args.responses, words=args.words, seed=args.seed)
+        server.bind()
+    except (ValueError, OSError) as e:
+        parser.exit(1, f"{e}\n")
+
+    print("="*80)
+    print("STUB LLM SERVER")
+    print("="*80)
+    print(f"  Endpoint:    {server.url}/chat/completions")
+    print(f"  Latency:     {server.latency.spec}  |  {server.tokens_per_second:g} tokens/s  |  "
+          f"error rate {server.error_rate:g}")
+    print(f"  Responses:   {server.mode}" + (f" ({len(server.responses)} canned)" if server.responses else ""))
+    print(f"\n  OPENAI_API_BASE={server.url}  (GROQ_API_BASE when a Groq key is set)")
+    print("  Stats: GET /stats   Reset: POST /stats/reset   Stop: Ctrl+C")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
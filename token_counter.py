@@ -0,0 +1,87 @@
+"""
+Local Token Counting for AutoGen and CrewAI Lab Demos
+
+Counts prompt tokens before a request is sent, so budgets and rate limits
+work from real numbers instead of what the provider bills afterwards.
+
+The counter uses ``tiktoken`` when it is installed and its encoding files are
+available. Unknown models (e.g. Llama on Groq) use ``cl100k_base``, which is
+close enough for budgeting. Without tiktoken, or with TOKEN_COUNTER=heuristic,
+it falls back to ~4 characters per token.
+
+Usage:
+    from token_counter import count_tokens, count_message_tokens
+
+    prompt_tokens = count_message_tokens(messages, model=Config.OPENAI_MODEL)
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+from shared_config import Config
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+
+# Per-message framing tokens (role, separators) and reply priming, as in OpenAI's cookbook
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 2
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model: Optional[str] = None):
+    """
+    Get the tiktoken encoding for a model.
+
+    Returns:
+        The encoding, or None when counting falls back to the heuristic
+    """
+    if tiktoken is None or Config.TOKEN_COUNTER != "tiktoken":
+        return None
+    key = model or ""
+    with _encodings_lock:
+        if key not in _encodings:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model) if model else None
+                except KeyError:
+                    encoding = None
+                _encodings[key] = encoding or tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Encoding files are downloaded on first use; offline we fall back
+                _encodings[key] = None
+        return _encodings[key]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in text for the given model"""
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Prompt tokens of a chat request, including per-message framing"""
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(str(m.get("content") or ""), model) for m in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text down to at most max_tokens tokens"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
@@ -0,0 +1,198 @@
+"""
+Memoization for CrewAI Tool Functions
+
+Tool calls are cached on their normalized arguments, so asking the same
+question twice (within one crew run or across runs) is answered without
+touching the data source again. ``memoize_tool`` sits directly under
+CrewAI's ``@tool`` decorator:
+
+    @tool
+    @memoize_tool(ttl=15 * 60)          # flight prices go stale quickly
+    def search_flight_prices(destination: str, departure_city: str = "New York") -> str:
+        ...
+
+Each tool has its own TTL. Results live in a bounded in-memory LRU and,
+when TOOL_CACHE_DISK is enabled, in a SQLite tier shared across processes
+and runs (the same store used by the LLM response cache). Hit/miss counters
+per tool are available through ``tool_cache_stats``.
+
+Usage:
+    from tool_cache import memoize_tool, print_tool_cache_stats
+
+    with isolated_tool_cache():         # e.g. a baseline run that must not warm the cache
+        crew.kickoff()
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from llm_cache import ResponseCache
+from shared_config import Config
+
+
+def normalize_argument(value: Any) -> Any:
+    """Canonical form of an argument: case- and whitespace-insensitive strings"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple)):
+        return [normalize_argument(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): normalize_argument(v) for k, v in sorted(value.items())}
+    return value
+
+
+class ToolCache:
+    """In-memory LRU with per-entry expiry, backed by an optional disk tier"""
+
+    def __init__(self, max_entries: int = 256, disk: Optional[ResponseCache] = None):
+        """
+        Args:
+            max_entries: Results kept in memory before the least recently used is dropped
+            disk: Persistent second tier, or None for memory only
+        """
+        self.max_entries = max_entries
+        self.disk = disk
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, tool_name: str, outcome: str) -> None:
+        counters = self.stats.setdefault(tool_name, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, tool_name: str, key: str) -> Any:
+        """Return the cached result or None, promoting disk hits into memory"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(tool_name, "hits")
+                    return value
+                del self._memory[key]
+
+        if self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                with self._lock:
+                    self._remember(key, stored["value"], stored["expires_at"])
+                    self._count(tool_name, "disk_hits")
+                return stored["value"]
+
+        with self._lock:
+            self._count(tool_name, "misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a result in memory and on disk for ttl seconds"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, {"value": value, "expires_at": expires_at}, ttl=ttl)
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+_shared_cache: Optional[ToolCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolCache:
+    """Get the process-wide tool cache configured in shared_config.Config"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            disk = None
+            if Config.TOOL_CACHE_DISK:
+                disk = ResponseCache(Config.TOOL_CACHE_PATH,
+                                     max_entries=Config.TOOL_CACHE_DISK_MAX_ENTRIES)
+            _shared_cache = ToolCache(max_entries=Config.TOOL_CACHE_MAX_ENTRIES, disk=disk)
+    return _shared_cache
+
+
+@contextlib.contextmanager
+def isolated_tool_cache() -> Iterator[ToolCache]:
+    """Route tool calls to a fresh memory-only cache, leaving the shared one untouched"""
+    global _shared_cache
+    previous = get_tool_cache()
+    isolated = ToolCache(max_entries=Config.TOOL_CACHE_MAX_ENTRIES)
+    with _shared_lock:
+        _shared_cache = isolated
+    try:
+        yield isolated
+    finally:
+        with _shared_lock:
+            _shared_cache = previous
+
+
+def memoize_tool(ttl: float) -> Callable[[Callable], Callable]:
+    """
+    Cache a tool function's results on its normalized arguments.
+
+    Args:
+        ttl: Seconds a result stays valid for this tool
+
+    Returns:
+        A decorator preserving the function's name, docstring and signature,
+        which CrewAI's @tool uses to build the tool schema
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Config.TOOL_CACHE_ENABLED:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {name: normalize_argument(value) for name, value in bound.arguments.items()}
+            key = json.dumps({"tool": func.__name__, "args": arguments},
+                             sort_keys=True, ensure_ascii=False)
+
+            cache = get_tool_cache()
+            result = cache.get(func.__name__, key)
+            if result is None:
+                result = func(*args, **kwargs)
+                cache.set(key, result, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def tool_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Per-tool hit/miss counters for this process"""
+    return {name: dict(counters) for name, counters in get_tool_cache().stats.items()}
+
+
+def print_tool_cache_stats() -> None:
+    """Print the per-tool hit/miss table"""
+    stats = tool_cache_stats()
+    print("\n" + "=" * 60)
+    print("🧰 Tool Cache")
+    print("=" * 60)
+    if not Config.TOOL_CACHE_ENABLED:
+        print("Tool caching is disabled (TOOL_CACHE_ENABLED=False)")
+    elif not stats:
+        print("No tool calls were made")
+    for name, counters in sorted(stats.items()):
+        calls = sum(counters.values())
+        hit_rate = (counters["hits"] + counters["disk_hits"]) / calls if calls else 0.0
+        print(f"{name:<32} hits {counters['hits']:>3}  disk {counters['disk_hits']:>3}  "
+              f"misses {counters['misses']:>3}  ({hit_rate:.0%})")
+    print("=" * 60)
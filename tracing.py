@@ -0,0 +1,482 @@
+"""
+Tracing: per-phase spans with latency, token usage and cost
+
+The only timing a run used to report was its start and end time, which does
+not say which phase, agent or tool the time (and money) went to. Every
+workflow run now records a trace:
+
+- one span per workflow run (the root)
+- one span per phase (AutoGen pipeline phase or CrewAI task)
+- one span per LLM call: model, prompt/completion tokens, cost, retries,
+  hedges and whether the response cache answered it
+- one span per CrewAI tool invocation, with CrewAI's cache hit flag
+
+Costs come from the per-model price table in shared_config
+(Config.MODEL_PRICES). When the root span ends, the trace is appended to
+Config.TRACE_PATH as one OTLP/JSON ExportTraceServiceRequest per line, the
+format of the OpenTelemetry collector's file exporter, so the file can be
+loaded into Jaeger, Tempo or any OTLP backend without an OpenTelemetry
+dependency here.
+
+Spans nest through a ContextVar: asyncio tasks and ``asyncio.to_thread``
+calls started inside a span are its children. Spans rebuilt after the fact
+(CrewAI events) pass explicit start/end times and parents.
+
+Usage:
+    from tracing import current_span, llm_attributes, trace_span
+
+    with trace_span("phase research", {"phase.name": "research"}):
+        with trace_span("chat gpt-4o-mini", kind="client") as span:
+            ...
+            span.set(llm_attributes("gpt-4o-mini", response.usage))
+
+    python tracing.py                      # latency/cost breakdown of the latest trace
+    python tracing.py --list               # recorded traces
+    python tracing.py --trace <trace_id>   # one trace, span by span
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from shared_config import Config
+
+SCOPE_NAME = "multi-agent.tracing"
+
+# OTLP span kinds and status codes
+KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+
+# Attribute keys (OpenTelemetry GenAI conventions where one exists)
+MODEL = "gen_ai.request.model"
+INPUT_TOKENS = "gen_ai.usage.input_tokens"
+OUTPUT_TOKENS = "gen_ai.usage.output_tokens"
+COST = "llm.cost_usd"
+RETRIES = "llm.retries"
+CACHE_HIT = "llm.cache_hit"
+
+
+class Span:
+    """One timed operation of a trace; ended spans are handed back to their tracer"""
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 start_ns: int, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.status = "unset"
+        self.message = ""
+        self.spans: List["Span"] = []      # the whole trace, filled in when a root span ends
+        self.set(attributes or {})
+
+    def set(self, attributes: Dict[str, Any]) -> None:
+        """Add attributes, skipping None values"""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def add(self, key: str, amount: Union[int, float] = 1) -> None:
+        """Increment a numeric attribute"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def fail(self, error: Union[BaseException, str]) -> None:
+        """Mark the span as failed by an exception or an error message"""
+        self.status = "error"
+        self.message = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        """End the span (once); ending a root span exports its trace"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if self.status == "unset":
+            self.status = "ok"
+        self.tracer.finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat view of the span, as read back by load_traces"""
+        return {"trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+                "name": self.name, "kind": self.kind, "start_ns": self.start_ns, "end_ns": self.end_ns,
+                "attributes": dict(self.attributes), "status": self.status, "message": self.message}
+
+
+class _NullSpan:
+    """Stand-in when tracing is disabled: accepts everything, records nothing"""
+
+    spans: List[Span] = []
+
+    def __bool__(self) -> bool:
+        return False
+
+    def set(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add(self, key: str, amount: Union[int, float] = 1) -> None:
+        pass
+
+    def fail(self, error: Union[BaseException, str]) -> None:
+        pass
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+AnySpan = Union[Span, _NullSpan]
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> AnySpan:
+    """The innermost open span of this context (NULL_SPAN outside any span)"""
+    return _current_span.get() or NULL_SPAN
+
+
+class Tracer:
+    """Creates spans and appends each finished trace to an OTLP/JSON file"""
+
+    def __init__(self, path: Path, service_name: str = "multi-agent-workflows"):
+        """
+        Args:
+            path: JSON Lines file receiving one ExportTraceServiceRequest per trace
+            service_name: service.name resource attribute of the exported spans
+        """
+        self.path = Path(path)
+        self.service_name = service_name
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+                   parent: Optional[AnySpan] = None, start_ns: Optional[int] = None) -> Span:
+        """
+        Open a span without making it current.
+
+        Args:
+            name: Span name, e.g. "phase research" or "chat gpt-4o-mini"
+            attributes: Initial attributes
+            kind: "internal", "client" or "server"
+            parent: Parent span (default: the current span; none starts a new trace)
+            start_ns: Start time in Unix nanoseconds (default: now)
+        """
+        if parent is None:
+            parent = current_span()
+        if parent:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            with self._lock:
+                self._pending[trace_id] = []
+        return Span(self, name, trace_id, parent_id,
+                    start_ns if start_ns is not None else time.time_ns(), kind, attributes)
+
+    @contextlib.contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+             parent: Optional[AnySpan] = None) -> Iterator[Span]:
+        """Open a span that is current (the default parent) until the block exits"""
+        span = self.start_span(name, attributes, kind=kind, parent=parent)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.fail(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def finish(self, span: Span) -> None:
+        """Collect an ended span; export the trace once its root ends"""
+        with self._lock:
+            spans = self._pending.get(span.trace_id)
+            if spans is None:
+                return  # its root already ended (e.g. a cancelled speculative call)
+            spans.append(span)
+            if span.parent_id is not None:
+                return
+            del self._pending[span.trace_id]
+        span.spans = spans
+        self.export(spans)
+
+    def export(self, spans: List[Span]) -> None:
+        """Append one trace to the OTLP/JSON file"""
+        line = json.dumps(otlp_request(spans, self.service_name), ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Get the process-wide tracer, or None when Config.TRACING_ENABLED is False"""
+    global _tracer
+    if not Config.TRACING_ENABLED:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(Config.TRACE_PATH, Config.TRACE_SERVICE_NAME)
+    return _tracer
+
+
+@contextlib.contextmanager
+def trace_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "internal",
+               parent: Optional[AnySpan] = None) -> Iterator[AnySpan]:
+    """Tracer.span on the process-wide tracer; yields NULL_SPAN when tracing is disabled"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield NULL_SPAN
+        return
+    with tracer.span(name, attributes, kind=kind, parent=parent) as span:
+        yield span
+
+
+# ============================================================================
+# Token usage and cost
+# ============================================================================
+
+def _usage(usage: Any, field: str) -> int:
+    if usage is None:
+        return 0
+    return (usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)) or 0
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Cost of a call from Config.MODEL_PRICES, or None for a model without a price"""
+    price = Config.get_model_price(model)
+    if price is None:
+        return None
+    return round((prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000, 8)
+
+
+def llm_attributes(model: str, usage: Any) -> Dict[str, Any]:
+    """
+    Model, token and cost attributes of an LLM call.
+
+    Args:
+        model: Model name
+        usage: Usage object or dict with prompt_tokens / completion_tokens
+               (None when the provider omitted it)
+    """
+    attributes: Dict[str, Any] = {MODEL: model}
+    if usage is not None:
+        prompt, completion = _usage(usage, "prompt_tokens"), _usage(usage, "completion_tokens")
+        attributes.update({INPUT_TOKENS: prompt, OUTPUT_TOKENS: completion,
+                           COST: cost_usd(model, prompt, completion)})
+    return attributes
+
+
+# ============================================================================
+# OTLP/JSON encoding
+# ============================================================================
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _plain_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "arrayValue" in value:
+        return [_plain_value(v) for v in value["arrayValue"].get("values", [])]
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def otlp_request(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Encode the spans of a trace as an OTLP/JSON ExportTraceServiceRequest"""
+    encoded = []
+    for span in spans:
+        entry = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": KINDS[span.kind],
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)}
+                           for key, value in span.attributes.items()],
+            "status": {"code": STATUS_CODES[span.status],
+                       **({"message": span.message} if span.message else {})},
+        }
+        if span.parent_id:
+            entry["parentSpanId"] = span.parent_id
+        encoded.append(entry)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": encoded}],
+    }]}
+
+
+def load_traces(path: Optional[Path] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Read an OTLP/JSON trace file back into flat span dicts (see Span.to_dict).
+
+    Returns:
+        One list of spans per exported trace, oldest trace first
+    """
+    path = Path(path or Config.TRACE_PATH)
+    if not path.exists():
+        return []
+    kinds = {code: kind for kind, code in KINDS.items()}
+    statuses = {code: status for status, code in STATUS_CODES.items()}
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            spans = []
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for span in scope.get("spans", []):
+                        spans.append({
+                            "trace_id": span["traceId"], "span_id": span["spanId"],
+                            "parent_id": span.get("parentSpanId") or None, "name": span["name"],
+                            "kind": kinds.get(span.get("kind"), "internal"),
+                            "start_ns": int(span["startTimeUnixNano"]), "end_ns": int(span["endTimeUnixNano"]),
+                            "attributes": {a["key"]: _plain_value(a["value"]) for a in span.get("attributes", [])},
+                            "status": statuses.get(span.get("status", {}).get("code"), "unset"),
+                            "message": span.get("status", {}).get("message", ""),
+                        })
+            if spans:
+                traces.append(spans)
+    return traces
+
+
+# ============================================================================
+# Reports
+# ============================================================================
+
+def _totals(span: Dict[str, Any], children: Dict[Optional[str], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Roll-up of a span's subtree: LLM calls, retries and cache hits, and tokens
+    and cost (the span's own when it records them, else its subtree's)
+    """
+    attributes = span["attributes"]
+    totals = {"input": 0, "output": 0, "cost": 0.0, "llm_calls": int(span["kind"] == "client"),
+              "retries": attributes.get(RETRIES, 0),
+              "cache_hits": int(bool(attributes.get(CACHE_HIT) or attributes.get("tool.from_cache")))}
+    for child in children.get(span["span_id"], []):
+        for key, value in _totals(child, children).items():
+            totals[key] += value
+    if INPUT_TOKENS in attributes:
+        totals.update(input=attributes[INPUT_TOKENS], output=attributes.get(OUTPUT_TOKENS, 0),
+                      cost=attributes.get(COST) or 0.0)
+    return totals
+
+
+def print_trace(spans: List[Dict[str, Any]], detail: bool = False) -> None:
+    """
+    Print where a trace's time and money went.
+
+    Args:
+        spans: Flat span dicts of one trace (Span.to_dict / load_traces)
+        detail: Also list every LLM call and tool invocation under its phase
+    """
+    roots = [span for span in spans if span["parent_id"] is None]
+    if not roots:
+        return
+    root = roots[0]
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in sorted(spans, key=lambda s: s["start_ns"]):
+        children.setdefault(span["parent_id"], []).append(span)
+    wall = max(root["end_ns"] - root["start_ns"], 1)
+    totals = _totals(root, children)
+
+    print("\n" + "="*80)
+    print(f"TRACE {root['trace_id']}  ({root['name']})")
+    print("="*80)
+    print(f"  {'span':<40}{'seconds':>8}{'share':>7}{'in tok':>9}{'out tok':>9}{'cost $':>10}  notes")
+
+    def line(span: Dict[str, Any], depth: int) -> None:
+        seconds = (span["end_ns"] - span["start_ns"]) / 1e9
+        usage = _totals(span, children)
+        notes = []
+        if span["status"] == "error":
+            notes.append("failed")
+        elif span["attributes"].get("phase.status"):
+            notes.append(span["attributes"]["phase.status"])
+        if usage["retries"]:
+            notes.append(f"retries {usage['retries']}")
+        if usage["cache_hits"]:
+            notes.append(f"cache hits {usage['cache_hits']}")
+        name = ("  " * depth + span["name"])[:39]
+        print(f"  {name:<40}{seconds:>8.2f}{seconds * 1e9 / wall:>7.0%}{usage['input']:>9}"
+              f"{usage['output']:>9}{usage['cost']:>10.4f}  {', '.join(notes)}")
+        if detail or depth == 0:
+            for child in children.get(span["span_id"], []):
+                line(child, depth + 1)
+
+    line(root, 0)
+
+    phases = children.get(root["span_id"], [])
+    if phases:
+        slowest = max(phases, key=lambda s: s["end_ns"] - s["start_ns"])
+        costliest = max(phases, key=lambda s: _totals(s, children)["cost"])
+        print(f"\n  Slowest:        {slowest['name']} "
+              f"({(slowest['end_ns'] - slowest['start_ns']) / wall:.0%} of wall-clock time)")
+        if totals["cost"]:
+            print(f"  Most expensive: {costliest['name']} "
+                  f"({_totals(costliest, children)['cost'] / totals['cost']:.0%} of ${totals['cost']:.4f})")
+    print(f"  LLM calls: {totals['llm_calls']}  |  retries: {totals['retries']}  |  "
+          f"cache hits: {totals['cache_hits']}  |  spans: {len(spans)}")
+    print("="*80)
+
+
+def print_trace_summary(root: AnySpan) -> None:
+    """Print the phase breakdown of a just-finished trace (nothing when tracing is disabled)"""
+    if root and root.spans:
+        print_trace([span.to_dict() for span in root.spans])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize traces recorded in Config.TRACE_PATH")
+    parser.add_argument("--path", type=Path, default=None, help="Trace file (default Config.TRACE_PATH)")
+    parser.add_argument("--trace", metavar="TRACE_ID", help="Trace to show (default: the latest)")
+    parser.add_argument("--list", action="store_true", help="List recorded traces")
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if not traces:
+        print(f"No traces in {args.path or Config.TRACE_PATH}")
+        return
+    if args.list:
+        for spans in traces:
+            root = next((s for s in spans if s["parent_id"] is None), spans[0])
+            seconds = (root["end_ns"] - root["start_ns"]) / 1e9
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(root["start_ns"] / 1e9))
+            print(f"{root['trace_id']}  {started}  {seconds:>8.2f}s  {len(spans):>4} spans  "
+                  f"{root['status']:<6} {root['name']}")
+        return
+    if args.trace:
+        traces = [spans for spans in traces if spans[0]["trace_id"].startswith(args.trace)]
+        if not traces:
+            print(f"No trace {args.trace} in {args.path or Config.TRACE_PATH}")
+            return
+    print_trace(traces[-1], detail=True)
+
+
+if __name__ == "__main__":
+    main()